@@ -37,6 +37,14 @@ function get_version() {
     fi
 }
 
+function prune() {
+    # tests, benchmarks, the fake of trello and its webhook simulator are not needed at runtime
+    find "$1" -name "test_*.py" -delete
+    rm -f "$1"/trello_manager/{fake,benchmark,importtime,simulator}.py
+    rm -rf "$1"/bin
+    find "$1" -type d -name "__pycache__" -prune -exec rm -rf {} +
+}
+
 function build() {
     VERSION=`get_version`
 
@@ -45,15 +53,18 @@ function build() {
     mkdir -p ${ZIP_FOLDER}
     mkdir -p ${TARGET_TMP}
 
-    # Install proper dependencies
+    # Install proper dependencies, only the runtime ones, pip and setuptools of the venv stay out of the zip
     python3 -m venv ${VENV_FOLDER}
     source ${VENV_FOLDER}/bin/activate
-    pip install -r requirements.txt
+    pip install --target ${TARGET_TMP} -r requirements.txt
     deactivate
 
     # copy all relevant files to the temporary target folder
-    cp -r ${VENV_FOLDER}/lib/python3.*/site-packages/* ${TARGET_TMP}
     cp -r src/* ${TARGET_TMP}
+    prune ${TARGET_TMP}
+    # the lambda can't write a bytecode cache, so every cold start would compile all modules again.
+    # hash based pycs stay valid although zip doesn't keep the modification times exactly.
+    python3 -m compileall -q -j 0 --invalidation-mode unchecked-hash ${TARGET_TMP}
     echo "${VERSION}" > ${TARGET_TMP}/version.txt
 
     # zip to nice little package
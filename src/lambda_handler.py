@@ -1,19 +1,36 @@
-from trello_manager import ReplayDateTask, ShoppingTask, PrivateTodos
+import json
+import os
 
+from trello_manager import Deadline, ReplayDateTask, ShoppingTask, PrivateTodos, TrelloExecption, \
+    handle_webhook, is_webhook_event, load_tenants, run_tasks, run_tenants
 
-def lambda_handler(event, _):  # pylint: disable=unused-argument
+
+def lambda_handler(event, context):
     """
     handler for the lambda framework in the AWS.
-    The event is not picked up because lambda is cron triggered.
+    The scheduled events of the cron trigger run all tasks, the webhook requests of trello through the
+    function url only handle the card of the action. The tasks defer the sorting of their lists to the next
+    run, when the timeout of the invocation comes close.
     """
+    if is_webhook_event(event):
+        return handle_webhook(event, deadline=Deadline.from_context(context))
     try:
         with open("version.txt", encoding="utf-8") as version_file:
             print(f"Current running version is: {version_file.read()}")
     except FileNotFoundError:
         print("Local Development Mode")
-    print("Move the todo cards on the board")
-    ReplayDateTask().run()
-    print("Get the Shopping Cards from the archive and sort them")
-    ShoppingTask().run()
-    print("Create reoccurring Todo Card for Private")
-    PrivateTodos().run()
+    deadline = Deadline.from_context(context)
+    tenants_path = os.environ.get("TRELLO_MANAGER_TENANTS")
+    if tenants_path:
+        # the boards of all tenants in the config, in one pool
+        report = run_tenants(load_tenants(tenants_path), deadline=deadline)
+        print(json.dumps(report.to_json()))
+        results = report.results
+    else:
+        # Move the todo cards on the board, get the Shopping Cards from the archive and sort them,
+        # create reoccurring Todo Card for Private
+        results = run_tasks([ReplayDateTask, ShoppingTask, PrivateTodos], deadline=deadline)
+    failed = [result.name for result in results if not result.ok]
+    if failed:
+        raise TrelloExecption(f"Tasks failed: {', '.join(failed)}")
+    return None
@@ -1,21 +1,28 @@
 # pylint: disable=protected-access
 import os
+from contextlib import ExitStack
 from datetime import datetime, timedelta
 from time import sleep
-from unittest import TestCase
+from typing import Optional
+from unittest import TestCase, mock, skipUnless
 
 from freezegun import freeze_time
 from testfixtures import compare
 from trello import TrelloClient
 
 from src.trello_manager import TrelloManager, TrelloExecption, ShoppingTask, ReplayDateTask, ScheduledTodos
+from src.trello_manager.fake import FakeTrello
 
 TEST_BOARD = "UNITTEST"
 TEST_KEY = "TRELLO_API_KEY_TEST"
 TEST_SECRET = "TRELLO_API_SECRET_TEST"
+# without credentials for the live api the tests run against an in-process fake of trello
+OFFLINE = TEST_KEY not in os.environ
 
 
 class TrelloTest(TestCase):
+    fake: Optional[FakeTrello] = None
+
     def first_weekday_of_the_year(self, day) -> str:
         d = datetime(datetime.now().year, 1, 7)
         offset = -d.weekday() + day  # weekday == 0 means Monday
@@ -23,17 +30,29 @@ class TrelloTest(TestCase):
 
     @classmethod
     def setUpClass(cls):
+        cls._offline_stack = ExitStack()
+        if OFFLINE:
+            cls._offline_stack.enter_context(
+                mock.patch.dict(os.environ, {TEST_KEY: "fake_key", TEST_SECRET: "fake_secret"}))
+            cls.fake = cls._offline_stack.enter_context(FakeTrello().install("fake_key", "fake_secret"))
         cls.client = TrelloClient(
             api_key=os.environ["TRELLO_API_KEY_TEST"],
             api_secret=os.environ["TRELLO_API_SECRET_TEST"]
         )
 
+    @classmethod
+    def tearDownClass(cls):
+        cls._offline_stack.close()
+        cls.fake = None
+
     def setUp(self):
         # this is necessary, because the calls to the api of trello are limited to
         # 100calls/10seconds.
-        if "CIRCLECI" in os.environ:
+        if "CIRCLECI" in os.environ and not OFFLINE:
             sleep(4)
         self.board = self._refresh_test_board()
+        if self.fake:
+            self.fake.reset_calls()
 
     def tearDown(self):
         self._remove_test_board()
@@ -117,6 +136,15 @@ class TestShoppingTask(TrelloTest):
         compare(1, len(closed_cards))
         compare("Don't show", closed_cards[0].name)
 
+    def test_archived_list_of_the_same_name(self):
+        self.board.add_list("Gerade nicht kaufen (Lebensmittel)", pos="top").close()
+        self.buy_list.add_card("Milch", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+
+        ShoppingTask().run()
+
+        compare(["Milch"], [card.name for card in self.list_lebensmittel.list_cards()])
+
     def test_sorting(self):
         for category in ((self.list_lebensmittel, self.label_lebensmittel),
                          (self.list_drogerie, self.label_drogerie)):
@@ -215,6 +243,22 @@ class TestReplayDateTask(TrelloTest):
         compare("Test_To_Todo_1 (20 d)", todo_cards[3].name)
 
 
+class TestCompactShoppingTask(TestShoppingTask):
+    """
+    The same runs with the compact card records instead of ``trello.Card``.
+    """
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"TRELLO_MANAGER_COMPACT_CARDS": "1"}):
+            super().setUp()
+
+
+class TestCompactReplayDateTask(TestReplayDateTask):
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"TRELLO_MANAGER_COMPACT_CARDS": "1"}):
+            super().setUp()
+
+
 class TestScheduledTodos(TrelloTest):
     ScheduledTodos._board_name = TEST_BOARD
     ScheduledTodos._key = TEST_KEY
@@ -239,6 +283,13 @@ class TestScheduledTodos(TrelloTest):
             compare(2, len(todo_cards[0].checklists[0].items))
             compare(self.orga_label, todo_cards[0].labels[0])
 
+    def test_title_with_braces(self):
+        with freeze_time(self.first_weekday_of_the_year(4)):
+            for title in ("Budget {2025}", "Set {x}"):
+                self.task.create_scheduled_reminder(title=title, checklist=[], days_of_week=[5])
+
+        compare(["Budget {2025}", "Set {x}"], sorted(card.name for card in self.list_todo.list_cards()))
+
     def test_no_todos_on_the_weekend(self):
         # Sunday
         with freeze_time(self.first_weekday_of_the_year(6)):
@@ -303,3 +354,20 @@ class TestScheduledTodos(TrelloTest):
             # if two days match only one card to create
             compare(1, len(todo_cards))
             compare(self.orga_label, todo_cards[0].labels[0])
+
+    def test_todo_created_once_per_day(self):
+        self.task.create_scheduled_reminder(title="Test", checklist=["1", "2"], days_of_week=list(range(7)))
+        # a retried run with a new task, the card of the first run is archived already
+        self.list_todo.list_cards()[0].set_closed(True)
+        ScheduledTodos().create_scheduled_reminder(title="Test", checklist=["1", "2"], days_of_week=list(range(7)))
+        compare(0, len(self.list_todo.list_cards()))
+        compare(["Test"], [card.name for card in self.board.closed_cards()])
+
+    @skipUnless(OFFLINE, "the ids of the live api carry the real time of creation")
+    def test_todo_of_last_week_is_no_duplicate(self):
+        friday = datetime.strptime(self.first_weekday_of_the_year(4), "%Y-%m-%d")
+        with freeze_time(friday - timedelta(days=7)):
+            ScheduledTodos().create_scheduled_reminder(title="Test", checklist=[], days_of_week=[5])
+        with freeze_time(friday):
+            self.task.create_scheduled_reminder(title="Test", checklist=[], days_of_week=[5])
+        compare(["Test", "Test"], [card.name for card in self.list_todo.list_cards()])
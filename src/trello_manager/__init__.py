@@ -0,0 +1,66 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .aio import AsyncTrelloManager
+    from .orchestrator import RunReport, TaskResult, Tenant, load_tenants, run_tasks, run_tenants
+    from .resilience import Deadline
+    from .session import TrelloSession
+    from .snapshot import BoardSnapshot
+    from .state import StateStore
+    from .tasks import TrelloExecption, TrelloManager, ShoppingTask, ReplayDateTask, ScheduledTodos, PrivateTodos
+    from .webhook import handle_webhook, is_webhook_event
+
+# the names are imported on first access, so e.g. the instrumentation can be imported without pulling in
+# py-trello and requests
+_EXPORTS = {
+    "AsyncTrelloManager": "aio",
+    "BoardSnapshot": "snapshot",
+    "Deadline": "resilience",
+    "PrivateTodos": "tasks",
+    "ReplayDateTask": "tasks",
+    "RunReport": "orchestrator",
+    "ScheduledTodos": "tasks",
+    "ShoppingTask": "tasks",
+    "StateStore": "state",
+    "TaskResult": "orchestrator",
+    "Tenant": "orchestrator",
+    "TrelloExecption": "tasks",
+    "TrelloManager": "tasks",
+    "TrelloSession": "session",
+    "handle_webhook": "webhook",
+    "is_webhook_event": "webhook",
+    "load_tenants": "orchestrator",
+    "run_tasks": "orchestrator",
+    "run_tenants": "orchestrator",
+}
+
+__all__ = [
+    "AsyncTrelloManager",
+    "BoardSnapshot",
+    "Deadline",
+    "PrivateTodos",
+    "ReplayDateTask",
+    "RunReport",
+    "ScheduledTodos",
+    "ShoppingTask",
+    "StateStore",
+    "TaskResult",
+    "Tenant",
+    "TrelloExecption",
+    "TrelloManager",
+    "TrelloSession",
+    "handle_webhook",
+    "is_webhook_event",
+    "load_tenants",
+    "run_tasks",
+    "run_tenants",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
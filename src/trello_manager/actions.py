@@ -0,0 +1,120 @@
+from typing import Any, Iterator, Optional
+from urllib.parse import quote
+
+import trello
+from trello import Board
+
+from .records import AnyCard
+from .snapshot import BoardSnapshot
+
+# maximum page size of the actions and cards endpoints and maximum number of urls in one batch request
+ACTIONS_LIMIT = 1000
+CARDS_LIMIT = 1000
+BATCH_LIMIT = 10
+# below every id of trello, paged requests of the cards endpoint return the cards newest first
+_FIRST_ID = "0" * 24
+
+
+def latest_action_id(board: Board) -> Optional[str]:
+    actions = board.client.fetch_json(f"/boards/{board.id}/actions", query_params={"limit": 1, "fields": "id"})
+    return actions[0]["id"] if actions else None
+
+
+def actions_since(board: Board, since: Optional[str]) -> Optional[list[dict[str, Any]]]:
+    """
+    The actions after the action ``since``, newest first. None if they don't fit into one page.
+    """
+    query_params: dict[str, Any] = {"limit": ACTIONS_LIMIT, "fields": "id,type,data"}
+    if since:
+        query_params["since"] = since
+    actions: list[dict[str, Any]] = board.client.fetch_json(f"/boards/{board.id}/actions", query_params=query_params)
+    return actions if len(actions) < ACTIONS_LIMIT else None
+
+
+def closed_card_ids_since(board: Board, since: str) -> tuple[list[str], Optional[str]]:
+    """
+    Reads the ``updateCard:closed`` actions after the checkpoint ``since`` (an action id), page by page.
+
+    :return: ids of the cards archived since the checkpoint, the id of the newest action read
+    """
+    card_ids: list[str] = []
+    newest: Optional[str] = None
+    before: Optional[str] = None
+    while True:
+        query_params = {"filter": "updateCard:closed", "since": since, "limit": ACTIONS_LIMIT,
+                        "fields": "id,data"}
+        if before:
+            query_params["before"] = before
+        actions = board.client.fetch_json(f"/boards/{board.id}/actions", query_params=query_params)
+        for action in actions:
+            card = action["data"]["card"]
+            if card.get("closed") and card["id"] not in card_ids:
+                card_ids.append(card["id"])
+        if actions:
+            newest = newest or actions[0]["id"]
+            before = actions[-1]["id"]
+        if len(actions) < ACTIONS_LIMIT:
+            return card_ids, newest
+
+
+def fetch_card_json(client: trello.TrelloClient, card_fields: str, card_ids: list[str]) -> list[dict[str, Any]]:
+    """
+    The raw cards with batch requests of up to ``BATCH_LIMIT`` cards, deleted cards are left out. Independent
+    of a snapshot, so it can be fetched at the same time as one.
+    """
+    # the urls of a batch are separated by commas, the ones of the fields are escaped
+    fields = quote(card_fields, safe="")
+    cards_json = []
+    for start in range(0, len(card_ids), BATCH_LIMIT):
+        urls = ",".join(f"/cards/{card_id}?fields={fields}" for card_id in card_ids[start:start + BATCH_LIMIT])
+        for response in client.fetch_json("/batch", query_params={"urls": urls}):
+            card_json = response.get("200")
+            if card_json:
+                cards_json.append(card_json)
+    return cards_json
+
+
+def fetch_cards(snapshot: BoardSnapshot, card_ids: list[str]) -> list[AnyCard]:
+    """
+    Fetches the cards in the form of the snapshot, see ``fetch_card_json``.
+    """
+    return [snapshot.card_from_json(card_json)
+            for card_json in fetch_card_json(snapshot.board.client, snapshot.card_fields, card_ids)]
+
+
+def iter_closed_cards(board: Board, card_fields: str, since: Optional[str] = None,
+                      page_size: int = CARDS_LIMIT, list_id: Optional[str] = None) -> Iterator[dict[str, Any]]:
+    """
+    The raw archived cards of the board, newest first, page by page. A page holds at most ``CARDS_LIMIT``
+    cards, the next one starts before the oldest card of the last one, so only one page is held at a time.
+
+    :param since: id of a card or an action, only the cards created after it
+    :param list_id: only the archive of this list, the pages of the list endpoint
+    """
+    path = f"/lists/{list_id}/cards/closed" if list_id else f"/boards/{board.id}/cards/closed"
+    before: Optional[str] = None
+    while True:
+        query_params: dict[str, Any] = {"fields": card_fields, "limit": page_size, "since": since or _FIRST_ID}
+        if before:
+            query_params["before"] = before
+        page = board.client.fetch_json(path, query_params=query_params)
+        if before and page and page[-1]["id"] >= before:
+            # the endpoint ignored ``before``, the same page again would never end
+            return
+        yield from page
+        if len(page) < page_size:
+            return
+        before = page[-1]["id"]
+
+
+def scan_closed_cards(snapshot: BoardSnapshot, label_ids: Optional[set[str]] = None,
+                      list_id: Optional[str] = None, since: Optional[str] = None) -> Iterator[AnyCard]:
+    """
+    The archived cards of the board with one of the labels, in the form of the snapshot. The labels are
+    checked on the raw cards of each page, only the matching ones are turned into cards. With ``list_id``
+    only the archive of the list is paged, not the one of the whole board.
+    """
+    for card_json in iter_closed_cards(snapshot.board, snapshot.card_fields, since, list_id=list_id):
+        if label_ids is not None and label_ids.isdisjoint(card_json.get("idLabels") or ()):
+            continue
+        yield snapshot.card_from_json(card_json)
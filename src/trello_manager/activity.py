@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from typing import Any, NamedTuple, Optional
+
+from trello import Board
+
+
+class BoardActivity(NamedTuple):
+    date_last_activity: Optional[str]
+    last_action_id: Optional[str]
+
+
+class CachedRun(NamedTuple):
+    activity: BoardActivity
+    # unix timestamp from which on the task has to run again, even without activity on the board
+    valid_until: Optional[float] = None
+
+
+def fetch_board_activity(board: Board) -> BoardActivity:
+    """
+    One cheap request for the last activity and the id of the last action on the board.
+    """
+    json_obj = board.client.fetch_json(f"/boards/{board.id}",
+                                       query_params={"fields": "dateLastActivity",
+                                                     "actions": "all",
+                                                     "actions_limit": 1,
+                                                     "action_fields": "id"})
+    actions = json_obj.get("actions") or []
+    return BoardActivity(json_obj.get("dateLastActivity"), actions[0]["id"] if actions else None)
+
+
+class BoardActivityCache:
+    """
+    Remembers the board activity after the last run of every task and the action checkpoints of the
+    incremental scans in a JSON file, both keyed by board id. The file is rewritten atomically on every change.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, CachedRun]] = {}
+        self._checkpoints: dict[str, dict[str, str]] = {}
+        self._load()
+
+    def _read(self) -> Optional[dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                raw: dict[str, Any] = json.load(cache_file)
+                return raw
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, raw: dict[str, Any]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(raw, cache_file)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        raw = self._read()
+        if raw is None:
+            return
+        self._entries = {board_id: {task: CachedRun(BoardActivity(*entry["activity"]), entry.get("valid_until"))
+                                    for task, entry in tasks.items()}
+                         for board_id, tasks in raw.get("runs", {}).items()}
+        self._checkpoints = raw.get("checkpoints", {})
+
+    def _dump(self):
+        raw = {"runs": {board_id: {task: {"activity": list(entry.activity), "valid_until": entry.valid_until}
+                                   for task, entry in tasks.items()}
+                        for board_id, tasks in self._entries.items()},
+               "checkpoints": self._checkpoints}
+        self._write(raw)
+
+    def get(self, board_id: str, task: str) -> Optional[CachedRun]:
+        with self._lock:
+            return self._entries.get(board_id, {}).get(task)
+
+    def set(self, board_id: str, task: str, activity: BoardActivity, valid_until: Optional[float] = None):
+        with self._lock:
+            self._entries.setdefault(board_id, {})[task] = CachedRun(activity, valid_until)
+            self._dump()
+
+    def invalidate(self, board_id: str):
+        """
+        Forgets the runs of the board, the checkpoints stay valid.
+        """
+        with self._lock:
+            if self._entries.pop(board_id, None) is not None:
+                self._dump()
+
+    def get_checkpoint(self, board_id: str, name: str) -> Optional[str]:
+        with self._lock:
+            return self._checkpoints.get(board_id, {}).get(name)
+
+    def set_checkpoint(self, board_id: str, name: str, action_id: str):
+        with self._lock:
+            self._checkpoints.setdefault(board_id, {})[name] = action_id
+            self._dump()
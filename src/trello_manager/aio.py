@@ -0,0 +1,47 @@
+import asyncio
+import weakref
+from typing import Any, Optional
+
+from .orchestrator import SNAPSHOT_MAX_AGE, TaskResult, run_task
+from .session import TrelloSession
+from .tasks import TrelloManager
+
+# the tasks on one board of a session run one after another, the locks belong to the event loop they are used in
+_BOARD_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[TrelloSession, str], asyncio.Lock]]" \
+    = weakref.WeakKeyDictionary()
+
+
+def _board_lock(session: TrelloSession, board_name: str) -> asyncio.Lock:
+    locks = _BOARD_LOCKS.setdefault(asyncio.get_running_loop(), {})
+    return locks.setdefault((session, board_name), asyncio.Lock())
+
+
+class AsyncTrelloManager:  # pylint: disable=too-few-public-methods
+    """
+    A task as coroutine, for callers with an event loop. Several of them can be awaited with ``asyncio.gather``,
+    their requests overlap on the pooled, rate limited session while the event loop stays free. Tasks on the
+    same board of a session share its snapshot, they wait for each other like in ``run_tasks``. Without a
+    session the shared one of the credentials of the task is used. The ``run`` of the tasks stays the
+    synchronous API, the coroutine wraps it.
+
+    :param options: passed on to the task, e.g. ``board_name`` or ``dry_run``
+    """
+
+    def __init__(self, task_class: type[TrelloManager], session: Optional[TrelloSession] = None, **options: Any):
+        self.task_class = task_class
+        self.session = session
+        self.options = options
+
+    async def run(self) -> TaskResult:
+        """
+        :return: like ``run_task``, an error is part of the result
+        """
+        task_class = self.task_class
+        session = self.session
+        if session is None:
+            session = self.session = await asyncio.to_thread(
+                TrelloSession.shared, task_class._key, task_class._secret,  # pylint: disable=protected-access
+                snapshot_max_age=SNAPSHOT_MAX_AGE)
+        board_name = self.options.get("board_name") or task_class._board_name  # pylint: disable=protected-access
+        async with _board_lock(session, board_name):
+            return await asyncio.to_thread(run_task, task_class, session, **self.options)
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import functools
+import io
+import json
+import platform
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from trello import Board, List
+
+from .fake import FakeTrello
+from .records import CardRecord
+from .replay import plan_dues, replay_days
+from .session import TrelloSession
+from .tasks import PrivateTodos, ReplayDateTask, ShoppingTask, TrelloManager
+
+_KEY = "benchmark_key"
+_SECRET = "benchmark_secret"
+
+# methods of the tasks measured as phases, they don't call each other, so the phases don't overlap
+PHASES: dict[type[TrelloManager], list[str]] = {
+    ShoppingTask: ["refresh", "_get_archived_cards", "_move_to_category", "_sort_list", "mutations.flush"],
+    ReplayDateTask: ["refresh", "_extract_from_archive", "_schedule_list", "mutations.flush"],
+    PrivateTodos: ["refresh", "_archived_today", "create_todo"],
+}
+
+
+class PhaseRecorder:
+    """
+    Records requests, bytes and wall time of the fake per phase. Repeated calls of a phase add up.
+    """
+
+    def __init__(self, fake: FakeTrello):
+        self.fake = fake
+        self.phases: dict[str, dict[str, Any]] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        calls = Counter(self.fake.calls)
+        bytes_transferred = self.fake.bytes_transferred
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            endpoints = Counter(self.fake.calls)
+            endpoints.subtract(calls)
+            stats = self.phases.setdefault(name, {"calls": 0, "requests": 0, "bytes": 0, "seconds": 0.0,
+                                                  "endpoints": Counter()})
+            stats["calls"] += 1
+            stats["requests"] += sum(endpoints.values())
+            stats["bytes"] += self.fake.bytes_transferred - bytes_transferred
+            stats["seconds"] += time.perf_counter() - start
+            stats["endpoints"].update(+endpoints)
+
+    def wrap(self, obj: Any, path: str):
+        """
+        Measures every call of the method at the dotted ``path`` below ``obj`` as phase ``path``.
+        """
+        *attributes, method_name = path.split(".")
+        for attribute in attributes:
+            obj = getattr(obj, attribute)
+        method: Callable = getattr(obj, method_name)
+
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            with self.phase(path):
+                return method(*args, **kwargs)
+
+        setattr(obj, method_name, measured)
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        return {name: {**stats, "seconds": round(stats["seconds"], 6), "endpoints": dict(stats["endpoints"])}
+                for name, stats in self.phases.items()}
+
+
+def _fill_lists(fake: FakeTrello, board_id: str, names: list[str], lists: int) -> list[str]:
+    names = names + [f"Liste {idx}" for idx in range(max(lists - len(names), 0))]
+    return [fake.add_list(board_id, name) for name in names]
+
+
+def build_shopping_board(fake: FakeTrello, name: str, lists: int, open_cards: int, closed_cards: int,
+                         rng: random.Random) -> str:
+    board_id = fake.add_board(name)
+    list_ids = _fill_lists(fake, board_id, ["Wichtiges Einkaufen",
+                                            "Gerade nicht kaufen (Lebensmittel)",
+                                            "Gerade nicht kaufen (Drogerie)"], lists)
+    label_ids = [fake.add_label(board_id, label) for label in ("Lebensmittel", "Drogerie", "Getränke")]
+    for idx in range(open_cards):
+        fake.add_card(list_ids[idx % len(list_ids)], f"Artikel {rng.randrange(open_cards):05d}",
+                      pos=rng.uniform(1, 65536.0 * open_cards), label_ids=[rng.choice(label_ids)])
+    for idx in range(closed_cards):
+        # a quarter of the archived cards has no category and stays in the archive
+        labels = [rng.choice(label_ids)] if rng.random() < 0.75 else []
+        fake.add_card(list_ids[0], f"Archiviert {idx:05d}", pos=rng.uniform(1, 65536.0 * closed_cards),
+                      label_ids=labels, closed=True)
+    return board_id
+
+
+def build_tasks_board(fake: FakeTrello, name: str, lists: int, open_cards: int, closed_cards: int,
+                      rng: random.Random, today: datetime) -> str:
+    board_id = fake.add_board(name)
+    list_ids = _fill_lists(fake, board_id, ["ToDo", "Replay", "Backlog", "Dailys"], lists)
+    replay_label = fake.add_label(board_id, "replay")
+    fake.add_label(board_id, "Orga")
+    for idx in range(open_cards):
+        due = (today + timedelta(days=rng.randrange(60))).isoformat() if rng.random() < 0.5 else None
+        fake.add_card(list_ids[idx % len(list_ids)], f"Aufgabe {idx:05d}",
+                      pos=rng.uniform(1, 65536.0 * open_cards), due=due)
+    for idx in range(closed_cards):
+        # half of the archived todos are replays
+        labels = [replay_label] if rng.random() < 0.5 else []
+        fake.add_card(list_ids[0], f"Erledigt {idx:05d} ({rng.randrange(1, 30)} d)",
+                      pos=rng.uniform(1, 65536.0 * closed_cards), label_ids=labels, closed=True)
+    return board_id
+
+
+def run_task(task_class: type[TrelloManager], fake: FakeTrello) -> dict[str, Any]:
+    recorder = PhaseRecorder(fake)
+    with contextlib.redirect_stdout(io.StringIO()), recorder.phase("total"):
+        with recorder.phase("init"):
+            task = task_class(TrelloSession(_KEY, _SECRET))
+        for path in PHASES[task_class]:
+            recorder.wrap(task, path)
+        task.run()  # type: ignore
+    phases = recorder.report()
+    return {"total": phases.pop("total"), "phases": phases}
+
+
+def run_benchmark(lists: int = 10, open_cards: int = 200, closed_cards: int = 1000, latency: float = 0.0,
+                  seed: int = 1, date: str = "2024-01-09") -> dict[str, Any]:
+    """
+    Runs every task once against a fresh synthetic board on the in-process fake of trello. The date is
+    frozen, so the request counts only change with the code.
+    """
+    from freezegun import freeze_time  # pylint: disable=import-outside-toplevel
+
+    results: dict[str, Any] = {
+        "parameters": {"lists": lists, "open_cards": open_cards, "closed_cards": closed_cards,
+                       "latency": latency, "seed": seed, "date": date},
+        "python": platform.python_version(),
+        "tasks": {},
+    }
+    for task_class in PHASES:
+        fake = FakeTrello()
+        rng = random.Random(seed)
+        with freeze_time(date, tick=True), fake.install(_KEY, _SECRET):
+            if task_class is ShoppingTask:
+                build_shopping_board(fake, task_class._board_name,  # pylint: disable=protected-access
+                                     lists, open_cards, closed_cards, rng)
+            else:
+                build_tasks_board(fake, task_class._board_name,  # pylint: disable=protected-access
+                                  lists, open_cards, closed_cards, rng, datetime.now())
+            fake.latency = latency
+            results["tasks"][task_class.__name__] = run_task(task_class, fake)
+    return results
+
+
+def _replay_record(trello_list: List, idx: int, rng: random.Random, now: datetime) -> CardRecord:
+    # four out of five cards have a due date within the next three months
+    due = (now + timedelta(minutes=rng.randrange(90 * 24 * 60))).isoformat() + "Z" if rng.random() < 0.8 else None
+    return CardRecord(trello_list, {"id": f"{idx:024x}", "name": f"Aufgabe {idx:05d} ({rng.randrange(1, 30)} d)",
+                                    "idList": trello_list.id, "idLabels": [], "due": due, "pos": float(idx),
+                                    "closed": False}, {})
+
+
+def run_replay_benchmark(cards: int = 10000, repeat: int = 5, seed: int = 1) -> dict[str, Any]:
+    """
+    Times the scheduling stage of the replay task on one list of compact card records, without any
+    requests, so it can be watched as the Tasks board grows. The best of ``repeat`` runs counts.
+    """
+    rng = random.Random(seed)
+    trello_list = List(Board(client=None, board_id="board"), "list", "Replay")
+    now = datetime(2024, 1, 9)
+    records = [_replay_record(trello_list, idx, rng, now) for idx in range(cards)]
+    deadline = (now + timedelta(days=2)).timestamp()
+    stages: dict[str, Callable[[], Any]] = {
+        "replay_days": lambda: [replay_days(record.name) for record in records],
+        "plan_dues": lambda: plan_dues(records, deadline),
+    }
+    results = {}
+    for name, stage in stages.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stage()
+            timings.append(time.perf_counter() - start)
+        results[name] = {"ms": round(min(timings) * 1000, 3), "us_per_card": round(min(timings) / cards * 1e6, 3)}
+    return {"cards": cards, "stages": results}
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Requests, bytes and wall time per task phase on synthetic "
+                                                 "boards, measured against an in-process fake of trello.")
+    parser.add_argument("--lists", type=int, default=10, help="lists per board")
+    parser.add_argument("--open", type=int, default=200, dest="open_cards", help="open cards per board")
+    parser.add_argument("--closed", type=int, default=1000, dest="closed_cards", help="archived cards per board")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per request")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--date", default="2024-01-09", help="frozen date of the run")
+    parser.add_argument("--replay-cards", type=int, default=10000,
+                        help="cards of the list in the micro benchmark of the replay scheduling")
+    parser.add_argument("--output", help="file for the JSON result, default is stdout")
+    args = parser.parse_args(argv)
+    results = run_benchmark(args.lists, args.open_cards, args.closed_cards, args.latency, args.seed, args.date)
+    results["replay_scheduling"] = run_replay_benchmark(args.replay_cards, seed=args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import json
+import sys
+from typing import Any, Optional
+
+from .orchestrator import SNAPSHOT_MAX_AGE, run_tasks
+from .session import TrelloSession
+from .tasks import TASK_TYPES, TrelloManager
+
+
+def dry_run(task_classes: list[type[TrelloManager]], session: Optional[TrelloSession] = None) -> dict[str, Any]:
+    """
+    Runs the tasks without writing anything and collects their plans. The session of a real run keeps the
+    snapshot of a board for ``SNAPSHOT_MAX_AGE`` seconds, so tasks on the same board see the planned changes
+    of the tasks before them, like in a real run. A given session needs the same snapshot max age for this.
+
+    :return: the plans and the requests of the run, the reads sent and the planned writes
+    """
+    if not task_classes:
+        return {"requests": 0, "reads": 0, "writes": 0, "tasks": {}}
+    first_task = task_classes[0]
+    session = session or TrelloSession.from_env(first_task._key, first_task._secret,  # pylint: disable=protected-access
+                                                snapshot_max_age=SNAPSHOT_MAX_AGE)
+    requests_before = sum(session.instrumentation.requests.values())
+    plans = {}
+    for task_class in task_classes:
+        task = task_class(session, dry_run=True)
+        task.run()  # type: ignore
+        assert task.plan is not None
+        plans[task_class.__name__] = task.plan.to_json()
+    reads = sum(session.instrumentation.requests.values()) - requests_before
+    writes = sum(plan["requests"] for plan in plans.values())
+    return {"requests": reads + writes, "reads": reads, "writes": writes, "tasks": plans}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Runs the tasks of the trello manager.")
+    parser.add_argument("tasks", nargs="*", help=f"tasks to run out of {', '.join(TASK_TYPES)}, all by default")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the planned changes and the number of requests of the run, without writing")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.tasks if name not in TASK_TYPES]
+    if unknown:
+        parser.error(f"unknown tasks: {', '.join(unknown)}")
+    task_classes = [TASK_TYPES[name] for name in args.tasks] or list(TASK_TYPES.values())
+    if args.dry_run:
+        first_task = task_classes[0]
+        session = TrelloSession.from_env(first_task._key, first_task._secret,  # pylint: disable=protected-access
+                                         snapshot_max_age=SNAPSHOT_MAX_AGE)
+        # stdout is left to the plan
+        session.instrumentation.stream = sys.stderr
+        json.dump(dry_run(task_classes, session), sys.stdout, indent=2, ensure_ascii=False, default=str)
+        print()
+        return 0
+    results = run_tasks(task_classes)
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import requests
+
+from .instrumentation import Instrumentation
+from .resilience import CircuitBreaker, Deadline, equal_jitter
+
+# Trello allows 300 requests per 10 seconds for each API key and 100 requests per 10 seconds for each token
+KEY_LIMIT = (300, 10.0)
+TOKEN_LIMIT = (100, 10.0)
+# a server error or a lost connection could have happened after the change, only these are sent again
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+# seconds a request may take without a deadline, py-trello sends its requests without a timeout
+REQUEST_TIMEOUT = 30.0
+# a request close to the deadline still gets this much time
+MIN_TIMEOUT = 1.0
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """
+    Thread safe token bucket, ``acquire`` blocks until a token is available.
+    """
+
+    def __init__(self, capacity: int, period: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Any] = time.sleep):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token and returns the time to wait until it is actually available."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            self._sleep(wait)
+
+    def drain(self):
+        """
+        Trello answered with 429 anyway, e.g. another client uses the same token. The requests of all
+        threads wait for the refill.
+        """
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0)
+
+
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def get_bucket(name: str, capacity: int, period: float) -> TokenBucket:
+    """Buckets are shared by name for the lifetime of the process."""
+    with _BUCKETS_LOCK:
+        if name not in _BUCKETS:
+            _BUCKETS[name] = TokenBucket(capacity, period)
+        return _BUCKETS[name]
+
+
+class RateLimitedHttpService:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Drop-in for the ``http_service`` of ``trello.TrelloClient``. Every request takes a token of each bucket.
+    Responses with status 429 are retried with jittered exponential backoff and drain the buckets, server
+    errors and lost connections as well for idempotent methods. The instrumentation gets the final status,
+    the latency including the retries and the number of retries of every request.
+
+    :param breaker: fails fast with ``CircuitOpenError`` after too many server errors in a row
+    :param deadline: no retry waits beyond it, the last response is returned instead. The timeout of every
+                     request ends with it, without a deadline it is ``REQUEST_TIMEOUT``
+    """
+
+    def __init__(self, buckets: list[TokenBucket], http_service: Any = requests,
+                 max_retries: int = 5, backoff: float = 1.0,
+                 sleep: Callable[[float], Any] = time.sleep,
+                 instrumentation: Optional[Instrumentation] = None,
+                 jitter: Callable[[float], float] = equal_jitter,
+                 breaker: Optional[CircuitBreaker] = None,
+                 deadline: Optional[Deadline] = None):
+        self.buckets = buckets
+        self.http_service = http_service
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self.instrumentation = instrumentation
+        self.jitter = jitter
+        self.breaker = breaker
+        self.deadline = deadline
+
+    def request(self, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        attempt = 0
+        status: Optional[int] = None
+        try:
+            while True:
+                if self.breaker:
+                    self.breaker.check()
+                for bucket in self.buckets:
+                    bucket.acquire()
+                try:
+                    response = self.http_service.request(method, url,
+                                                         **{**kwargs, "timeout": self._timeout(kwargs.get("timeout"))})
+                except (requests.ConnectionError, requests.Timeout):
+                    self._record(True)
+                    if not self._retry(method, None, attempt, self._backoff(attempt)):
+                        raise
+                    attempt += 1
+                    continue
+                status = response.status_code
+                self._record(status >= 500)
+                if not self._retry(method, status, attempt, self._retry_after(response, attempt)):
+                    return response
+                if status == 429:
+                    for bucket in self.buckets:
+                        bucket.drain()
+                attempt += 1
+        finally:
+            if self.instrumentation:
+                self.instrumentation.record_request(method, url, status, time.perf_counter() - start, attempt)
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        timeout = timeout or REQUEST_TIMEOUT
+        if self.deadline is None:
+            return timeout
+        return max(min(timeout, self.deadline.remaining()), MIN_TIMEOUT)
+
+    def _record(self, failed: bool):
+        if self.breaker:
+            self.breaker.record(failed)
+
+    def _retry(self, method: str, status: Optional[int], attempt: int, delay: float) -> bool:
+        """
+        Waits for the next attempt, if there is one.
+
+        :param status: None for a lost connection
+        """
+        retryable = status == 429 or ((status is None or status >= 500) and method.upper() in IDEMPOTENT_METHODS)
+        if not retryable or attempt >= self.max_retries:
+            return False
+        if self.deadline is not None and self.deadline.remaining() < delay:
+            return False
+        self._sleep(delay)
+        return True
+
+    def _backoff(self, attempt: int) -> float:
+        return self.jitter(self.backoff * 2.0 ** attempt)
+
+    def _retry_after(self, response, attempt: int) -> float:
+        try:
+            return float(response.headers["Retry-After"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return self._backoff(attempt)
+
+
+def rate_limited_service(api_key: str, token: str, http_service: Any = requests,
+                         instrumentation: Optional[Instrumentation] = None) -> RateLimitedHttpService:
+    return RateLimitedHttpService([get_bucket(f"key:{api_key}", *KEY_LIMIT),
+                                   get_bucket(f"token:{token}", *TOKEN_LIMIT)],
+                                  http_service=http_service, instrumentation=instrumentation,
+                                  breaker=CircuitBreaker())
+
+
+def gather(*calls: Callable[[], Any]) -> list[Any]:
+    """
+    Runs blocking calls, e.g. requests of the pooled session, at the same time in worker threads. The first
+    error of the calls is raised after all of them finished.
+
+    :return: the results in the order of the calls
+    """
+    with ThreadPoolExecutor(max_workers=max(len(calls), 1), thread_name_prefix="trello-read") as pool:
+        futures = [pool.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+
+class WriteExecutor:
+    """
+    Runs the submitted mutations one after another in the calling thread. ``join`` is the barrier
+    between phases of a task, it reraises the first error of the submitted mutations.
+    """
+
+    def __init__(self):
+        self._error: Optional[BaseException] = None
+
+    def submit(self, func: Callable, *args, **kwargs):
+        try:
+            func(*args, **kwargs)
+        except Exception as error:  # pylint: disable=broad-except
+            self._error = self._error or error
+
+    def join(self):
+        error, self._error = self._error, None
+        if error:
+            raise error
+
+    def shutdown(self):
+        self.join()
+
+
+class ThreadPoolWriteExecutor(WriteExecutor):
+    """
+    Runs independent mutations in parallel. Mutations of the same card have to be submitted as one callable
+    to keep their order.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        super().__init__()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trello-write")
+        self._futures: list[Future] = []
+
+    def submit(self, func: Callable, *args, **kwargs):
+        self._futures.append(self._pool.submit(func, *args, **kwargs))
+
+    def join(self):
+        futures, self._futures = self._futures, []
+        for future in futures:
+            error = future.exception()
+            if error:
+                self._error = self._error or error
+        super().join()
+
+    def shutdown(self):
+        try:
+            self.join()
+        finally:
+            self._pool.shutdown()
@@ -0,0 +1,468 @@
+import itertools
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from .executor import get_bucket
+from .instrumentation import endpoint_of
+
+_API_PREFIX = "/1/"
+_POS_STEP = 65536.0
+
+
+class FakeResponse:  # pylint: disable=too-few-public-methods
+    def __init__(self, status_code: int, payload: Any):
+        self.status_code = status_code
+        self.content: bytes = json.dumps(payload).encode("utf-8")
+        self.text: str = self.content.decode("utf-8")
+        self.headers: dict[str, str] = {"Content-Type": "application/json"}
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class FakeTrello:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    """
+    In-process stand-in for the Trello REST API. It replaces the ``requests`` module as ``http_service`` of
+    ``trello.TrelloClient`` and implements the boards/lists/cards/labels/checklists/actions endpoints used by
+    this project. Every request is counted per endpoint, e.g. ``GET boards/{id}``.
+    """
+
+    CARD_LIMIT = 1000
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.bytes_transferred = 0
+        self.boards: dict[str, dict] = {}
+        self.lists: dict[str, dict] = {}
+        self.cards: dict[str, dict] = {}
+        self.labels: dict[str, dict] = {}
+        self.checklists: dict[str, dict] = {}
+        self.actions: list[dict] = []
+        self._errors: list[int] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._routes: list[tuple[str, re.Pattern, Callable]] = [
+            ("GET", re.compile(r"^members/me/boards/?$"), self._get_member_boards),
+            ("POST", re.compile(r"^boards/?$"), self._post_board),
+            ("GET", re.compile(r"^boards/(\w+)/?$"), self._get_board),
+            ("DELETE", re.compile(r"^boards/(\w+)/?$"), self._delete_board),
+            ("GET", re.compile(r"^boards/(\w+)/dateLastActivity$"), self._get_board_last_activity),
+            ("GET", re.compile(r"^boards/(\w+)/lists$"), self._get_board_lists),
+            ("GET", re.compile(r"^boards/(\w+)/labels$"), self._get_board_labels),
+            ("GET", re.compile(r"^boards/(\w+)/checklists$"), self._get_board_checklists),
+            ("GET", re.compile(r"^boards/(\w+)/cards/?(\w*)$"), self._get_board_cards),
+            ("GET", re.compile(r"^boards/(\w+)/actions$"), self._get_board_actions),
+            ("POST", re.compile(r"^lists/?$"), self._post_list),
+            ("GET", re.compile(r"^lists/(\w+)$"), self._get_list),
+            ("PUT", re.compile(r"^lists/(\w+)/(\w+)$"), self._put_list_attribute),
+            ("GET", re.compile(r"^lists/(\w+)/cards/?(\w*)$"), self._get_list_cards),
+            ("POST", re.compile(r"^lists/(\w+)/archiveAllCards$"), self._archive_all_cards),
+            ("POST", re.compile(r"^labels/?$"), self._post_label),
+            ("POST", re.compile(r"^cards/?$"), self._post_card),
+            ("GET", re.compile(r"^cards/(\w+)$"), self._get_card),
+            ("PUT", re.compile(r"^cards/(\w+)$"), self._put_card),
+            ("DELETE", re.compile(r"^cards/(\w+)$"), self._delete_card),
+            ("PUT", re.compile(r"^cards/(\w+)/(\w+)$"), self._put_card_attribute),
+            ("POST", re.compile(r"^cards/(\w+)/idLabels$"), self._post_card_label),
+            ("GET", re.compile(r"^cards/(\w+)/checklists$"), self._get_card_checklists),
+            ("POST", re.compile(r"^cards/(\w+)/checklists$"), self._post_card_checklist),
+            ("GET", re.compile(r"^cards/(\w+)/(pluginData|attachments|actions)$"), self._get_card_empty),
+            ("POST", re.compile(r"^checklists/(\w+)/checkItems$"), self._post_check_item),
+            ("GET", re.compile(r"^batch$"), self._get_batch),
+        ]
+
+    # test helpers
+
+    @contextmanager
+    def install(self, api_key: str, token: str) -> Iterator["FakeTrello"]:
+        """
+        Routes all requests of ``requests`` to the fake and lifts the rate limits of the given credentials,
+        the real limits would only slow the tests down.
+        """
+        get_bucket(f"key:{api_key}", sys.maxsize, 1.0)
+        get_bucket(f"token:{token}", sys.maxsize, 1.0)
+        with mock.patch.object(requests, "request", self.request), \
+                mock.patch.object(requests.Session, "request",
+                                  lambda _session, *args, **kwargs: self.request(*args, **kwargs)):
+            yield self
+
+    def inject_errors(self, *status_codes: int):
+        """The next requests are answered with these status codes, one per request."""
+        self._errors.extend(status_codes)
+
+    def reset_calls(self):
+        self.calls.clear()
+        self.bytes_transferred = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    # fixtures, written straight into the state of the fake without counting a request
+
+    def add_board(self, name: str) -> str:
+        return str(self._post_board(body={"name": name})["id"])
+
+    def add_list(self, board_id: str, name: str) -> str:
+        return str(self._post_list(body={"name": name, "idBoard": board_id})["id"])
+
+    def add_label(self, board_id: str, name: str, color: Optional[str] = None) -> str:
+        return str(self._post_label(body={"name": name, "color": color, "idBoard": board_id})["id"])
+
+    def add_card(self, list_id: str, name: str, pos: float, due: Optional[str] = None,
+                 label_ids: Optional[list[str]] = None, closed: bool = False) -> str:
+        """
+        Cheap even for large boards, no position is resolved and no action is recorded.
+        """
+        return str(self._new_card(self.lists[list_id], name, pos, due, label_ids, closed)["id"])
+
+    # requests interface
+
+    def request(self, method: str, url: str, params: Optional[dict] = None, data: Optional[str] = None,
+                **_) -> FakeResponse:
+        split_url = urlsplit(url)
+        path = split_url.path
+        if path.startswith(_API_PREFIX):
+            path = path[len(_API_PREFIX):]
+        path = path.lstrip("/")
+        query = dict(parse_qsl(split_url.query))
+        query.update({key: value for key, value in (params or {}).items() if value is not None})
+        body = json.loads(data) if data else {}
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[f"{method} {endpoint_of(path)}"] += 1
+            response = self._dispatch(method, path, query, body)
+            self.bytes_transferred += len(response.content)
+        return response
+
+    def _dispatch(self, method: str, path: str, query: dict, body: dict) -> FakeResponse:
+        if self._errors:
+            return FakeResponse(self._errors.pop(0), {"message": "injected error"})
+        for route_method, pattern, handler in self._routes:
+            hit = pattern.match(path)
+            if route_method == method and hit:
+                try:
+                    return FakeResponse(200, handler(*hit.groups(), query=query, body=body))
+                except KeyError as error:
+                    return FakeResponse(404, {"message": f"not found: {error}"})
+        return FakeResponse(404, {"message": f"unknown endpoint {method} {path}"})
+
+    # helpers
+
+    def _new_id(self) -> str:
+        return f"{int(time.time()):08x}{next(self._ids):016x}"
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+    def _touch(self, board_id: str):
+        self.boards[board_id]["dateLastActivity"] = self._now()
+
+    def _add_action(self, action_type: str, card: dict, data: dict):
+        action = {"id": self._new_id(),
+                  "type": action_type,
+                  "date": self._now(),
+                  "idMemberCreator": "fake",
+                  "data": {"card": {"id": card["id"], "name": card["name"], "idList": card["idList"],
+                                    "closed": card["closed"]},
+                           "board": {"id": card["idBoard"]},
+                           **data}}
+        self.actions.append(action)
+        self.boards[card["idBoard"]]["idLastAction"] = action["id"]
+        self._touch(card["idBoard"])
+
+    @staticmethod
+    def _normalize_due(due: Any) -> Optional[str]:
+        if due in (None, "", "null"):
+            return None
+        parsed = datetime.fromisoformat(str(due))
+        if not parsed.tzinfo:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return f"{parsed.astimezone(timezone.utc):%Y-%m-%dT%H:%M:%S.000Z}"
+
+    @staticmethod
+    def _split_ids(value: Any) -> list[str]:
+        if isinstance(value, list):
+            return value
+        return [item for item in str(value or "").split(",") if item]
+
+    def _resolve_pos(self, pos: Any, siblings: list[dict]) -> float:
+        positions = [sibling["pos"] for sibling in siblings]
+        if pos in (None, "bottom"):
+            return max(positions, default=0) + _POS_STEP
+        if pos == "top":
+            return min(positions, default=_POS_STEP * 2) / 2
+        return float(pos)
+
+    def _list_cards_of(self, list_id: str) -> list[dict]:
+        return [card for card in self.cards.values() if card["idList"] == list_id and not card["closed"]]
+
+    @staticmethod
+    def _filter_closed(items: list[dict], item_filter: Optional[str]) -> list[dict]:
+        if item_filter == "closed":
+            return [item for item in items if item["closed"]]
+        if item_filter in ("all", "visible"):
+            return items
+        return [item for item in items if not item["closed"]]
+
+    def _card_json(self, card: dict, fields: Optional[str] = None) -> dict:
+        checklists = [checklist for checklist in self.checklists.values() if checklist["idCard"] == card["id"]]
+        card_json = dict(card)
+        card_json["labels"] = [self.labels[label_id] for label_id in card["idLabels"] if label_id in self.labels]
+        card_json["idChecklists"] = [checklist["id"] for checklist in checklists]
+        card_json["badges"] = {"checkItems": sum(len(checklist["checkItems"]) for checklist in checklists),
+                               "comments": 0,
+                               "attachments": 0}
+        if fields and fields != "all":
+            return {key: card_json[key] for key in ["id", *fields.split(",")] if key in card_json}
+        return card_json
+
+    def _cards_page(self, cards: list[dict], query: dict) -> list[dict]:
+        cards = sorted(cards, key=lambda card: card["pos"])
+        if "before" in query or "since" in query:
+            if "before" in query:
+                cards = [card for card in cards if card["id"] < query["before"]]
+            if "since" in query:
+                cards = [card for card in cards if card["id"] > query["since"]]
+            cards = sorted(cards, key=lambda card: card["id"], reverse=True)
+        limit = min(int(query.get("limit", self.CARD_LIMIT)), self.CARD_LIMIT)
+        return [self._card_json(card, query.get("fields")) for card in cards[:limit]]
+
+    # boards
+
+    def _get_member_boards(self, query: dict, **_) -> list[dict]:
+        return self._filter_closed(list(self.boards.values()), query.get("filter", "all"))
+
+    def _post_board(self, body: dict, **_) -> dict:
+        board = {"id": self._new_id(), "name": body["name"], "desc": "", "closed": False,
+                 "url": "https://trello.com/b/fake", "dateLastActivity": self._now(), "idLastAction": None}
+        self.boards[board["id"]] = board
+        return board
+
+    def _delete_board(self, board_id: str, **_) -> dict:
+        del self.boards[board_id]
+        for store in (self.lists, self.cards, self.labels, self.checklists):
+            for item_id in [key for key, item in store.items() if item["idBoard"] == board_id]:
+                del store[item_id]
+        return {"_value": None}
+
+    def _get_board(self, board_id: str, query: dict, **_) -> dict:
+        board = dict(self.boards[board_id])
+        if query.get("fields") and query["fields"] != "all":
+            board = {key: board[key] for key in ["id", *query["fields"].split(",")] if key in board}
+        if "lists" in query and query["lists"] != "none":
+            board["lists"] = self._get_board_lists(board_id, query={"filter": query["lists"]})
+        if "labels" in query and query["labels"] != "none":
+            board["labels"] = self._get_board_labels(board_id, query={})
+        if "cards" in query and query["cards"] != "none":
+            cards = [card for card in self.cards.values() if card["idBoard"] == board_id]
+            board["cards"] = self._cards_page(self._filter_closed(cards, query["cards"]),
+                                              {"fields": query.get("card_fields")})
+        if "checklists" in query and query["checklists"] != "none":
+            board["checklists"] = self._get_board_checklists(board_id)
+        if "actions" in query:
+            board["actions"] = self._get_board_actions(board_id, query={"filter": query["actions"],
+                                                                        "limit": query.get("actions_limit", 50)})
+        return board
+
+    def _get_board_last_activity(self, board_id: str, **_) -> dict:
+        return {"_value": self.boards[board_id]["dateLastActivity"]}
+
+    def _get_board_lists(self, board_id: str, query: dict, **_) -> list[dict]:
+        lists = [trello_list for trello_list in self.lists.values() if trello_list["idBoard"] == board_id]
+        return sorted(self._filter_closed(lists, query.get("filter")), key=lambda trello_list: trello_list["pos"])
+
+    def _get_board_labels(self, board_id: str, **_) -> list[dict]:
+        return [label for label in self.labels.values() if label["idBoard"] == board_id]
+
+    def _get_board_checklists(self, board_id: str, **_) -> list[dict]:
+        return [checklist for checklist in self.checklists.values() if checklist["idBoard"] == board_id]
+
+    def _get_board_cards(self, board_id: str, card_filter: str, query: dict, **_) -> list[dict]:
+        cards = [card for card in self.cards.values() if card["idBoard"] == board_id]
+        return self._cards_page(self._filter_closed(cards, card_filter or query.get("filter")), query)
+
+    def _get_board_actions(self, board_id: str, query: dict, **_) -> list[dict]:
+        filters = set(str(query.get("filter", "all")).split(","))
+        actions = []
+        for action in self.actions:
+            if action["data"]["board"]["id"] != board_id:
+                continue
+            if "all" not in filters and action["type"] not in filters and \
+                    not any(self._matches_action_filter(action, action_filter) for action_filter in filters):
+                continue
+            if "since" in query and action["id"] <= query["since"]:
+                continue
+            if "before" in query and action["id"] >= query["before"]:
+                continue
+            actions.append(action)
+        actions.reverse()
+        return actions[:int(query.get("limit", 50))]
+
+    @staticmethod
+    def _matches_action_filter(action: dict, action_filter: str) -> bool:
+        if ":" not in action_filter:
+            return False
+        action_type, field = action_filter.split(":", 1)
+        return action["type"] == action_type and field in action["data"].get("old", {})
+
+    # lists
+
+    def _post_list(self, body: dict, **_) -> dict:
+        siblings = [trello_list for trello_list in self.lists.values() if trello_list["idBoard"] == body["idBoard"]]
+        trello_list = {"id": self._new_id(), "name": body["name"], "closed": False, "idBoard": body["idBoard"],
+                       "pos": self._resolve_pos(body.get("pos"), siblings), "subscribed": False}
+        self.lists[trello_list["id"]] = trello_list
+        self._touch(body["idBoard"])
+        return trello_list
+
+    def _get_list(self, list_id: str, **_) -> dict:
+        return self.lists[list_id]
+
+    def _put_list_attribute(self, list_id: str, attribute: str, body: dict, **_) -> dict:
+        trello_list = self.lists[list_id]
+        value = body["value"]
+        trello_list[attribute] = value in (True, "true") if attribute == "closed" else value
+        self._touch(trello_list["idBoard"])
+        return trello_list
+
+    def _get_list_cards(self, list_id: str, card_filter: str, query: dict, **_) -> list[dict]:
+        cards = [card for card in self.cards.values() if card["idList"] == list_id]
+        return self._cards_page(self._filter_closed(cards, card_filter or query.get("filter")), query)
+
+    def _archive_all_cards(self, list_id: str, **_) -> dict:
+        for card in self._list_cards_of(list_id):
+            self._update_card(card, {"closed": True})
+        return {}
+
+    # labels
+
+    def _post_label(self, body: dict, **_) -> dict:
+        label = {"id": self._new_id(), "name": body["name"], "color": body.get("color"), "idBoard": body["idBoard"]}
+        self.labels[label["id"]] = label
+        self._touch(body["idBoard"])
+        return label
+
+    # cards
+
+    def _new_card(self, trello_list: dict, name: str, pos: float, due: Any = None,
+                  label_ids: Optional[list[str]] = None, closed: bool = False) -> dict:
+        card = {"id": self._new_id(), "name": name, "desc": "", "due": self._normalize_due(due),
+                "dueComplete": False, "closed": closed,
+                "url": "https://trello.com/c/fake", "shortUrl": "https://trello.com/c/fake",
+                "pos": pos, "idMembers": [], "idLabels": label_ids or [], "idBoard": trello_list["idBoard"],
+                "idList": trello_list["id"], "idShort": len(self.cards) + 1, "dateLastActivity": self._now()}
+        self.cards[card["id"]] = card
+        return card
+
+    def _post_card(self, body: dict, **_) -> dict:
+        trello_list = self.lists[body["idList"]]
+        card = self._new_card(trello_list, body.get("name", ""),
+                              self._resolve_pos(body.get("pos"), self._list_cards_of(trello_list["id"])),
+                              due=body.get("due"), label_ids=self._split_ids(body.get("idLabels")))
+        card["desc"] = body.get("desc") or ""
+        source = body.get("idCardSource")
+        if source:
+            for checklist in [checklist for checklist in self.checklists.values() if checklist["idCard"] == source]:
+                self._copy_checklist(checklist, card)
+        self._add_action("createCard", card, {"list": {"id": card["idList"]}})
+        return self._card_json(card)
+
+    def _copy_checklist(self, checklist: dict, card: dict):
+        copy = {"id": self._new_id(), "name": checklist["name"], "idCard": card["id"], "idBoard": card["idBoard"],
+                "pos": checklist["pos"], "checkItems": []}
+        for item in checklist["checkItems"]:
+            copy["checkItems"].append({**item, "id": self._new_id(), "idChecklist": copy["id"]})
+        self.checklists[copy["id"]] = copy
+
+    def _get_card(self, card_id: str, query: dict, **_) -> dict:
+        return self._card_json(self.cards[card_id], query.get("fields"))
+
+    def _update_card(self, card: dict, changes: dict):
+        old = {key: card.get(key) for key in changes}
+        for key, value in changes.items():
+            if key == "due":
+                value = self._normalize_due(value)
+            elif key == "pos":
+                target_list = changes.get("idList", card["idList"])
+                value = self._resolve_pos(value, [sibling for sibling in self._list_cards_of(target_list)
+                                                  if sibling["id"] != card["id"]])
+            elif key == "idLabels":
+                value = self._split_ids(value)
+            elif key == "closed" and isinstance(value, str):
+                value = value == "true"
+            card[key] = value
+        card["dateLastActivity"] = self._now()
+        self._add_action("updateCard", card, {"old": old})
+
+    def _put_card(self, card_id: str, query: dict, body: dict, **_) -> dict:
+        card = self.cards[card_id]
+        self._update_card(card, {**query, **body})
+        return self._card_json(card)
+
+    def _put_card_attribute(self, card_id: str, attribute: str, body: dict, **_) -> dict:
+        card = self.cards[card_id]
+        self._update_card(card, {attribute: body["value"]})
+        return self._card_json(card)
+
+    def _delete_card(self, card_id: str, **_) -> dict:
+        del self.cards[card_id]
+        return {"_value": None}
+
+    def _post_card_label(self, card_id: str, body: dict, **_) -> list[str]:
+        card = self.cards[card_id]
+        if body["value"] not in card["idLabels"]:
+            card["idLabels"].append(body["value"])
+        self._touch(card["idBoard"])
+        return list(card["idLabels"])
+
+    def _get_card_checklists(self, card_id: str, **_) -> list[dict]:
+        return [checklist for checklist in self.checklists.values() if checklist["idCard"] == card_id]
+
+    def _post_card_checklist(self, card_id: str, body: dict, **_) -> dict:
+        card = self.cards[card_id]
+        siblings = self._get_card_checklists(card_id)
+        checklist = {"id": self._new_id(), "name": body.get("name", "Checklist"), "idCard": card_id,
+                     "idBoard": card["idBoard"], "pos": self._resolve_pos(body.get("pos"), siblings),
+                     "checkItems": []}
+        self.checklists[checklist["id"]] = checklist
+        self._touch(card["idBoard"])
+        return checklist
+
+    @staticmethod
+    def _get_card_empty(*_, **__) -> list:
+        return []
+
+    def _post_check_item(self, checklist_id: str, body: dict, **_) -> dict:
+        checklist = self.checklists[checklist_id]
+        item = {"id": self._new_id(), "name": body["name"], "idChecklist": checklist_id,
+                "state": "complete" if body.get("checked") else "incomplete",
+                "pos": self._resolve_pos(body.get("pos"), checklist["checkItems"])}
+        checklist["checkItems"].append(item)
+        # trello returns the items in the order of their positions
+        checklist["checkItems"].sort(key=lambda check_item: check_item["pos"])
+        return item
+
+    # batch
+
+    def _get_batch(self, query: dict, **_) -> list[dict]:
+        responses = []
+        for url in query["urls"].split(",")[:10]:
+            split_url = urlsplit(url)
+            response = self._dispatch("GET", split_url.path.strip("/"), dict(parse_qsl(split_url.query)), {})
+            responses.append({str(response.status_code): response.json()})
+        return responses
@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Any, NamedTuple, Optional
+
+# the lambda zip has the content of src at its root
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """
+    Parses the lines ``import time: <self> | <cumulative> | <indented module>`` of ``python -X importtime``.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        name = module.lstrip(" ")
+        imports.append(ImportTime(name, int(self_us), int(cumulative_us), (len(module) - len(name) - 1) // 2))
+    return imports
+
+
+def measure(module: str = "lambda_handler", path: str = SRC_PATH) -> list[ImportTime]:
+    """
+    Imports the module in a fresh interpreter, like a cold start of the lambda.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=path, capture_output=True, text=True, check=True)
+    return parse_importtime(completed.stderr)
+
+
+def _children(imports: list[ImportTime], module: str) -> tuple[ImportTime, list[ImportTime]]:
+    """
+    The entry of the module and its direct imports, ``-X importtime`` writes the children before the parent.
+    """
+    children: list[ImportTime] = []
+    for entry in imports:
+        if entry.depth == 1:
+            children.append(entry)
+        elif entry.depth == 0:
+            if entry.module == module:
+                return entry, children
+            children = []
+    raise ValueError(f"{module} not found in the output of -X importtime")
+
+
+def report(module: str = "lambda_handler", path: str = SRC_PATH, repeat: int = 5, top: int = 15) -> dict[str, Any]:
+    """
+    The median of several runs, the interpreter startup is not part of the import time.
+    """
+    runs = [_children(measure(module, path), module) for _ in range(repeat)]
+    median_entry, children = sorted(runs, key=lambda run: run[0].cumulative_us)[len(runs) // 2]
+    heaviest = sorted(children, key=lambda entry: entry.cumulative_us, reverse=True)[:top]
+    return {
+        "module": module,
+        "python": platform.python_version(),
+        "total_ms": round(median_entry.cumulative_us / 1000, 3),
+        "runs_ms": [round(entry.cumulative_us / 1000, 3) for entry, _ in runs],
+        "heaviest": [{"module": entry.module,
+                      "self_ms": round(entry.self_us / 1000, 3),
+                      "cumulative_ms": round(entry.cumulative_us / 1000, 3)} for entry in heaviest],
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import time of the lambda handler from python -X importtime.")
+    parser.add_argument("--module", default="lambda_handler")
+    parser.add_argument("--path", default=SRC_PATH, help="directory the module is imported from")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="number of the heaviest imports in the report")
+    parser.add_argument("--max-ms", type=float, help="fail if the median import time is higher")
+    args = parser.parse_args(argv)
+    result = report(args.module, args.path, args.repeat, args.top)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    if args.max_ms is not None and result["total_ms"] > args.max_ms:
+        print(f"Import of {args.module} took {result['total_ms']} ms, more than {args.max_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, TextIO
+from urllib.parse import urlsplit
+
+_API_PREFIX = "/1/"
+_ID_PATTERN = re.compile(r"^[0-9a-f]{24}$")
+
+
+def endpoint_of(url: str) -> str:
+    """
+    ``https://api.trello.com/1/cards/<id>/pos`` -> ``cards/{id}/pos``, so requests can be counted per endpoint.
+    """
+    path = urlsplit(url).path
+    if path.startswith(_API_PREFIX):
+        path = path[len(_API_PREFIX):]
+    return "/".join("{id}" if _ID_PATTERN.match(part) else part for part in path.strip("/").split("/"))
+
+
+class Instrumentation:
+    """
+    Timing spans and counters for the outgoing requests and the phases of the tasks. Every finished span
+    and every event is written as one JSON line, ``summary`` writes the counters of the whole run.
+
+    :param stream: defaults to the stdout at the time of writing, which ends up in CloudWatch on Lambda
+    :param emf: write the summary in the CloudWatch embedded metric format, so it is turned into metrics
+    :param log_requests: write a line for every single request, not only the counters
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, emf: bool = False, log_requests: bool = False,
+                 namespace: str = "TrelloManager"):
+        self.stream = stream
+        self.emf = emf
+        self.log_requests = log_requests
+        self.namespace = namespace
+        self.requests: Counter[str] = Counter()
+        self.failed_requests: Counter[str] = Counter()
+        self.retries = 0
+        self.request_seconds = 0.0
+        self.span_seconds: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Instrumentation":
+        """
+        ``TRELLO_MANAGER_METRICS=emf`` switches on the embedded metric format, ``TRELLO_MANAGER_LOG_REQUESTS``
+        the line per request.
+        """
+        return cls(emf=os.environ.get("TRELLO_MANAGER_METRICS") == "emf",
+                   log_requests="TRELLO_MANAGER_LOG_REQUESTS" in os.environ)
+
+    def reset(self):
+        """
+        Starts the counters of the next run.
+        """
+        with self._lock:
+            self.requests.clear()
+            self.failed_requests.clear()
+            self.retries = 0
+            self.request_seconds = 0.0
+            self.span_seconds.clear()
+
+    def _write(self, record: dict[str, Any]):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            print(line, file=self.stream or sys.stdout, flush=True)
+
+    def event(self, message: str, level: str = "info", **fields: Any):
+        self._write({"event": message, "level": level, **fields})
+
+    @contextmanager
+    def span(self, name: str, **fields: Any) -> Iterator[None]:
+        """
+        Times the enclosed block, the duration adds up per span name for the summary.
+        """
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            yield
+        except BaseException as exception:
+            error = type(exception).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.span_seconds[name] += duration
+            record = {"span": name, "duration_ms": round(duration * 1000, 3), **fields}
+            if error:
+                record["error"] = error
+            self._write(record)
+
+    def record_request(self, method: str, url: str, status: Optional[int], latency: float, retries: int):
+        endpoint = f"{method} {endpoint_of(url)}"
+        with self._lock:
+            self.requests[endpoint] += 1
+            if status is None or status >= 400:
+                self.failed_requests[endpoint] += 1
+            self.retries += retries
+            self.request_seconds += latency
+        if self.log_requests:
+            self._write({"request": endpoint, "status": status, "latency_ms": round(latency * 1000, 3),
+                         "retries": retries})
+
+    def summary(self, **dimensions: str) -> dict[str, Any]:
+        """
+        Writes and returns the counters collected so far. The dimensions name the run in the metrics.
+        """
+        with self._lock:
+            metrics: dict[str, float] = {
+                "Requests": sum(self.requests.values()),
+                "FailedRequests": sum(self.failed_requests.values()),
+                "Retries": self.retries,
+                "RequestTime": round(self.request_seconds * 1000, 3),
+            }
+            span_metrics = {f"{name}Time": round(seconds * 1000, 3) for name, seconds in self.span_seconds.items()}
+            record: dict[str, Any] = {"summary": "trello_manager", **dimensions, **metrics, **span_metrics,
+                                      "requests": dict(self.requests)}
+        if self.emf:
+            units = {"Requests": "Count", "FailedRequests": "Count", "Retries": "Count"}
+            record["_aws"] = {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [{"Name": name, "Unit": units.get(name, "Milliseconds")}
+                                for name in [*metrics, *span_metrics]],
+                }],
+            }
+        self._write(record)
+        return record
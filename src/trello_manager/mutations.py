@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Any, Optional
+
+import trello
+from trello import Label, List
+
+from .executor import WriteExecutor
+from .plan import ChangePlan, PlannedChange
+from .records import AnyCard
+from .snapshot import BoardSnapshot
+
+
+class CardMutationBuffer:
+    """
+    Collects the field changes of cards during a task run. ``flush`` sends them as a single
+    ``PUT /cards/{id}`` request per card. The local card objects are updated right away, so later
+    phases of a run already see the pending state.
+
+    :param plan: dry run, ``flush`` only records the changes in the plan
+    """
+
+    def __init__(self, client: trello.TrelloClient, plan: Optional[ChangePlan] = None):
+        self.client = client
+        self.plan = plan
+        self._pending: dict[str, tuple[AnyCard, dict[str, Any]]] = {}
+        # ids of the cards written by the flushes so far
+        self.written: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _record(self, card: AnyCard, field: str, value: Any):
+        self._pending.setdefault(card.id, (card, {}))[1][field] = value
+
+    def move(self, card: AnyCard, trello_list: List):
+        self._record(card, "idList", trello_list.id)
+        BoardSnapshot.move_card(card, trello_list)
+
+    def set_closed(self, card: AnyCard, closed: bool):
+        self._record(card, "closed", closed)
+        card.closed = closed
+
+    def set_due(self, card: AnyCard, due: datetime):
+        self._record(card, "due", due.isoformat())
+        card.due = due.isoformat()
+
+    def set_pos(self, card: AnyCard, pos: float):
+        self._record(card, "pos", pos)
+        card.pos = pos
+
+    def set_labels(self, card: AnyCard, labels: list[Label]):
+        self._record(card, "idLabels", ",".join(label.id for label in labels))
+        card.idLabels = [label.id for label in labels]
+        card._labels = labels  # pylint: disable=protected-access
+
+    def _put(self, card_id: str, fields: dict[str, Any]):
+        self.client.fetch_json(f"/cards/{card_id}", http_method="PUT", post_args=fields)
+
+    def flush(self, executor: Optional[WriteExecutor] = None) -> int:
+        """
+        :return: number of requests sent
+        """
+        executor = executor or WriteExecutor()
+        pending, self._pending = self._pending, {}
+        if self.plan is not None:
+            for card, fields in pending.values():
+                self.plan.add(PlannedChange("update", card.name, card.trello_list.name, fields, 1))
+            return 0
+        for card_id, (_, fields) in pending.items():
+            executor.submit(self._put, card_id, fields)
+        self.written.update(pending)
+        executor.join()
+        return len(pending)
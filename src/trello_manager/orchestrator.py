@@ -0,0 +1,226 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .instrumentation import Instrumentation
+from .resilience import Deadline
+from .session import TrelloSession
+from .tasks import TASK_TYPES, TrelloManager
+
+# all tasks of one invocation work on the same snapshot of a board
+SNAPSHOT_MAX_AGE = 60.0
+# boards worked on at the same time by ``run_tenants``, the rate limits of the credentials still apply
+MAX_WORKERS = 16
+
+
+@dataclass
+class TaskResult:
+    name: str
+    board: str
+    duration: float
+    error: Optional[BaseException] = None
+    tenant: Optional[str] = None
+    # not started for lack of time, or phases of it left for the next run
+    deferred: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_json(self) -> dict[str, Any]:
+        return {"task": self.name, "board": self.board, "tenant": self.tenant, "duration": round(self.duration, 3),
+                "error": repr(self.error) if self.error else None, "deferred": self.deferred}
+
+
+# index in the results, task, board of the task (None for the board of the task class) and tenant
+_Job = tuple[int, type[TrelloManager], Optional[str], Optional[str]]
+
+
+def run_task(task_class: type[TrelloManager], session: TrelloSession, board_name: Optional[str] = None,
+             tenant: Optional[str] = None, **options: Any) -> TaskResult:
+    """
+    Runs one task, an error is part of the result. The options are passed on to the task. Past the deadline
+    of the session the task isn't started at all.
+    """
+    board_name = board_name or task_class._board_name  # pylint: disable=protected-access
+    if session.deadline is not None and session.deadline.remaining() <= 0:
+        session.instrumentation.event("no time left, task deferred to the next run", "warning",
+                                      task=task_class.__name__, board=board_name)
+        return TaskResult(task_class.__name__, board_name, 0.0, tenant=tenant, deferred=True)
+    start = time.perf_counter()
+    error: Optional[BaseException] = None
+    task: Optional[TrelloManager] = None
+    try:
+        with session.instrumentation.span(task_class.__name__, board=board_name):
+            task = task_class(session, board_name=board_name, **options)
+            task.run()  # type: ignore
+    except Exception as task_error:  # pylint: disable=broad-except
+        import traceback  # pylint: disable=import-outside-toplevel
+        traceback.print_exc()
+        error = task_error
+    return TaskResult(task_class.__name__, board_name, time.perf_counter() - start, error, tenant,
+                      bool(task and task.deferred))
+
+
+def _run_board(jobs: list[_Job], session: TrelloSession) -> list[tuple[int, TaskResult]]:
+    return [(idx, run_task(task_class, session, board_name, tenant)) for idx, task_class, board_name, tenant in jobs]
+
+
+def run_tasks(task_classes: list[type[TrelloManager]],
+              session: Optional[TrelloSession] = None, deadline: Optional[Deadline] = None) -> list[TaskResult]:
+    """
+    Runs the tasks with one shared session. Tasks on different boards run in parallel, tasks on the same
+    board one after another on a shared snapshot. A failing task doesn't stop the others. Without a given
+    session the process wide one of ``TrelloSession.shared`` is used, so warm Lambda invocations skip the
+    board lookup.
+
+    :param deadline: e.g. the timeout of the Lambda, the tasks defer what they can't finish before
+
+    :return: the results in the order of ``task_classes``
+    """
+    if not task_classes:
+        return []
+    if not session:
+        first_task = task_classes[0]
+        session = TrelloSession.shared(first_task._key, first_task._secret,  # pylint: disable=protected-access
+                                       snapshot_max_age=SNAPSHOT_MAX_AGE)
+    by_board: dict[str, list[_Job]] = {}
+    for idx, task_class in enumerate(task_classes):
+        board_name = task_class._board_name  # pylint: disable=protected-access
+        by_board.setdefault(board_name, []).append((idx, task_class, None, None))
+    session.deadline = deadline
+    try:
+        with ThreadPoolExecutor(max_workers=len(by_board), thread_name_prefix="trello-task") as pool:
+            futures = [pool.submit(_run_board, board_tasks, session) for board_tasks in by_board.values()]
+            results = [result for future in futures for result in future.result()]
+    finally:
+        # the session outlives the invocation
+        session.deadline = None
+    session.save_state(session.instrumentation.summary(), [result.to_json() for _, result in results])
+    session.instrumentation.reset()
+    return [result for _, result in sorted(results, key=lambda indexed_result: indexed_result[0])]
+
+
+@dataclass
+class Tenant:
+    """
+    One household: its credentials, given as the names of the environment variables holding them, and
+    the tasks to run on its boards.
+
+    :param jobs: pairs of task and board name
+    """
+    name: str
+    jobs: list[tuple[type[TrelloManager], str]]
+    key: str = "TRELLO_API_KEY"
+    secret: str = "TRELLO_API_SECRET"
+
+    @classmethod
+    def from_json(cls, json_obj: dict[str, Any]) -> "Tenant":
+        """
+        ``{"name": ..., "key": <env var>, "secret": <env var>, "jobs": [{"task": "ShoppingTask", "board": ...}]}``
+        """
+        unknown = [job["task"] for job in json_obj["jobs"] if job["task"] not in TASK_TYPES]
+        if unknown:
+            raise ValueError(f"unknown tasks of tenant {json_obj['name']}: {', '.join(unknown)}")
+        return cls(json_obj["name"],
+                   [(TASK_TYPES[job["task"]], job["board"]) for job in json_obj["jobs"]],
+                   json_obj.get("key", "TRELLO_API_KEY"),
+                   json_obj.get("secret", "TRELLO_API_SECRET"))
+
+
+def load_tenants(path: str) -> list[Tenant]:
+    """
+    Reads ``{"tenants": [...]}`` from a JSON file, see ``Tenant.from_json``.
+    """
+    with open(path, encoding="utf-8") as config_file:
+        return [Tenant.from_json(tenant) for tenant in json.load(config_file)["tenants"]]
+
+
+@dataclass
+class RunReport:
+    results: list[TaskResult]
+    duration: float
+    requests: int
+    boards: int
+    summaries: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> list[TaskResult]:
+        return [result for result in self.results if not result.ok]
+
+    def to_json(self) -> dict[str, Any]:
+        return {"tasks": len(self.results),
+                "failed": len(self.failed),
+                "deferred": sum(result.deferred for result in self.results),
+                "boards": self.boards,
+                "requests": self.requests,
+                "duration": round(self.duration, 3),
+                "tasks_per_second": round(len(self.results) / self.duration, 3) if self.duration else None,
+                "requests_per_second": round(self.requests / self.duration, 3) if self.duration else None}
+
+
+def _group_jobs(tenants: list[Tenant]) -> tuple[dict[str, TrelloSession], dict[tuple[TrelloSession, str], list[_Job]],
+                                                list[tuple[int, TaskResult]]]:
+    """
+    The sessions of the tenants and their jobs by session and board. Tenants with the same credentials share
+    the session and with it the snapshots, their jobs on the same board run one after another. The jobs of a
+    tenant without its credentials in the environment are failed results right away, the other tenants run
+    nonetheless.
+    """
+    sessions: dict[str, TrelloSession] = {}
+    by_board: dict[tuple[TrelloSession, str], list[_Job]] = {}
+    failed: list[tuple[int, TaskResult]] = []
+    idx = 0
+    for tenant in tenants:
+        try:
+            session = sessions[tenant.name] = TrelloSession.shared(tenant.key, tenant.secret,
+                                                                   snapshot_max_age=SNAPSHOT_MAX_AGE)
+        except KeyError as error:
+            Instrumentation.from_env().event("credentials of the tenant not set", "error", tenant=tenant.name,
+                                             variable=str(error))
+            for task_class, board_name in tenant.jobs:
+                failed.append((idx, TaskResult(task_class.__name__, board_name, 0.0, error, tenant.name)))
+                idx += 1
+            continue
+        for task_class, board_name in tenant.jobs:
+            by_board.setdefault((session, board_name), []).append((idx, task_class, board_name, tenant.name))
+            idx += 1
+    return sessions, by_board, failed
+
+
+def run_tenants(tenants: list[Tenant], max_workers: int = MAX_WORKERS,
+                deadline: Optional[Deadline] = None) -> RunReport:
+    """
+    Runs the tasks of many tenants in one pool of threads. The tasks of one board run one after another on
+    a shared snapshot, the boards in parallel. Tenants with the same credentials share one session and with
+    it the rate limits of their key and token, which hold across the whole pool.
+
+    :return: the results in the order of the tenants and their jobs, and the throughput of the run
+    """
+    start = time.perf_counter()
+    sessions, by_board, results = _group_jobs(tenants)
+    for session in sessions.values():
+        session.deadline = deadline
+    try:
+        if by_board:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(by_board)),
+                                    thread_name_prefix="trello-board") as pool:
+                futures = [pool.submit(_run_board, jobs, session) for (session, _), jobs in by_board.items()]
+                results.extend(result for future in futures for result in future.result())
+    finally:
+        for session in sessions.values():
+            session.deadline = None
+    summaries = []
+    # tenants with the same credentials share the session, its counters are written once
+    for session in {id(session): session for session in sessions.values()}.values():
+        summaries.append(session.instrumentation.summary())
+        session.save_state(summaries[-1], [result.to_json() for _, result in results
+                                           if sessions.get(result.tenant or "") is session])
+        session.instrumentation.reset()
+    return RunReport([result for _, result in sorted(results, key=lambda indexed_result: indexed_result[0])],
+                     time.perf_counter() - start,
+                     sum(summary["Requests"] for summary in summaries),
+                     len(by_board),
+                     summaries)
@@ -0,0 +1,35 @@
+import threading
+from typing import Any, NamedTuple, Optional
+
+
+class PlannedChange(NamedTuple):
+    action: str  # "update" or "create"
+    card: str
+    list: Optional[str]
+    fields: dict[str, Any]
+    requests: int
+
+
+class ChangePlan:
+    """
+    The writes of a dry run. The tasks compute their changes as usual, but instead of sending them the
+    mutation buffer and the creation of todos record them here, with the number of requests they would take.
+    """
+
+    def __init__(self):
+        self.changes: list[PlannedChange] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def add(self, change: PlannedChange):
+        with self._lock:
+            self.changes.append(change)
+
+    @property
+    def requests(self) -> int:
+        return sum(change.requests for change in self.changes)
+
+    def to_json(self) -> dict[str, Any]:
+        return {"requests": self.requests, "changes": [change._asdict() for change in self.changes]}
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Any, Optional, Union
+
+from trello import Board, Card, Label, List
+
+# the card fields the tasks read, compact snapshots request nothing else
+CARD_FIELDS = "id,name,idList,idLabels,due,pos,closed"
+
+
+class CardRecord:
+    """
+    Compact stand-in for ``trello.Card`` with only the fields of ``CARD_FIELDS``. It has the attributes the
+    tasks read from a card, but none of the remote methods, changes go through ``CardMutationBuffer``.
+    """
+
+    __slots__ = ("id", "name", "idList", "idLabels", "due", "pos", "closed", "trello_list", "_labels")
+
+    def __init__(self, trello_list: Union[List, Board], json_obj: dict[str, Any], labels_by_id: dict[str, Label]):
+        self.id: str = json_obj["id"]  # pylint: disable=invalid-name
+        self.name: str = json_obj["name"]
+        self.idList: str = json_obj["idList"]  # pylint: disable=invalid-name
+        self.idLabels: list[str] = json_obj["idLabels"]  # pylint: disable=invalid-name
+        self.due: Optional[str] = json_obj.get("due")
+        self.pos: float = json_obj["pos"]
+        self.closed: bool = json_obj["closed"]
+        self.trello_list = trello_list
+        # the label objects of the board are shared by all records
+        self._labels = [labels_by_id[label_id] for label_id in self.idLabels if label_id in labels_by_id]
+
+    @property
+    def labels(self) -> list[Label]:
+        return self._labels
+
+    @property
+    def due_date(self) -> Any:
+        # same contract as py-trello, a datetime or an empty string
+        return datetime.fromisoformat(self.due) if self.due else ""
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CardRecord) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<CardRecord {self.name}>"
+
+
+AnyCard = Union[Card, CardRecord]
+
+
+def created_at(card_id: str) -> datetime:
+    """
+    The first four bytes of a trello id are the unix time of the creation, in the local time like
+    ``datetime.today()``.
+    """
+    return datetime.fromtimestamp(int(card_id[:8], 16))
+
+
+def first_id_at(moment: datetime) -> str:
+    """
+    Lower than the ids of everything created from this moment on, e.g. for the ``since`` of a paged request.
+    """
+    return f"{int(moment.timestamp()):08x}" + "0" * 16
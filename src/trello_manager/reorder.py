@@ -0,0 +1,139 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Optional, Sequence
+
+from .mutations import CardMutationBuffer
+from .records import AnyCard
+
+POS_STEP = 65536.0
+# below this gap fractional positions lose precision, the whole list gets renumbered instead
+MIN_POS_GAP = 1e-6
+
+
+def _longest_ordered_subsequence(positions: Sequence[float]) -> set[int]:
+    """
+    Indices of the longest subsequence (in target order) whose current positions are already strictly
+    increasing. Patience sorting, O(n log n).
+    """
+    tails: list[float] = []
+    tail_indices: list[int] = []
+    predecessors: list[Optional[int]] = [None] * len(positions)
+    for idx, pos in enumerate(positions):
+        slot = bisect_left(tails, pos)
+        if slot == len(tails):
+            tails.append(pos)
+            tail_indices.append(idx)
+        else:
+            tails[slot] = pos
+            tail_indices[slot] = idx
+        predecessors[idx] = tail_indices[slot - 1] if slot else None
+    stable: set[int] = set()
+    current = tail_indices[-1] if tail_indices else None
+    while current is not None:
+        stable.add(current)
+        current = predecessors[current]
+    return stable
+
+
+def plan_reorder(positions: Sequence[float]) -> dict[int, float]:
+    """
+    Plans the minimal set of moves to bring items into target order.
+
+    :param positions: current positions of the items, listed in target order
+    :return: target index -> new position, only for the items that have to move
+    """
+    stable = _longest_ordered_subsequence(positions)
+    moves: dict[int, float] = {}
+    lower = 0.0
+    idx = 0
+    while idx < len(positions):
+        if idx in stable:
+            lower = positions[idx]
+            idx += 1
+            continue
+        # a run of items to move, placed evenly between the surrounding stable neighbours
+        run_end = idx
+        while run_end < len(positions) and run_end not in stable:
+            run_end += 1
+        run_length = run_end - idx
+        upper = positions[run_end] if run_end < len(positions) else lower + POS_STEP * (run_length + 1)
+        gap = (upper - lower) / (run_length + 1)
+        if gap < MIN_POS_GAP:
+            return {idx: POS_STEP * (idx + 1) for idx in range(len(positions))}
+        for offset in range(run_length):
+            moves[idx + offset] = lower + gap * (offset + 1)
+        idx = run_end
+    return moves
+
+
+def reorder_cards(cards: Sequence[AnyCard], mutations: Optional[CardMutationBuffer] = None) -> int:
+    """
+    Brings the cards into the given order, only the cards out of order are written. With a mutation buffer
+    the new positions are only recorded and sent on its next flush.
+
+    :return: number of moved cards
+    """
+    moves = plan_reorder([float(card.pos) for card in cards])
+    for idx, pos in moves.items():
+        _set_pos(cards[idx], pos, mutations)
+    return len(moves)
+
+
+def _set_pos(card: AnyCard, pos: float, mutations: Optional[CardMutationBuffer]):
+    if mutations is not None:
+        mutations.set_pos(card, pos)
+    else:
+        # card records have no remote methods, they need a mutation buffer
+        card.set_pos(pos)  # type: ignore[union-attr]
+
+
+class OrderedList:
+    """
+    The cards of a list in target order. A card moved into the list finds its slot by a binary search over
+    the order keys and gets a single position between its new neighbours, the other cards keep theirs. Only
+    if the list wasn't in order before, or two neighbours have no room left between them, ``reorder`` brings
+    the whole list into order.
+
+    :param cards: the cards already in the list, in target order
+    :param key: order key of a card, a card inserted with the key of others is placed after them
+    """
+
+    def __init__(self, cards: Sequence[AnyCard], key: Callable[[AnyCard], Any]):
+        self.key = key
+        self.cards = list(cards)
+        self._keys = [key(card) for card in self.cards]
+        self._positions = [float(card.pos) for card in self.cards]
+        self.in_order = all(lower < upper for lower, upper in zip(self._positions, self._positions[1:]))
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def insert(self, card: AnyCard, mutations: Optional[CardMutationBuffer] = None) -> bool:
+        """
+        :return: whether the card got its position, otherwise it waits for ``reorder``
+        """
+        card_key = self.key(card)
+        slot = bisect_right(self._keys, card_key)
+        self.cards.insert(slot, card)
+        self._keys.insert(slot, card_key)
+        if not self.in_order:
+            return False
+        lower = self._positions[slot - 1] if slot else 0.0
+        upper = self._positions[slot] if slot < len(self._positions) else lower + 2 * POS_STEP
+        if upper - lower < 2 * MIN_POS_GAP:
+            self.in_order = False
+            return False
+        pos = (lower + upper) / 2
+        self._positions.insert(slot, pos)
+        _set_pos(card, pos, mutations)
+        return True
+
+    def reorder(self, mutations: Optional[CardMutationBuffer] = None) -> int:
+        """
+        :return: number of moved cards, nothing to do as long as every inserted card got its position
+        """
+        if self.in_order:
+            return 0
+        moved = reorder_cards(self.cards, mutations)
+        self._positions = [float(card.pos) for card in self.cards]
+        self.in_order = True
+        return moved
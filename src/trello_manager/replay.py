@@ -0,0 +1,62 @@
+import math
+import re
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional, Sequence
+
+from .records import AnyCard
+
+# "(<days> d)" in the name of a replay card, the last one counts
+REPLAY_DAYS = re.compile(r"\((\d{1,3}) d\)")
+
+
+def replay_days(name: str) -> Optional[int]:
+    hits = REPLAY_DAYS.findall(name)
+    return int(hits[-1]) if hits else None
+
+
+def due_timestamp(due: Optional[str]) -> Optional[float]:
+    """
+    The raw due field of a card as unix timestamp, due dates without a time zone are UTC.
+    """
+    if not due:
+        return None
+    parsed = datetime.fromisoformat(due)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def due_key(card: AnyCard) -> float:
+    """
+    Order of the cards in a replay list, the cards without a due date at the end.
+    """
+    due = due_timestamp(card.due)
+    return math.inf if due is None else due
+
+
+class DuePlan(NamedTuple):
+    to_todo: list[AnyCard]
+    # the cards staying in the list, by due date and the ones without a due date below in their order
+    order: list[AnyCard]
+    next_due: Optional[float]
+
+
+def plan_dues(cards: Sequence[AnyCard], deadline: float) -> DuePlan:
+    """
+    One pass over the cards of a list, every due date is parsed once. The cards due before the deadline
+    (unix timestamp) go to the todo list, the order of the others is computed in the same pass.
+    """
+    to_todo: list[AnyCard] = []
+    dated: list[tuple[float, int, AnyCard]] = []
+    undated: list[AnyCard] = []
+    for idx, card in enumerate(cards):
+        due = due_timestamp(card.due)
+        if due is None:
+            undated.append(card)
+        elif due < deadline:
+            to_todo.append(card)
+        else:
+            # the index keeps cards with the same due date in their order
+            dated.append((due, idx, card))
+    dated.sort(key=lambda entry: entry[:2])
+    return DuePlan(to_todo, [card for _, _, card in dated] + undated, dated[0][0] if dated else None)
@@ -0,0 +1,82 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# time kept free at the end of a Lambda invocation for the summary and the state store
+DEADLINE_MARGIN = 5.0
+
+
+def equal_jitter(delay: float) -> float:
+    """
+    Somewhere between half and the full delay, so parallel requests don't retry in lockstep.
+    """
+    return random.uniform(delay / 2, delay)
+
+
+class Deadline:
+    """
+    Point in time a run has to be finished by, e.g. before the timeout of the Lambda.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.at = clock() + seconds
+
+    @classmethod
+    def from_context(cls, context: Any, margin: float = DEADLINE_MARGIN) -> Optional["Deadline"]:
+        """
+        The remaining time of a Lambda invocation, None without a Lambda context.
+        """
+        if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+            return None
+        return cls(context.get_remaining_time_in_millis() / 1000 - margin)
+
+    def remaining(self) -> float:
+        return self.at - self._clock()
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after ``threshold`` failures in a row, e.g. while trello is down. After ``cooldown``
+    seconds requests are let through again, the first failure opens the circuit again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and self._clock() - self._opened_at < self.cooldown
+
+    def check(self):
+        """
+        Raises while the circuit is open.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._clock() - self._opened_at < self.cooldown:
+                raise CircuitOpenError(f"{self._failures} failed requests in a row, waiting for the cooldown")
+            # half open, the next failure opens the circuit again right away
+            self._opened_at = None
+            self._failures = self.threshold - 1
+
+    def record(self, failed: bool):
+        with self._lock:
+            if not failed:
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = self._clock()
@@ -0,0 +1,165 @@
+import json
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+_MONTHS = range(1, 13)
+_DAYS = range(1, 32)
+_WEEKDAYS = range(7)
+# cron counts the weekdays from Sunday (0 and 7), python from Monday (0)
+_CRON_WEEKDAY = {0: 6, 1: 0, 2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 7: 6}
+
+
+def _cron_field(expression: str, values: range) -> Optional[set[int]]:
+    """
+    One field of a cron rule: ``*``, ``1,15``, ``1-5`` and steps like ``*/2`` or ``1-10/3``.
+
+    :return: None for ``*``, the field then doesn't restrict the rule
+    """
+    if expression == "*":
+        return None
+    matched: set[int] = set()
+    for part in expression.split(","):
+        part_range, _, step = part.partition("/")
+        if part_range == "*":
+            start, stop = values.start, values.stop - 1
+        elif "-" in part_range:
+            start, stop = (int(number) for number in part_range.split("-", 1))
+        else:
+            start = stop = int(part_range)
+        if start < values.start or stop >= values.stop or start > stop:
+            raise ValueError(f"{part!r} is out of the range {values.start}-{values.stop - 1}")
+        matched.update(range(start, stop + 1, int(step) if step else 1))
+    return matched
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """
+    A todo created on the days its rule matches. The rule is either a cron expression of the fields
+    ``<day of month> <month> <day of week>`` (weekdays counted like cron, 0 is Sunday), or the lists
+    of the fields ``days_of_week`` (0 is Monday), ``days_of_month`` and ``months_of_year``. For the latter
+    a matching weekday is enough, the days of month only match in ``months_of_year`` if that is given.
+
+    :param title: formatted with the date of the todo, e.g. ``DAILYS {date:%a}``
+    :param board: the board of the todo, None for the board of the task
+    """
+    title: str
+    checklist: tuple[str, ...] = ()
+    days_of_week: frozenset[int] = frozenset()
+    days_of_month: frozenset[int] = frozenset()
+    months_of_year: frozenset[int] = frozenset()
+    cron: Optional[str] = None
+    board: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, json_obj: dict[str, Any]) -> "Reminder":
+        return cls(title=json_obj["title"],
+                   checklist=tuple(json_obj.get("checklist", ())),
+                   days_of_week=frozenset(json_obj.get("days_of_week", ())),
+                   days_of_month=frozenset(json_obj.get("days_of_month", ())),
+                   months_of_year=frozenset(json_obj.get("months_of_year", ())),
+                   cron=json_obj.get("cron"),
+                   board=json_obj.get("board"))
+
+    def title_for(self, day: date) -> str:
+        return self.title.format(date=day)
+
+    def occurrences(self) -> tuple[set[tuple[int, int]], set[tuple[int, int]]]:
+        """
+        The rule resolved to the (month, weekday) and the (month, day of month) pairs it matches.
+        """
+        if self.cron is not None:
+            return self._cron_occurrences(self.cron)
+        for name, values, allowed in (("days_of_week", self.days_of_week, _WEEKDAYS),
+                                      ("days_of_month", self.days_of_month, _DAYS),
+                                      ("months_of_year", self.months_of_year, _MONTHS)):
+            if not set(values) <= set(allowed):
+                raise ValueError(f"{name} of {self.title!r} out of the range {allowed.start}-{allowed.stop - 1}")
+        month_weekdays = {(month, weekday) for month in _MONTHS for weekday in self.days_of_week}
+        month_days = {(month, day) for month in self.months_of_year or _MONTHS for day in self.days_of_month}
+        return month_weekdays, month_days
+
+    def _cron_occurrences(self, cron: str) -> tuple[set[tuple[int, int]], set[tuple[int, int]]]:
+        try:
+            day_field, month_field, weekday_field = cron.split()
+        except ValueError as error:
+            raise ValueError(f"cron rule {cron!r} of {self.title!r} needs three fields") from error
+        days = _cron_field(day_field, _DAYS)
+        months = _cron_field(month_field, _MONTHS) or set(_MONTHS)
+        cron_weekdays = _cron_field(weekday_field, range(8))
+        weekdays = {_CRON_WEEKDAY[weekday] for weekday in cron_weekdays} if cron_weekdays is not None else None
+        if days is None and weekdays is None:
+            weekdays = set(_WEEKDAYS)
+        # like cron, with both fields restricted a day matching either of them is enough
+        month_weekdays = {(month, weekday) for month in months for weekday in weekdays or ()}
+        month_days = {(month, day) for month in months for day in days or ()}
+        return month_weekdays, month_days
+
+
+class Schedule:
+    """
+    The reminders compiled into an index of their (month, weekday) and (month, day of month) occurrences,
+    the reminders of a day are two lookups, however many reminders there are.
+    """
+
+    def __init__(self, reminders: Iterable[Reminder]):
+        self.reminders: list[Reminder] = list(reminders)
+        self._by_weekday: dict[tuple[int, int], list[int]] = {}
+        self._by_day: dict[tuple[int, int], list[int]] = {}
+        self._boards: dict[Optional[str], "Schedule"] = {}
+        for idx, reminder in enumerate(self.reminders):
+            month_weekdays, month_days = reminder.occurrences()
+            for key in month_weekdays:
+                self._by_weekday.setdefault(key, []).append(idx)
+            for key in month_days:
+                self._by_day.setdefault(key, []).append(idx)
+
+    @classmethod
+    def from_json(cls, json_obj: dict[str, Any]) -> "Schedule":
+        """
+        ``{"reminders": [{"title": ..., "checklist": [...], "cron": "1 11 *"}, ...]}``
+        """
+        return cls(Reminder.from_json(reminder) for reminder in json_obj.get("reminders", []))
+
+    def __len__(self) -> int:
+        return len(self.reminders)
+
+    def for_board(self, board: Optional[str]) -> "Schedule":
+        """
+        The reminders of one board, reminders without a board belong to every board.
+        """
+        if board not in self._boards:
+            self._boards[board] = Schedule(reminder for reminder in self.reminders
+                                           if reminder.board is None or reminder.board == board)
+        return self._boards[board]
+
+    def reminders_on(self, day: date) -> list[Reminder]:
+        """
+        The reminders of the day in the order of their definition, each one once.
+        """
+        indices = set(self._by_weekday.get((day.month, day.weekday()), ()))
+        indices.update(self._by_day.get((day.month, day.day), ()))
+        return [self.reminders[idx] for idx in sorted(indices)]
+
+    def upcoming(self, start: date, days: int) -> list[tuple[date, list[Reminder]]]:
+        """
+        The days of ``start`` and the following ``days - 1`` days that have reminders.
+        """
+        upcoming = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            reminders = self.reminders_on(day)
+            if reminders:
+                upcoming.append((day, reminders))
+        return upcoming
+
+
+@lru_cache(maxsize=None)
+def load_schedule(path: str) -> Schedule:
+    """
+    Reads and compiles a schedule file once per process, warm Lambda invocations reuse it.
+    """
+    with open(path, encoding="utf-8") as schedule_file:
+        return Schedule.from_json(json.load(schedule_file))
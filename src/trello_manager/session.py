@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+import requests
+import trello
+from trello import Board
+
+from .activity import BoardActivityCache
+from .executor import RateLimitedHttpService, rate_limited_service
+from .instrumentation import Instrumentation
+from .resilience import Deadline
+from .snapshot import BoardSnapshot
+from .state import S3Sync, StateStore
+
+# boards are rarely created or renamed, the index of a warm session is reused for this many seconds
+BOARD_INDEX_TTL = 3600.0
+
+
+class TrelloSession:  # pylint: disable=too-many-instance-attributes
+    """
+    Shared state of several tasks: one pooled HTTP session behind one client, the board index and one
+    snapshot per board. Tasks created with the same session resolve everything only once.
+
+    :param snapshot_max_age: snapshots younger than this (seconds) are not refreshed again at the start
+                             of a task run, tasks on the same board then work on one snapshot
+    :param activity_cache: lets tasks skip their run if their board didn't change since the last one
+    :param instrumentation: collects the requests and phases of all tasks of the session
+    :param board_index_ttl: seconds until the board index is fetched again
+    :param compact_cards: snapshots load only the card fields the tasks read, as ``CardRecord``
+    :param state: durable state of the tasks, it is the activity cache as well unless another one is given
+    """
+
+    def __init__(self, api_key: str, api_secret: str, snapshot_max_age: float = 0.0,
+                 activity_cache: Optional[BoardActivityCache] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 board_index_ttl: float = BOARD_INDEX_TTL, compact_cards: bool = False,
+                 state: Optional[StateStore] = None):
+        self.instrumentation: Instrumentation = instrumentation or Instrumentation()
+        self.http: requests.Session = requests.Session()
+        self.http_service: RateLimitedHttpService = rate_limited_service(api_key, api_secret, http_service=self.http,
+                                                                         instrumentation=self.instrumentation)
+        self.client: trello.TrelloClient = trello.TrelloClient(
+            api_key=api_key,
+            api_secret=api_secret,
+            http_service=self.http_service
+        )
+        self.snapshot_max_age = snapshot_max_age
+        self.state = state
+        self.activity_cache = activity_cache or state
+        self.board_index_ttl = board_index_ttl
+        self.compact_cards = compact_cards
+        self._boards: Optional[dict[str, Board]] = None
+        self._boards_fetched_at = 0.0
+        self._snapshots: dict[str, BoardSnapshot] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, key: str = "TRELLO_API_KEY", secret: str = "TRELLO_API_SECRET",
+                 snapshot_max_age: float = 0.0) -> "TrelloSession":
+        """
+        The activity cache is enabled by pointing ``TRELLO_MANAGER_CACHE`` to a file, the state store by
+        pointing ``TRELLO_MANAGER_STATE`` to one, synced to the ``s3://`` url of ``TRELLO_MANAGER_STATE_S3``
+        if given. The instrumentation is configured with ``Instrumentation.from_env``.
+        ``TRELLO_MANAGER_COMPACT_CARDS`` switches on the compact cards. The sessions of a process share one
+        cache and one store per file.
+        """
+        cache_path = os.environ.get("TRELLO_MANAGER_CACHE")
+        state_path = os.environ.get("TRELLO_MANAGER_STATE")
+        state_url = os.environ.get("TRELLO_MANAGER_STATE_S3")
+        activity_cache = _shared_store(_SHARED_CACHES, cache_path, lambda: BoardActivityCache(cache_path)) \
+            if cache_path else None
+        state = _shared_store(_SHARED_STATES, state_path, lambda: StateStore(
+            state_path, sync=S3Sync(state_url) if state_url else None)) if state_path else None
+        return cls(os.environ[key], os.environ[secret], snapshot_max_age=snapshot_max_age,
+                   activity_cache=activity_cache, instrumentation=Instrumentation.from_env(),
+                   compact_cards="TRELLO_MANAGER_COMPACT_CARDS" in os.environ, state=state)
+
+    @classmethod
+    def shared(cls, key: str = "TRELLO_API_KEY", secret: str = "TRELLO_API_SECRET",
+               snapshot_max_age: float = 0.0) -> "TrelloSession":
+        """
+        Like ``from_env``, but one session per credentials for the lifetime of the process. Warm Lambda
+        invocations reuse the open connections and the board index of the previous ones, only the
+        snapshots are expired, the boards could have changed in between.
+        """
+        credentials = (os.environ[key], os.environ[secret])
+        with _SHARED_LOCK:
+            session = _SHARED_SESSIONS.get(credentials)
+            if session is None:
+                session = _SHARED_SESSIONS[credentials] = cls.from_env(key, secret, snapshot_max_age)
+        session.expire_snapshots()
+        return session
+
+    @property
+    def deadline(self) -> Optional[Deadline]:
+        """
+        The run of the tasks has to be finished by then, the requests don't retry beyond it.
+        """
+        return self.http_service.deadline
+
+    @deadline.setter
+    def deadline(self, deadline: Optional[Deadline]):
+        self.http_service.deadline = deadline
+
+    def save_state(self, summary: dict[str, Any], tasks: list[dict[str, Any]]):
+        """
+        Records the metrics of a run in the state store and pushes it to S3, nothing without a store.
+
+        :param summary: of the instrumentation
+        """
+        if self.state:
+            self.state.record_run(summary, tasks)
+            self.state.push()
+
+    def expire_snapshots(self):
+        with self._lock:
+            for snapshot in self._snapshots.values():
+                snapshot.expire()
+
+    def _load_boards(self) -> dict[str, Board]:
+        self._boards = {}
+        for board in self.client.list_boards():
+            self._boards.setdefault(board.name, board)
+        self._boards_fetched_at = time.monotonic()
+        return self._boards
+
+    def get_board(self, board_name: str) -> Optional[Board]:
+        with self._lock:
+            boards = self._boards
+            if boards is None or time.monotonic() - self._boards_fetched_at > self.board_index_ttl:
+                boards = self._load_boards()
+            elif board_name not in boards:
+                # the board could have been created after the index of a warm session was loaded
+                boards = self._load_boards()
+            return boards.get(board_name)
+
+    def get_snapshot(self, board: Board, include_closed: bool = True) -> BoardSnapshot:
+        """
+        A snapshot loaded without archived cards is reloaded with them, once one task needs them.
+        """
+        with self._lock:
+            if board.id not in self._snapshots:
+                self._snapshots[board.id] = BoardSnapshot(board, include_closed, self.compact_cards)
+            snapshot = self._snapshots[board.id]
+            if include_closed and not snapshot.include_closed:
+                snapshot.include_closed = True
+                snapshot.expire()
+            return snapshot
+
+
+_SHARED_SESSIONS: dict[tuple[str, str], TrelloSession] = {}
+_SHARED_LOCK = threading.Lock()
+# one cache and one store per file, the sessions of the tenants would otherwise overwrite each other
+_SHARED_CACHES: dict[str, BoardActivityCache] = {}
+_SHARED_STATES: dict[str, StateStore] = {}
+_STORES_LOCK = threading.Lock()
+
+_Store = TypeVar("_Store", bound=BoardActivityCache)
+
+
+def _shared_store(stores: dict[str, _Store], path: str, create: Callable[[], _Store]) -> _Store:
+    with _STORES_LOCK:
+        store = stores.get(path)
+        if store is None:
+            store = stores[path] = create()
+        return store
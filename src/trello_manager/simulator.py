@@ -0,0 +1,47 @@
+import copy
+import json
+from typing import Any, Callable
+
+from .fake import FakeTrello
+from .webhook import SIGNATURE_HEADER, signature
+
+CALLBACK_URL = "https://trello-manager.lambda-url.eu-central-1.on.aws/"
+
+
+class WebhookSimulator:
+    """
+    Sends the actions on the boards of a ``FakeTrello`` to a handler like the webhooks of trello do: as a
+    signed POST request through a Lambda function url. Only the actions after the creation are delivered.
+
+    :param handler: e.g. ``lambda_handler``, called with the event and no context
+    :param secret: the oauth secret of the application the requests are signed with
+    """
+
+    def __init__(self, fake: FakeTrello, handler: Callable[[dict, Any], Any], secret: str,
+                 callback_url: str = CALLBACK_URL):
+        self.fake = fake
+        self.handler = handler
+        self.secret = secret
+        self.callback_url = callback_url
+        self._delivered = len(fake.actions)
+
+    def event(self, action: dict[str, Any]) -> dict[str, Any]:
+        action = copy.deepcopy(action)
+        board = self.fake.boards[action["data"]["board"]["id"]]
+        action["data"]["board"]["name"] = board["name"]
+        body = json.dumps({"action": action, "model": {"id": board["id"], "name": board["name"]}})
+        return {"version": "2.0",
+                "headers": {"content-type": "application/json",
+                            SIGNATURE_HEADER: signature(body, self.callback_url, self.secret)},
+                "requestContext": {"http": {"method": "POST", "path": "/"}},
+                "body": body,
+                "isBase64Encoded": False}
+
+    def deliver(self) -> list[Any]:
+        """
+        Sends the actions since the last delivery one after another, the responses in their order.
+        Actions caused by the handler are delivered by the next call.
+        """
+        actions = self.fake.actions[self._delivered:]
+        self._delivered = len(self.fake.actions)
+        return [self.handler(self.event(action), None) for action in actions]
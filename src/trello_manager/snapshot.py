@@ -0,0 +1,174 @@
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from trello import Board, Card, Checklist, Label, List
+
+from .records import CARD_FIELDS, AnyCard, CardRecord
+
+
+class BoardSnapshot:
+    """
+    In-memory view of a board. Lists, open and closed cards, labels and checklists are fetched
+    with a single request on first access, all lookups afterwards are served without touching the API.
+
+    Cards are the live py-trello objects, so mutations done on them (and recorded with
+    ``move_card``) are visible in the following lookups.
+
+    :param include_closed: fetch the archived cards as well, boards with a long archive are a lot
+                           cheaper to load without them
+    :param compact: only request the fields of ``CARD_FIELDS`` and no checklists, the cards are
+                    ``CardRecord`` instead of ``trello.Card`` objects
+    """
+
+    _QUERY_PARAMS = {
+        "fields": "name,closed,dateLastActivity",
+        # archived lists can carry the name of a list in use
+        "lists": "open",
+        "cards": "all",
+        "card_fields": "all",
+        "labels": "all",
+        "labels_limit": 1000,
+        "checklists": "all",
+    }
+
+    def __init__(self, board: Board, include_closed: bool = True, compact: bool = False):
+        self.board: Board = board
+        self.include_closed = include_closed
+        self.compact = compact
+        self._lists: list[List] = []
+        self._labels: list[Label] = []
+        self._lists_by_id: dict[str, List] = {}
+        self._labels_by_id: dict[str, Label] = {}
+        self._cards: list[AnyCard] = []
+        self._date_last_activity: Optional[str] = None
+        self.fetched_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.fetched_at is not None
+
+    @property
+    def age(self) -> float:
+        if self.fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self.fetched_at
+
+    def expire(self):
+        """
+        The next access fetches the board again.
+        """
+        self.fetched_at = None
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.refresh()
+
+    @property
+    def lists(self) -> list[List]:
+        self._ensure_loaded()
+        return self._lists
+
+    @property
+    def labels(self) -> list[Label]:
+        self._ensure_loaded()
+        return self._labels
+
+    @property
+    def cards(self) -> list[AnyCard]:
+        self._ensure_loaded()
+        return self._cards
+
+    @property
+    def date_last_activity(self) -> Optional[str]:
+        self._ensure_loaded()
+        return self._date_last_activity
+
+    def refresh(self) -> dict[str, Any]:
+        """
+        :return: the board as fetched, e.g. to keep it in a state store
+        """
+        query_params = dict(self._QUERY_PARAMS)
+        if not self.include_closed:
+            query_params["cards"] = "open"
+        if self.compact:
+            query_params.update({"card_fields": CARD_FIELDS, "checklists": "none"})
+        json_obj: dict[str, Any] = self.board.client.fetch_json(f"/boards/{self.board.id}", query_params=query_params)
+        self.load(json_obj)
+        return json_obj
+
+    def load(self, json_obj: dict[str, Any]):
+        """
+        Takes the board from the response of a fetch, also one of an earlier run.
+        """
+        self.fetched_at = time.monotonic()
+        self._date_last_activity = json_obj.get("dateLastActivity")
+        self._lists = [List.from_json(self.board, list_json) for list_json in json_obj["lists"]]
+        self._labels = Label.from_json_list(self.board, json_obj["labels"])
+        self._lists_by_id = {trello_list.id: trello_list for trello_list in self._lists}
+        self._labels_by_id = {label.id: label for label in self._labels}
+        checklists: dict[str, list[Checklist]] = defaultdict(list)
+        for checklist_json in sorted(json_obj.get("checklists", []), key=lambda checklist: checklist["pos"]):
+            checklists[checklist_json["idCard"]].append(Checklist(self.board.client, checklist_json,
+                                                                  trello_card=checklist_json["idCard"]))
+        self._cards = []
+        for card_json in json_obj["cards"]:
+            card = self.card_from_json(card_json)
+            if isinstance(card, Card):
+                # the checklists are part of the snapshot, prevent the lazy fetch of py-trello
+                card._checklists = checklists[card.id]  # pylint: disable=protected-access
+            self._cards.append(card)
+
+    @property
+    def card_fields(self) -> str:
+        """
+        The card fields to request for cards that are added to this snapshot.
+        """
+        return CARD_FIELDS if self.compact else "all"
+
+    def card_from_json(self, card_json: dict[str, Any]) -> AnyCard:
+        parent = self.get_list_by_id(card_json["idList"]) or self.board
+        if self.compact:
+            return CardRecord(parent, card_json, self._labels_by_id)
+        return Card.from_json(parent, card_json)
+
+    def add_cards(self, cards: list[AnyCard]):
+        """
+        Adds cards fetched outside of the snapshot, e.g. archived cards of a snapshot without them.
+        """
+        known = {card.id for card in self.cards}
+        self._cards.extend(card for card in cards if card.id not in known)
+
+    def get_list_by_id(self, list_id: str) -> Optional[List]:
+        self._ensure_loaded()
+        return self._lists_by_id.get(list_id)
+
+    def get_list_by_name(self, name: str) -> Optional[List]:
+        for trello_list in self.lists:
+            if name == trello_list.name:
+                return trello_list
+        return None
+
+    def get_label_by_name(self, name: str) -> Optional[Label]:
+        for label in self.labels:
+            if name == label.name:
+                return label
+        return None
+
+    def list_cards(self, trello_list: List, closed: bool = False) -> list[AnyCard]:
+        cards = [card for card in self.cards if card.idList == trello_list.id and card.closed == closed]
+        return sorted(cards, key=lambda card: float(card.pos))
+
+    def open_cards(self) -> list[AnyCard]:
+        return [card for card in self.cards if not card.closed]
+
+    def closed_cards(self) -> list[AnyCard]:
+        return [card for card in self.cards if card.closed]
+
+    @staticmethod
+    def move_card(card: AnyCard, trello_list: List):
+        """
+        py-trello doesn't track the list of a card after ``change_list``, keep the snapshot in sync.
+        """
+        card.idList = trello_list.id
+        card.trello_list = trello_list
@@ -0,0 +1,226 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from .activity import BoardActivity, BoardActivityCache, CachedRun
+
+# snapshots and run metrics above this size in total are evicted, the least recently written first
+MAX_BYTES = 16 * 1024 * 1024
+# the runs and checkpoints are small and losing them costs full scans, they are never evicted
+_EVICTABLE = ("snapshots", "metrics")
+
+
+def _encode(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+class S3Sync:
+    """
+    Copies the file of a state store from and to S3, so a cold Lambda instance starts with the state of
+    the last run. boto3 is part of the Lambda runtime, it is imported on first use.
+
+    :param url: ``s3://<bucket>/<key>``
+    """
+
+    def __init__(self, url: str, client: Any = None):
+        parsed = urlparse(url)
+        if parsed.scheme != "s3" or not parsed.netloc or not parsed.path.strip("/"):
+            raise ValueError(f"not an s3 url: {url}")
+        self.bucket = parsed.netloc
+        self.key = parsed.path.lstrip("/")
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3  # pylint: disable=import-outside-toplevel
+            self._client = boto3.client("s3")
+        return self._client
+
+    def download(self, path: str) -> bool:
+        """
+        :return: whether there was a state to download, without one the store starts empty
+        """
+        tmp_path = f"{path}.download"
+        try:
+            self.client.download_file(self.bucket, self.key, tmp_path)
+        except Exception:  # pylint: disable=broad-except
+            # e.g. the first run, the state is only a cache
+            return False
+        os.replace(tmp_path, path)
+        return True
+
+    def upload(self, path: str):
+        self.client.upload_file(path, self.bucket, self.key)
+
+
+class StateStore(BoardActivityCache):
+    """
+    Durable state of the tasks in one SQLite file: the runs and checkpoints of ``BoardActivityCache``, the
+    board snapshots with the activity they were taken at and the metrics of the last runs. Values are
+    stored as compressed compact JSON, snapshots and metrics are evicted above ``max_bytes``. Every run and
+    checkpoint is a row of its own, stores on the same file don't overwrite the entries of each other.
+
+    :param sync: copy of the file in S3, downloaded if there is no local file and uploaded by ``push``
+    """
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, sync: Optional[S3Sync] = None):
+        self.max_bytes = max_bytes
+        self.sync = sync
+        self._db_lock = threading.RLock()
+        if sync and not os.path.exists(path):
+            sync.download(path)
+        try:
+            self._connection = self._connect(path)
+        except sqlite3.DatabaseError:
+            # a broken file, start over
+            os.remove(path)
+            self._connection = self._connect(path)
+        super().__init__(path)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(path, check_same_thread=False)
+        try:
+            with connection:
+                connection.execute("CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value BLOB, "
+                                   "size INTEGER, updated_at REAL, PRIMARY KEY (namespace, key))")
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def close(self):
+        self._connection.close()
+
+    def load(self, namespace: str, key: str) -> Any:
+        with self._db_lock:
+            row = self._connection.execute("SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                                           (namespace, key)).fetchone()
+        return _decode(row[0]) if row else None
+
+    def save(self, namespace: str, key: str, value: Any):
+        blob = _encode(value)
+        with self._db_lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                                     (namespace, key, blob, len(blob), time.time()))
+            if namespace in _EVICTABLE:
+                self._evict()
+
+    def delete(self, namespace: str, key: str):
+        with self._db_lock, self._connection:
+            self._connection.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def _evict(self):
+        rows = self._connection.execute(
+            f"SELECT namespace, key, size FROM entries WHERE namespace IN ({', '.join('?' * len(_EVICTABLE))}) "
+            "ORDER BY updated_at DESC", _EVICTABLE).fetchall()
+        total = 0
+        for namespace, key, size in rows:
+            total += size
+            if total > self.max_bytes:
+                self._connection.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    @property
+    def size(self) -> int:
+        """
+        Stored bytes of all values.
+        """
+        with self._db_lock:
+            return int(self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
+
+    def _load(self):
+        # the runs and checkpoints of older versions were one value, they are split into rows once
+        raw = self.load("activity", "cache")
+        if raw is None:
+            return
+        for board_id, tasks in raw.get("runs", {}).items():
+            for task, entry in tasks.items():
+                self.save("runs", f"{board_id}/{task}", entry)
+        for board_id, checkpoints in raw.get("checkpoints", {}).items():
+            for name, action_id in checkpoints.items():
+                self.set_checkpoint(board_id, name, action_id)
+        self.delete("activity", "cache")
+
+    def get(self, board_id: str, task: str) -> Optional[CachedRun]:
+        entry = self.load("runs", f"{board_id}/{task}")
+        return CachedRun(BoardActivity(*entry["activity"]), entry.get("valid_until")) if entry else None
+
+    def set(self, board_id: str, task: str, activity: BoardActivity, valid_until: Optional[float] = None):
+        self.save("runs", f"{board_id}/{task}", {"activity": list(activity), "valid_until": valid_until})
+
+    def invalidate(self, board_id: str):
+        with self._db_lock, self._connection:
+            self._connection.execute("DELETE FROM entries WHERE namespace = 'runs' AND substr(key, 1, ?) = ?",
+                                     (len(board_id) + 1, f"{board_id}/"))
+
+    def get_checkpoint(self, board_id: str, name: str) -> Optional[str]:
+        action_id: Optional[str] = self.load("checkpoints", f"{board_id}/{name}")
+        return action_id
+
+    def set_checkpoint(self, board_id: str, name: str, action_id: str):
+        self.save("checkpoints", f"{board_id}/{name}", action_id)
+
+    def load_snapshot(self, board_id: str, activity: BoardActivity, include_closed: bool,
+                      compact: bool) -> Optional[dict[str, Any]]:
+        """
+        The board as fetched for a snapshot, if nothing happened on the board since and the stored one has
+        at least the requested cards and fields.
+        """
+        entry = self.load("snapshots", board_id)
+        if not entry or BoardActivity(*entry["activity"]) != activity:
+            return None
+        if (include_closed and not entry["include_closed"]) or entry["compact"] != compact:
+            return None
+        board_json: dict[str, Any] = entry["board"]
+        return board_json
+
+    def save_snapshot(self, board_id: str, activity: BoardActivity, include_closed: bool, compact: bool,
+                      board_json: dict[str, Any]):
+        """
+        :param activity: taken before the board was fetched, a change in between only causes a miss
+        """
+        self.save("snapshots", board_id, {"activity": list(activity), "include_closed": include_closed,
+                                          "compact": compact, "board": board_json})
+
+    def record_run(self, summary: dict[str, Any], tasks: list[dict[str, Any]]):
+        finished_at = time.time()
+        # the embedded metric format is only meant for CloudWatch
+        summary = {name: value for name, value in summary.items() if name != "_aws"}
+        self.save("metrics", f"{finished_at:.6f}", {"finished_at": finished_at, "summary": summary, "tasks": tasks})
+
+    def run_history(self, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        The metrics of the last runs, the latest first.
+        """
+        with self._db_lock:
+            rows = self._connection.execute("SELECT value FROM entries WHERE namespace = 'metrics' "
+                                            "ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()
+        return [_decode(row[0]) for row in rows]
+
+    def push(self):
+        """
+        Uploads a consistent copy of the store, if it is synced to S3.
+        """
+        if not self.sync:
+            return
+        tmp_path = f"{self.path}.upload"
+        target = sqlite3.connect(tmp_path)
+        try:
+            with self._db_lock:
+                self._connection.backup(target)
+        finally:
+            target.close()
+        try:
+            self.sync.upload(tmp_path)
+        finally:
+            os.remove(tmp_path)
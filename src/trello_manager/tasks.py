@@ -0,0 +1,559 @@
+import os
+import time
+from contextlib import AbstractContextManager
+from functools import cached_property
+from itertools import chain
+from typing import Any, Callable, Optional, Union
+from datetime import date, datetime, timedelta, timezone
+
+from trello import Board, List, Card, Label
+import trello
+
+from .actions import actions_since, closed_card_ids_since, fetch_card_json, latest_action_id, scan_closed_cards
+from .activity import BoardActivity, fetch_board_activity
+from .executor import ThreadPoolWriteExecutor, WriteExecutor, gather
+from .instrumentation import Instrumentation
+from .mutations import CardMutationBuffer
+from .plan import ChangePlan, PlannedChange
+from .records import AnyCard, created_at, first_id_at
+from .reorder import OrderedList
+from .replay import due_key, plan_dues, replay_days
+from .schedule import Reminder, Schedule, load_schedule
+from .session import TrelloSession
+from .snapshot import BoardSnapshot
+
+
+# with less time left until the deadline of the session the low priority phases wait for the next run
+DEFER_RESERVE = 30.0
+
+
+class TrelloExecption(Exception):
+    pass
+
+
+class TrelloManager:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    _board_name = None  # type: str
+    _key = "TRELLO_API_KEY"
+    _secret = "TRELLO_API_SECRET"
+    _max_workers = 8
+
+    def __init__(self, session: Optional[TrelloSession] = None, dry_run: bool = False,
+                 board_name: Optional[str] = None, archived_card_ids: Optional[list[str]] = None):
+        """
+        :param dry_run: compute the changes of the run into ``plan`` without writing to trello or the cache
+        :param board_name: run on another board than the one of the task class
+        :param archived_card_ids: event mode, e.g. for a webhook, only these archived cards are looked at
+                                  instead of the whole archive
+        """
+        if board_name:
+            self._board_name = board_name
+        self.archived_card_ids = archived_card_ids
+        self.session: TrelloSession = session or TrelloSession.from_env(self._key, self._secret)
+        self.plan: Optional[ChangePlan] = ChangePlan() if dry_run else None
+        self.client: trello.TrelloClient = self.session.client
+        self.instrumentation: Instrumentation = self.session.instrumentation
+        self.executor: WriteExecutor = \
+            ThreadPoolWriteExecutor(self._max_workers) if self._max_workers > 1 else WriteExecutor()
+        self.mutations: CardMutationBuffer = CardMutationBuffer(self.client, self.plan)
+        self.board: Board = self._init_board(self._board_name)
+        if not self.board:
+            raise TrelloExecption(f"Board {self._board_name} doesn't exists.")
+        self.snapshot: BoardSnapshot = self.session.get_snapshot(self.board, self._needs_closed_cards())
+        # fetched by the activity check, saves the request when the snapshot is looked up in the state store
+        self._activity: Optional[BoardActivity] = None
+        # the activity before the reads of the run, everything after it is checked before the run is remembered
+        self._run_activity: Optional[BoardActivity] = None
+        # phases left for the next run
+        self.deferred: list[str] = []
+        # the archived cards of the event mode, fetched together with the snapshot
+        self._event_cards_json: Optional[list[dict[str, Any]]] = None
+
+    def _needs_closed_cards(self) -> bool:
+        """
+        Tasks with an own way to find the archived cards don't need them in the snapshot.
+        """
+        return self.archived_card_ids is None
+
+    def _independent_reads(self) -> list[Callable[[], None]]:
+        """
+        Reads of the run that don't depend on the snapshot, they are sent together with its refresh. Only the
+        ones not done yet are returned.
+        """
+        if self.archived_card_ids and self._event_cards_json is None:
+            return [self._read_event_cards]
+        return []
+
+    def _read_event_cards(self):
+        self._event_cards_json = fetch_card_json(self.client, self.snapshot.card_fields, self.archived_card_ids or [])
+
+    def _fetch_event_cards(self) -> list[AnyCard]:
+        """
+        The archived cards of the event mode, they are added to the snapshot.
+        """
+        if self._event_cards_json is None:
+            self._read_event_cards()
+        cards_json, self._event_cards_json = self._event_cards_json or [], None
+        cards = [self.snapshot.card_from_json(card_json) for card_json in cards_json]
+        # the cards could have been restored or deleted since the event
+        return self._adopt_cards([card for card in cards if card.closed])
+
+    def _adopt_cards(self, cards: list[AnyCard]) -> list[AnyCard]:
+        """
+        Adds cards fetched outside of the snapshot to it. Cards already in the snapshot are returned as its
+        instances, so the changes of the run are seen by all phases.
+        """
+        self.snapshot.add_cards(cards)
+        card_ids = {card.id for card in cards}
+        return [card for card in self.snapshot.cards if card.id in card_ids]
+
+    @property
+    def labels(self) -> list[Label]:
+        return self.snapshot.labels
+
+    def phase(self, name: str, **fields: Any) -> AbstractContextManager:
+        """
+        Span around one phase of the task run, e.g. ``with self.phase("sort_list", list=name):``.
+        """
+        return self.instrumentation.span(f"{type(self).__name__}.{name}", board=self._board_name, **fields)
+
+    def log(self, message: str, level: str = "info", **fields: Any):
+        self.instrumentation.event(message, level, task=type(self).__name__, board=self._board_name, **fields)
+
+    def has_time_for(self, phase: str) -> bool:
+        """
+        Low priority phases, e.g. sorting, are deferred to the next run close to the deadline of the session.
+        The moves of the cards are done in any case, they are written with the same request anyway.
+        """
+        deadline = self.session.deadline
+        if deadline is None or deadline.remaining() >= DEFER_RESERVE:
+            return True
+        self.log("phase deferred to the next run", "warning", phase=phase, remaining=round(deadline.remaining(), 3))
+        self.deferred.append(phase)
+        return False
+
+    def _init_board(self, board_name: str) -> Union[Board, None]:
+        return self.session.get_board(board_name)
+
+    def get_list_by_name(self, name: str) -> Union[List, None]:
+        trello_list = self.snapshot.get_list_by_name(name)
+        if not trello_list:
+            # the list could have been created after the snapshot was taken
+            self.refresh()
+            trello_list = self.snapshot.get_list_by_name(name)
+        return trello_list
+
+    def refresh(self, max_age: float = 0.0):
+        """
+        Refetches the snapshot of the board, unless it is younger than ``max_age`` seconds. With a state store
+        a snapshot of an earlier run is taken instead, if nothing happened on the board since.
+        """
+        if self.snapshot.age <= max_age:
+            return
+        reads = self._independent_reads()
+        if reads:
+            gather(self._refresh_snapshot, *reads)
+            return
+        self._refresh_snapshot()
+
+    def _refresh_snapshot(self):
+        state = self.session.state
+        if state is None:
+            self.snapshot.refresh()
+            return
+        # the activity of the check is only valid right after it, the run could have written in between
+        activity, self._activity = self._activity or fetch_board_activity(self.board), None
+        snapshot = self.snapshot
+        board_json = state.load_snapshot(self.board.id, activity, snapshot.include_closed, snapshot.compact)
+        if board_json is not None:
+            self.log("board unchanged since the stored snapshot")
+            snapshot.load(board_json)
+            return
+        board_json = snapshot.refresh()
+        if self.plan is None:
+            state.save_snapshot(self.board.id, activity, snapshot.include_closed, snapshot.compact, board_json)
+
+    def _board_unchanged(self) -> bool:
+        """
+        Checks with one cheap request whether anything happened on the board since the last run of this task.
+        Without an activity cache in the session every run counts as changed, like every run for an event.
+        """
+        if self.archived_card_ids is not None:
+            return False
+        cache = self.session.activity_cache
+        if not cache:
+            return False
+        self._activity = self._run_activity = fetch_board_activity(self.board)
+        cached_run = cache.get(self.board.id, type(self).__name__)
+        if not cached_run:
+            return False
+        if cached_run.valid_until is not None and time.time() >= cached_run.valid_until:
+            return False
+        return self._activity == cached_run.activity
+
+    def _remember_run(self, valid_until: Optional[float] = None):
+        """
+        Stores the activity of the board after the writes of this run, if all actions since the activity check
+        are these writes. A change by someone else during the run is left for the next run. Runs with deferred
+        phases are not remembered, the next run has to do them even without activity on the board.
+        """
+        cache = self.session.activity_cache
+        before = self._run_activity
+        # a run for an event only looked at its cards, not at the rest of the board
+        if not cache or before is None or self.plan is not None or self.archived_card_ids is not None \
+                or self.deferred:
+            return
+        activity = fetch_board_activity(self.board)
+        if activity.last_action_id == before.last_action_id:
+            # nothing written, a change without an action is found by the next run
+            activity = before
+        elif not self._only_own_writes_since(before):
+            self.log("board changed during the run, it is not remembered")
+            return
+        cache.set(self.board.id, type(self).__name__, activity, valid_until)
+
+    def _only_own_writes_since(self, activity: BoardActivity) -> bool:
+        actions = actions_since(self.board, activity.last_action_id)
+        if actions is None:
+            return False
+        written = self.mutations.written
+        return all(action["type"] == "updateCard" and action["data"].get("card", {}).get("id") in written
+                   for action in actions)
+
+
+class ShoppingTask(TrelloManager):
+    _board_name: str = "Einkaufen"
+
+    label: dict[str, str] = {"Drogerie": "Drogerie",
+                             "Lebensmittel": "Lebensmittel",
+                             "Getränke": "Lebensmittel"}
+
+    _CHECKPOINT = "closed_cards"
+
+    def __init__(self, session: Optional[TrelloSession] = None, dry_run: bool = False,
+                 board_name: Optional[str] = None, archived_card_ids: Optional[list[str]] = None):
+        super().__init__(session, dry_run, board_name, archived_card_ids)
+        # only advanced in the cache after all writes of the run went through
+        self._pending_checkpoint: Optional[str] = None
+        self._actions_read = False
+        # the cards archived since the checkpoint, None without a checkpoint
+        self._archived_json: Optional[list[dict[str, Any]]] = None
+
+    def _needs_closed_cards(self) -> bool:
+        # the archived cards are found via the actions of the board or a scan of the archive
+        return False
+
+    @cached_property
+    def lists(self) -> dict[str, List]:
+        return self._get_lists()
+
+    @cached_property
+    def ordered_lists(self) -> dict[str, OrderedList]:
+        """
+        The cards of the lists by name, taken before the archived cards are moved into them.
+        """
+        return {list_str: OrderedList(sorted(self.snapshot.list_cards(card_list), key=self._name_key),
+                                      self._name_key)
+                for list_str, card_list in self.lists.items()}
+
+    @staticmethod
+    def _name_key(card: AnyCard) -> str:
+        return card.name.lower()
+
+    def run(self):
+        with self.phase("check_activity"):
+            unchanged = self._board_unchanged()
+        if unchanged:
+            self.log("board unchanged since the last run, nothing to do")
+            return
+        with self.phase("refresh"):
+            self.refresh(self.session.snapshot_max_age)
+        with self.phase("get_archived_cards"):
+            cards = self._get_archived_cards()
+        with self.phase("move_to_category"):
+            self._move_to_category(cards)
+        if self.has_time_for("sort_list"):
+            for list_str in self.lists:
+                with self.phase("sort_list", list=list_str):
+                    self._sort_list(list_str)
+        with self.phase("flush", cards=len(self.mutations)):
+            self.mutations.flush(self.executor)
+        self._advance_checkpoint()
+        self._remember_run()
+
+    def _sort_list(self, list_str: str):
+        # the restored cards are already in place, unless the list was out of order before
+        self.ordered_lists[list_str].reorder(self.mutations)
+
+    def _get_archived_cards(self) -> dict[str, list[AnyCard]]:
+        label_keys = self.label.keys()
+        cards: dict[str, list[AnyCard]] = {}
+        for key in self.label.values():
+            cards[key] = []
+        for card in self._closed_cards():
+            if card.labels:
+                for label in card.labels:
+                    if label.name in label_keys:
+                        cards[self.label[label.name]].append(card)
+                        break
+        return cards
+
+    def _independent_reads(self) -> list[Callable[[], None]]:
+        reads = super()._independent_reads()
+        if self.archived_card_ids is None and self.session.activity_cache and not self._actions_read:
+            reads.append(self._read_actions)
+        return reads
+
+    def _read_actions(self):
+        """
+        The cards archived since the checkpoint, found in the actions of the board. Without a checkpoint only
+        the latest action is read, it is the checkpoint for the next run.
+        """
+        self._actions_read = True
+        cache = self.session.activity_cache
+        checkpoint = cache.get_checkpoint(self.board.id, self._CHECKPOINT) if cache else None
+        if checkpoint:
+            card_ids, newest_action = closed_card_ids_since(self.board, checkpoint)
+            self._pending_checkpoint = newest_action or checkpoint
+            self._archived_json = fetch_card_json(self.client, self.snapshot.card_fields, card_ids)
+        elif cache:
+            # taken before the scan, cards archived during the scan are picked up by the next run
+            self._pending_checkpoint = latest_action_id(self.board)
+
+    def _closed_cards(self) -> list[AnyCard]:
+        """
+        Only the cards archived since the checkpoint of the last run. Without a checkpoint the whole archive is
+        scanned for cards with a label of a category, the scan needs the labels of the snapshot.
+        """
+        if self.archived_card_ids is not None:
+            return self._fetch_event_cards()
+        if self.session.activity_cache and not self._actions_read:
+            self._read_actions()
+        if self._archived_json is not None:
+            cards = [self.snapshot.card_from_json(card_json) for card_json in self._archived_json]
+        else:
+            label_ids = {label.id for label in self.snapshot.labels if label.name in self.label}
+            cards = list(scan_closed_cards(self.snapshot, label_ids))
+        # cards could have been restored or deleted in the meantime
+        return [card for card in self._adopt_cards(cards) if card.closed]
+
+    def _advance_checkpoint(self):
+        cache = self.session.activity_cache
+        if cache and self._pending_checkpoint and self.plan is None:
+            cache.set_checkpoint(self.board.id, self._CHECKPOINT, self._pending_checkpoint)
+
+    def _get_lists(self) -> dict[str, List]:
+        lists = {}
+        for list_name in self.label.values():
+            lists[list_name] = self.get_list_by_name(f"Gerade nicht kaufen ({list_name})")
+        return lists
+
+    def _move_to_category(self, card_dict: dict[str, list[AnyCard]]):
+        ordered_lists = self.ordered_lists
+        for key in card_dict:
+            for card in card_dict[key]:
+                self.mutations.move(card, self.lists[key])
+                self.mutations.set_closed(card, False)
+                ordered_lists[key].insert(card, self.mutations)
+
+
+class ReplayDateTask(TrelloManager):
+    _board_name = "Tasks"
+    _DAYS_FOR_TODO = 2
+
+    def __init__(self, session: Optional[TrelloSession] = None, dry_run: bool = False,
+                 board_name: Optional[str] = None, archived_card_ids: Optional[list[str]] = None):
+        super().__init__(session, dry_run, board_name, archived_card_ids)
+        self.today: datetime = datetime.now().replace(tzinfo=timezone.utc)
+        # ids of the cards taken out of the archive in this run
+        self._restored: set[str] = set()
+
+    def _needs_closed_cards(self) -> bool:
+        # only the archived replay cards are of interest, they are scanned for
+        return False
+
+    @cached_property
+    def todo_list(self) -> List:
+        return self.get_list_by_name("ToDo")
+
+    @cached_property
+    def replay_list(self) -> List:
+        return self.get_list_by_name("Replay")
+
+    @cached_property
+    def dailys_list(self) -> List:
+        return self.get_list_by_name("Dailys")
+
+    @cached_property
+    def backlog_list(self) -> List:
+        return self.get_list_by_name("Backlog")
+
+    @cached_property
+    def replay_label(self) -> Optional[Label]:
+        return self.snapshot.get_label_by_name("replay")
+
+    def run(self):
+        with self.phase("check_activity"):
+            unchanged = self._board_unchanged()
+        if unchanged:
+            self.log("board unchanged and no due date reached, nothing to do")
+            return
+        with self.phase("refresh"):
+            self.refresh(self.session.snapshot_max_age)
+        with self.phase("extract_from_archive"):
+            self._extract_from_archive()
+        next_dues = []
+        for trello_list in (self.replay_list, self.backlog_list):
+            with self.phase("schedule_list", list=trello_list.name):
+                next_due = self._schedule_list(trello_list)
+            if next_due is not None:
+                next_dues.append(next_due)
+        with self.phase("flush", cards=len(self.mutations)):
+            self.mutations.flush(self.executor)
+        self._remember_run(self._next_move_to_todo(next_dues))
+
+    def _next_move_to_todo(self, next_dues: list[float]) -> Optional[float]:
+        """
+        Timestamp at which the next card of the replay or backlog list has to be moved to the todo list.
+        """
+        if not next_dues:
+            return None
+        return min(next_dues) - timedelta(days=self._DAYS_FOR_TODO).total_seconds()
+
+    def _extract_from_archive(self):
+        if self.archived_card_ids is not None:
+            self._fetch_event_cards()
+        elif self.replay_label is not None:
+            # only the archive of the todo list, the one of the board can be a lot longer
+            self._adopt_cards(list(scan_closed_cards(self.snapshot, {self.replay_label.id}, self.todo_list.id)))
+        for card in self.snapshot.list_cards(self.todo_list, closed=True):
+            if card.labels:
+                if self.replay_label in card.labels:
+                    self.log("reopening card", card=card.name)
+                    self.mutations.move(card, self.replay_list)
+                    self.mutations.set_closed(card, False)
+                    self._restored.add(card.id)
+                    replay_time = replay_days(card.name)
+                    if replay_time is None:
+                        self.log("no valid duration in card name", "error", card=card.name)
+                        continue
+                    self.mutations.set_due(card, self.today + timedelta(days=replay_time))
+
+    def _schedule_list(self, trello_list: List) -> Optional[float]:
+        """
+        Moves the cards due within the next days to the todo list and sorts the remaining ones by due date.
+        Cards taken out of the archive are inserted between the others, which keep their positions.
+
+        :return: the earliest due date (unix timestamp) left in the list
+        """
+        deadline = (self.today + timedelta(days=self._DAYS_FOR_TODO)).timestamp()
+        plan = plan_dues(self.snapshot.list_cards(trello_list), deadline)
+        for card in plan.to_todo:
+            self.mutations.move(card, self.todo_list)
+        ordered = OrderedList([card for card in plan.order if card.id not in self._restored], due_key)
+        for card in plan.order:
+            if card.id in self._restored:
+                ordered.insert(card, self.mutations)
+        if self.has_time_for("sort_list"):
+            ordered.reorder(self.mutations)
+        return plan.next_due
+
+
+class ScheduledTodos(TrelloManager):
+    def _needs_closed_cards(self) -> bool:
+        # only the cards archived on the same day are of interest, they are scanned for
+        return False
+
+    @cached_property
+    def orga_label(self) -> Optional[Label]:
+        return self.snapshot.get_label_by_name("Orga")
+
+    @cached_property
+    def todo_list(self) -> List:
+        return self.get_list_by_name("ToDo")
+
+    def create_scheduled_reminder(self, title: str,
+                                  checklist: list[str],
+                                  days_of_month: Optional[list[int]] = None,
+                                  days_of_week: Optional[list[int]] = None,  # 0-6
+                                  months_of_year: Optional[list[int]] = None) -> None:
+        # only the titles of the schedule files are formatted with the date
+        title = title.replace("{", "{{").replace("}", "}}")
+        reminder = Reminder(title, tuple(checklist), frozenset(days_of_week or ()),
+                            frozenset(days_of_month or ()), frozenset(months_of_year or ()))
+        self.create_scheduled_todos(Schedule([reminder]))
+
+    def create_scheduled_todos(self, schedule: Schedule) -> None:
+        """
+        Creates the todos of all reminders of the board that are due tomorrow. Todos already created today,
+        e.g. by a retried invocation, are skipped.
+        """
+        tomorrow: date = (datetime.today() + timedelta(days=1)).date()
+        for reminder in schedule.for_board(self._board_name).reminders_on(tomorrow):
+            title = reminder.title_for(tomorrow)
+            if (title, tomorrow - timedelta(days=1)) in self.created_todos:
+                self.log("todo already created", title=title)
+                continue
+            self.create_todo(title, list(reminder.checklist))
+
+    @cached_property
+    def created_todos(self) -> set[tuple[str, date]]:
+        """
+        Name and day of creation of the cards of the board, including the ones archived since midnight.
+        """
+        return {(card.name, created_at(card.id).date())
+                for card in chain(self.snapshot.cards, self._archived_today())}
+
+    def _archived_today(self) -> list[AnyCard]:
+        """
+        The archived cards created since midnight, the scan stops at the first page with older cards.
+        """
+        midnight = datetime.combine(datetime.today().date(), datetime.min.time())
+        return list(scan_closed_cards(self.snapshot, since=first_id_at(midnight)))
+
+    def create_todo(self, title: str, checklist: Optional[list[str]]) -> None:
+        with self.phase("create_todo", title=title):
+            labels = [self.orga_label] if self.orga_label else None
+            if self.plan is not None:
+                self.plan.add(PlannedChange("create", title, self.todo_list.name,
+                                            {"idLabels": [label.id for label in labels or []], "pos": "top",
+                                             "checklist": checklist or []},
+                                            1 + (1 + len(checklist) if checklist else 0)))
+                self.created_todos.add((title, datetime.today().date()))
+                return
+            # position and label go with the creation, py-trello would send them as separate updates
+            todo_card: Card = self.todo_list.add_card(title, labels=labels, position="top")
+            if checklist:
+                self._add_checklist(todo_card, "Checklist", checklist)
+            self.snapshot.add_cards([todo_card])
+            self.created_todos.add((title, created_at(todo_card.id).date()))
+
+    def _add_checklist(self, card: Card, name: str, items: list[str]):
+        """
+        Like ``Card.add_checklist``, but the items are sent in parallel and the card isn't fetched again.
+        """
+        checklist = self.client.fetch_json(f"/cards/{card.id}/checklists", http_method="POST",
+                                           post_args={"name": name})
+        for pos, item in enumerate(items, start=1):
+            # explicit positions keep the order of the items independent of the order of the requests
+            self.executor.submit(self.client.fetch_json, f"/checklists/{checklist['id']}/checkItems",
+                                 http_method="POST", post_args={"name": item, "pos": pos})
+        self.executor.join()
+
+
+class PrivateTodos(ScheduledTodos):
+    _board_name = "Tasks"
+    _schedule_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedules", "private_todos.json")
+
+    def run(self):
+        with self.phase("refresh"):
+            self.refresh(self.session.snapshot_max_age)
+        self.create_scheduled_todos(load_schedule(self._schedule_path))
+
+
+# the tasks by name for configurations, in the order the lambda runs them
+TASK_TYPES: dict[str, type[TrelloManager]] = {task.__name__: task
+                                              for task in (ReplayDateTask, ShoppingTask, PrivateTodos)}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
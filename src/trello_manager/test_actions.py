@@ -0,0 +1,141 @@
+# pylint: disable=protected-access
+import os
+import tempfile
+from unittest import mock, skipUnless
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, OFFLINE, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import ShoppingTask, TrelloSession
+from src.trello_manager.actions import closed_card_ids_since, fetch_cards, iter_closed_cards, latest_action_id, \
+    scan_closed_cards
+from src.trello_manager.activity import BoardActivityCache
+from src.trello_manager.snapshot import BoardSnapshot
+
+
+class TestActions(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        self.list = self.board.add_list("Liste")
+
+    def test_closed_card_ids_since(self):
+        card_early = self.list.add_card("Early")
+        card_early.set_closed(True)
+        checkpoint = latest_action_id(self.board)
+        card_a = self.list.add_card("A")
+        card_b = self.list.add_card("B")
+        self.list.add_card("Open")
+        card_a.set_closed(True)
+        card_b.set_closed(True)
+        card_ids, newest_action = closed_card_ids_since(self.board, checkpoint)
+        compare({card_a.id, card_b.id}, set(card_ids))
+        compare(latest_action_id(self.board), newest_action)
+        compare(([], None), closed_card_ids_since(self.board, newest_action))
+
+    def test_fetch_cards(self):
+        card = self.list.add_card("A")
+        cards = fetch_cards(BoardSnapshot(self.board), [card.id])
+        compare(["A"], [fetched.name for fetched in cards])
+        compare(self.list.id, cards[0].trello_list.id)
+
+    def test_iter_closed_cards_page_by_page(self):
+        card_ids = [self.list.add_card(name).id for name in "ABCDE"]
+        self.list.archive_all_cards()
+        self.list.add_card("Open")
+        pages = iter_closed_cards(self.board, "name", page_size=2)
+        compare(card_ids[::-1], [card_json["id"] for card_json in pages])
+        if self.fake:
+            # the last page is a short one
+            compare(3, self.fake.calls["GET boards/{id}/cards/closed"])
+
+    @skipUnless(OFFLINE, "the fake ignores the paging")
+    def test_iter_closed_cards_without_paging(self):
+        card_ids = [self.list.add_card(name).id for name in "ABCDE"]
+        self.list.archive_all_cards()
+        cards_page = self.fake._cards_page
+
+        def ignore_before(cards, query):
+            return cards_page(cards, {name: value for name, value in query.items() if name != "before"})
+
+        with mock.patch.object(self.fake, "_cards_page", ignore_before):
+            pages = iter_closed_cards(self.board, "name", page_size=2)
+            compare(card_ids[:2:-1], [card_json["id"] for card_json in pages])
+        # the repeated page ends the paging
+        compare(2, self.fake.calls["GET boards/{id}/cards/closed"])
+
+    def test_scan_closed_cards_filtered(self):
+        other_list = self.board.add_list("Andere Liste")
+        label = self.board.add_label("Lebensmittel", "orange")
+        self.list.add_card("A", labels=[label])
+        self.list.add_card("B")
+        other_list.add_card("C", labels=[label])
+        self.list.archive_all_cards()
+        other_list.archive_all_cards()
+        snapshot = BoardSnapshot(self.board, include_closed=False)
+        compare(["C", "A"], [card.name for card in scan_closed_cards(snapshot, {label.id})])
+        compare(["A"], [card.name for card in scan_closed_cards(snapshot, {label.id}, self.list.id)])
+
+
+class TestIncrementalShoppingTask(TrelloTest):
+    ShoppingTask._board_name = TEST_BOARD
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache = BoardActivityCache(os.path.join(self.directory.name, "cache.json"))
+        self.buy_list = self.board.add_list("Wichtiges Einkaufen")
+        self.list_lebensmittel = self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.list_drogerie = self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        self.label_lebensmittel = self.board.add_label("Lebensmittel", "orange")
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def _task(self) -> ShoppingTask:
+        return ShoppingTask(TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET], activity_cache=self.cache))
+
+    def test_full_scan_then_incremental(self):
+        self.buy_list.add_card("Milch", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+        task = self._task()
+        self.assertFalse(task.snapshot.include_closed)
+        task.run()
+        compare(["Milch"], [card.name for card in self.list_lebensmittel.list_cards()])
+        checkpoint = self.cache.get_checkpoint(self.board.id, ShoppingTask._CHECKPOINT)
+        self.assertIsNotNone(checkpoint)
+
+        self.buy_list.add_card("Brot", labels=[self.label_lebensmittel])
+        restored = self.buy_list.add_card("Butter", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+        restored.set_closed(False)
+        self._task().run()
+        compare(["Brot", "Milch"], [card.name for card in self.list_lebensmittel.list_cards()])
+        compare(["Butter"], [card.name for card in self.buy_list.list_cards()])
+        self.assertNotEqual(checkpoint, self.cache.get_checkpoint(self.board.id, ShoppingTask._CHECKPOINT))
+
+    def test_actions_read_with_the_snapshot(self):
+        self._task().run()
+        self.buy_list.add_card("Milch", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+        task = self._task()
+        task.refresh()
+        self.assertTrue(task._actions_read)
+        compare(["Milch"], [card.name for card in task._closed_cards()])
+
+    def test_checkpoint_kept_on_failed_writes(self):
+        self._task().run()
+        checkpoint = self.cache.get_checkpoint(self.board.id, ShoppingTask._CHECKPOINT)
+        self.buy_list.add_card("Milch", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+        task = self._task()
+
+        def failing_flush(executor=None):
+            raise RuntimeError(executor)
+
+        task.mutations.flush = failing_flush  # type: ignore
+        with self.assertRaises(RuntimeError):
+            task.run()
+        compare(checkpoint, self.cache.get_checkpoint(self.board.id, ShoppingTask._CHECKPOINT))
+        self._task().run()
+        compare(["Milch"], [card.name for card in self.list_lebensmittel.list_cards()])
@@ -0,0 +1,112 @@
+# pylint: disable=protected-access
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import ReplayDateTask, ShoppingTask, TrelloSession
+from src.trello_manager.activity import BoardActivity, BoardActivityCache, CachedRun
+
+
+class TestBoardActivityCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "cache.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_persistence(self):
+        cache = BoardActivityCache(self.path)
+        compare(None, cache.get("board", "Task"))
+        cache.set("board", "Task", BoardActivity("2024-01-01T00:00:00.000Z", "action"), 12.5)
+        compare(CachedRun(BoardActivity("2024-01-01T00:00:00.000Z", "action"), 12.5),
+                BoardActivityCache(self.path).get("board", "Task"))
+        cache.invalidate("board")
+        compare(None, BoardActivityCache(self.path).get("board", "Task"))
+
+    def test_checkpoints(self):
+        cache = BoardActivityCache(self.path)
+        compare(None, cache.get_checkpoint("board", "closed_cards"))
+        cache.set_checkpoint("board", "closed_cards", "action")
+        cache.set("board", "Task", BoardActivity(None, "action"))
+        cache.invalidate("board")
+        compare("action", BoardActivityCache(self.path).get_checkpoint("board", "closed_cards"))
+
+    def test_corrupt_file(self):
+        with open(self.path, "w", encoding="utf-8") as cache_file:
+            cache_file.write("{")
+        compare(None, BoardActivityCache(self.path).get("board", "Task"))
+
+
+class TestSkipUnchangedBoard(TrelloTest):
+    ShoppingTask._board_name = TEST_BOARD
+    ReplayDateTask._board_name = TEST_BOARD
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache = BoardActivityCache(os.path.join(self.directory.name, "cache.json"))
+        self.list_todo = self.board.add_list("ToDo")
+        self.list_replay = self.board.add_list("Replay")
+        self.list_backlog = self.board.add_list("Backlog")
+        self.buy_list = self.board.add_list("Wichtiges Einkaufen")
+        self.list_lebensmittel = self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.list_drogerie = self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        self.label_lebensmittel = self.board.add_label("Lebensmittel", "orange")
+        self.board.add_label("replay", "red")
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def _session(self) -> TrelloSession:
+        return TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET], activity_cache=self.cache)
+
+    def test_shopping_task(self):
+        task = ShoppingTask(self._session())
+        self.assertFalse(task._board_unchanged())
+        task.run()
+        self.assertTrue(ShoppingTask(self._session())._board_unchanged())
+
+        self.buy_list.add_card("Test_Item", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+        task = ShoppingTask(self._session())
+        self.assertFalse(task._board_unchanged())
+        task.run()
+        compare(["Test_Item"], [card.name for card in self.list_lebensmittel.list_cards()])
+
+    def test_card_archived_during_the_run(self):
+        self.buy_list.add_card("Milch", labels=[self.label_lebensmittel])
+        self.buy_list.archive_all_cards()
+        late_card = self.buy_list.add_card("Brot", labels=[self.label_lebensmittel])
+        task = ShoppingTask(self._session())
+        flush = task.mutations.flush
+
+        def flush_with_archived_card(executor=None):
+            late_card.set_closed(True)
+            return flush(executor)
+
+        task.mutations.flush = flush_with_archived_card  # type: ignore
+        task.run()
+        compare(["Milch"], [card.name for card in self.list_lebensmittel.list_cards()])
+
+        task = ShoppingTask(self._session())
+        self.assertFalse(task._board_unchanged())
+        task.run()
+        compare(["Brot", "Milch"], [card.name for card in self.list_lebensmittel.list_cards()])
+        self.assertTrue(ShoppingTask(self._session())._board_unchanged())
+
+    def test_replay_task_due_date_reached(self):
+        due = datetime.now() + timedelta(days=5)
+        self.list_replay.add_card("Test_Replay (5 d)", due=due.strftime("%Y-%m-%d"))
+        ReplayDateTask(self._session()).run()
+        self.assertTrue(ReplayDateTask(self._session())._board_unchanged())
+        cached_run = self.cache.get(self.board.id, "ReplayDateTask")
+        self.assertLessEqual(cached_run.valid_until, (due - timedelta(days=2)).timestamp())
+
+        self.cache.set(self.board.id, "ReplayDateTask", cached_run.activity, datetime.now().timestamp())
+        self.assertFalse(ReplayDateTask(self._session())._board_unchanged())
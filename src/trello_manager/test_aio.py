@@ -0,0 +1,54 @@
+import asyncio
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import AsyncTrelloManager, ShoppingTask, TrelloSession
+from src.trello_manager import session as session_module
+from src.trello_manager.orchestrator import SNAPSHOT_MAX_AGE
+from src.trello_manager.test_orchestrator import BrokenTask, ConcurrencyTask
+
+
+class SharedSessionTask(ConcurrencyTask):
+    _key = TEST_KEY
+    _secret = TEST_SECRET
+
+
+class TestAsyncTrelloManager(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        self.session = TrelloSession.from_env(TEST_KEY, TEST_SECRET)
+        self.buy_list = self.board.add_list("Wichtiges Einkaufen")
+        self.food_list = self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        self.label = self.board.add_label("Lebensmittel", "orange")
+
+    async def _run_all(self):
+        return await asyncio.gather(AsyncTrelloManager(ShoppingTask, self.session, board_name=TEST_BOARD).run(),
+                                    AsyncTrelloManager(BrokenTask, self.session).run())
+
+    def test_tasks_awaited_together(self):
+        self.buy_list.add_card("Milch", labels=[self.label])
+        self.buy_list.archive_all_cards()
+
+        results = asyncio.run(self._run_all())
+
+        compare([("ShoppingTask", True), ("BrokenTask", False)], [(result.name, result.ok) for result in results])
+        compare(["Milch"], [card.name for card in self.food_list.list_cards()])
+
+    def test_tasks_on_one_board_one_after_another(self):
+        ConcurrencyTask.peak = 0
+
+        async def run_all():
+            return await asyncio.gather(*(AsyncTrelloManager(ConcurrencyTask, self.session).run() for _ in range(3)))
+
+        compare([True] * 3, [result.ok for result in asyncio.run(run_all())])
+        compare(1, ConcurrencyTask.peak)
+
+    def test_shared_session_without_session(self):
+        session_module._SHARED_SESSIONS.clear()  # pylint: disable=protected-access
+        task = AsyncTrelloManager(SharedSessionTask)
+
+        compare(True, asyncio.run(task.run()).ok)
+        self.assertIs(TrelloSession.shared(TEST_KEY, TEST_SECRET), task.session)
+        compare(SNAPSHOT_MAX_AGE, task.session.snapshot_max_age)
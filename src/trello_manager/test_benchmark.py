@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.trello_manager.benchmark import main, run_benchmark, run_replay_benchmark
+
+
+class TestBenchmark(TestCase):
+    @staticmethod
+    def _requests(results: dict) -> dict[str, int]:
+        return {task: result["total"]["requests"] for task, result in results["tasks"].items()}
+
+    def test_phases_cover_all_requests(self):
+        results = run_benchmark(lists=6, open_cards=30, closed_cards=40)
+        compare(["ShoppingTask", "ReplayDateTask", "PrivateTodos"], list(results["tasks"]))
+        for result in results["tasks"].values():
+            compare(result["total"]["requests"], sum(phase["requests"] for phase in result["phases"].values()))
+            compare(1, result["phases"]["init"]["requests"])
+        compare(1, results["tasks"]["ShoppingTask"]["phases"]["refresh"]["requests"])
+        compare(self._requests(results), self._requests(run_benchmark(lists=6, open_cards=30, closed_cards=40)))
+
+    def test_main_writes_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.json")
+            main(["--lists", "4", "--open", "5", "--closed", "5", "--replay-cards", "100", "--output", path])
+            with open(path, encoding="utf-8") as output:
+                results = json.load(output)
+        compare({"lists": 4, "open_cards": 5, "closed_cards": 5, "latency": 0.0, "seed": 1, "date": "2024-01-09"},
+                results["parameters"])
+        compare(100, results["replay_scheduling"]["cards"])
+
+    def test_replay_benchmark(self):
+        result = run_replay_benchmark(cards=1000, repeat=1)
+        compare(["replay_days", "plan_dues"], list(result["stages"]))
+        for stage in result["stages"].values():
+            self.assertGreater(stage["ms"], 0)
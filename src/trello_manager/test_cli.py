@@ -0,0 +1,71 @@
+# pylint: disable=protected-access
+import io
+import json
+import os
+from contextlib import redirect_stdout
+
+from freezegun import freeze_time
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import PrivateTodos, ReplayDateTask, ShoppingTask, TrelloSession
+from src.trello_manager.cli import dry_run, main
+from src.trello_manager.orchestrator import SNAPSHOT_MAX_AGE
+
+
+class TestDryRun(TrelloTest):
+    ShoppingTask._board_name = TEST_BOARD
+    ReplayDateTask._board_name = TEST_BOARD
+    PrivateTodos._board_name = TEST_BOARD
+
+    def setUp(self):
+        super().setUp()
+        self.todo_list = self.board.add_list("ToDo")
+        self.replay_list = self.board.add_list("Replay")
+        self.board.add_list("Backlog")
+        self.orga_label = self.board.add_label("Orga", "green")
+        self.session = TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET], snapshot_max_age=SNAPSHOT_MAX_AGE)
+
+    def test_nothing_written(self):
+        self.replay_list.add_card("Replay (5 d)", due="2024-01-08")
+        if self.fake:
+            self.fake.reset_calls()
+
+        with freeze_time("2024-01-07"):
+            result = dry_run([ReplayDateTask, PrivateTodos], self.session)
+
+        replay_plan = result["tasks"]["ReplayDateTask"]
+        compare([("update", "Replay (5 d)", "ToDo")],
+                [(change["action"], change["card"], change["list"]) for change in replay_plan["changes"]])
+        private_plan = result["tasks"]["PrivateTodos"]
+        compare([("create", "DAILYS Mon", "ToDo", 6)],
+                [(change["action"], change["card"], change["list"], change["requests"])
+                 for change in private_plan["changes"]])
+        compare([self.orga_label.id], private_plan["changes"][0]["fields"]["idLabels"])
+        compare(replay_plan["requests"] + private_plan["requests"], result["writes"])
+        compare(result["reads"] + result["writes"], result["requests"])
+        if self.fake:
+            compare(sum(self.fake.calls.values()), result["reads"])
+            # both tasks work on one snapshot, the second one sees the planned changes of the first one
+            compare(1, self.fake.calls["GET boards/{id}"])
+        compare(["Replay (5 d)"], [card.name for card in self.replay_list.list_cards()])
+        compare([], self.todo_list.list_cards())
+        if self.fake:
+            compare([], [endpoint for endpoint in self.fake.calls if not endpoint.startswith("GET")])
+
+    def test_main(self):
+        buy_list = self.board.add_list("Wichtiges Einkaufen")
+        self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        label = self.board.add_label("Lebensmittel", "orange")
+        buy_list.add_card("Milch", labels=[label]).set_closed(True)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            compare(0, main(["--dry-run", "ShoppingTask"]))
+        result = json.loads(output.getvalue())
+        compare(["ShoppingTask"], list(result["tasks"]))
+        compare([("Milch", "Gerade nicht kaufen (Lebensmittel)")],
+                [(change["card"], change["list"]) for change in result["tasks"]["ShoppingTask"]["changes"]])
+        compare(["Milch"], [card.name for card in self.board.closed_cards()])
+        with self.assertRaises(SystemExit), redirect_stdout(io.StringIO()):
+            main(["--dry-run", "NoTask"])
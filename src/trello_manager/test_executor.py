@@ -0,0 +1,216 @@
+import asyncio
+import threading
+from unittest import TestCase
+
+import requests
+from testfixtures import compare
+
+from src.trello_manager.executor import RateLimitedHttpService, ThreadPoolWriteExecutor, TokenBucket, WriteExecutor, \
+    gather
+from src.trello_manager.resilience import CircuitBreaker, CircuitOpenError, Deadline
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StatusResponse:  # pylint: disable=too-few-public-methods
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class StatusService:  # pylint: disable=too-few-public-methods
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.timeouts: list[float] = []
+
+    def request(self, *_, **kwargs) -> StatusResponse:
+        self.calls += 1
+        self.timeouts.append(kwargs["timeout"])
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        assert isinstance(response, StatusResponse)
+        return response
+
+
+def no_jitter(delay: float) -> float:
+    return delay
+
+
+class TestTokenBucket(TestCase):
+    def test_burst_then_throttle(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, 10.0, clock=clock.time, sleep=clock.sleep)
+        for _ in range(10):
+            bucket.acquire()
+        compare([], clock.sleeps)
+        bucket.acquire()
+        compare([1.0], clock.sleeps)
+
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, 1.0, clock=clock.time, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+        clock.now += 1.0
+        bucket.acquire()
+        bucket.acquire()
+        compare([], clock.sleeps)
+
+
+class TestRateLimitedHttpService(TestCase):
+    def test_retry_on_429(self):
+        clock = FakeClock()
+        service = StatusService(StatusResponse(429), StatusResponse(429, {"Retry-After": "3"}), StatusResponse(200))
+        rate_limited = RateLimitedHttpService([], http_service=service, sleep=clock.sleep, jitter=no_jitter)
+        compare(200, rate_limited.request("GET", "url").status_code)
+        compare(3, service.calls)
+        compare([1.0, 3.0], clock.sleeps)
+
+    def test_jittered_backoff(self):
+        clock = FakeClock()
+        service = StatusService(*[StatusResponse(429)] * 4, StatusResponse(200))
+        RateLimitedHttpService([], http_service=service, sleep=clock.sleep).request("GET", "url")
+        for attempt, seconds in enumerate(clock.sleeps):
+            self.assertTrue(2.0 ** attempt / 2 <= seconds <= 2.0 ** attempt)
+
+    def test_429_drains_the_buckets(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, 10.0, clock=clock.time, sleep=clock.sleep)
+        service = StatusService(StatusResponse(429, {"Retry-After": "0"}), StatusResponse(200))
+        RateLimitedHttpService([bucket], http_service=service, sleep=clock.sleep).request("GET", "url")
+        # the retry waits for the refill of the drained bucket
+        compare([0.0, 1.0], clock.sleeps)
+
+    def test_server_errors_only_retried_for_idempotent_methods(self):
+        clock = FakeClock()
+        service = StatusService(StatusResponse(502), requests.ConnectionError(), StatusResponse(200))
+        rate_limited = RateLimitedHttpService([], http_service=service, sleep=clock.sleep, jitter=no_jitter)
+        compare(200, rate_limited.request("PUT", "url").status_code)
+        compare([1.0, 2.0], clock.sleeps)
+
+        service = StatusService(StatusResponse(502))
+        compare(502, RateLimitedHttpService([], http_service=service).request("POST", "url").status_code)
+        service = StatusService(requests.ConnectionError())
+        with self.assertRaises(requests.ConnectionError):
+            RateLimitedHttpService([], http_service=service).request("POST", "url")
+
+    def test_no_retry_beyond_the_deadline(self):
+        clock = FakeClock()
+        service = StatusService(StatusResponse(429), StatusResponse(429), StatusResponse(200))
+        rate_limited = RateLimitedHttpService([], http_service=service, sleep=clock.sleep, jitter=no_jitter,
+                                              deadline=Deadline(1.5, clock=clock.time))
+        compare(429, rate_limited.request("GET", "url").status_code)
+        compare([1.0], clock.sleeps)
+
+    def test_timeout(self):
+        clock = FakeClock()
+        service = StatusService(requests.Timeout(), StatusResponse(200))
+        rate_limited = RateLimitedHttpService([], http_service=service, sleep=clock.sleep, jitter=no_jitter)
+        compare(200, rate_limited.request("GET", "url").status_code)
+        compare(([30.0, 30.0], [1.0]), (service.timeouts, clock.sleeps))
+
+        service = StatusService(requests.Timeout())
+        with self.assertRaises(requests.Timeout):
+            RateLimitedHttpService([], http_service=service).request("POST", "url")
+
+    def test_timeout_ends_with_the_deadline(self):
+        clock = FakeClock()
+        service = StatusService(requests.Timeout(), StatusResponse(200))
+        rate_limited = RateLimitedHttpService([], http_service=service, sleep=clock.sleep, jitter=no_jitter,
+                                              deadline=Deadline(12.0, clock=clock.time))
+        compare(200, rate_limited.request("GET", "url").status_code)
+        # the second attempt starts after the backoff of one second
+        compare([12.0, 11.0], service.timeouts)
+        # past the deadline a request still gets the minimum
+        clock.now = 20.0
+        service = StatusService(StatusResponse(200))
+        RateLimitedHttpService([], http_service=service, deadline=rate_limited.deadline).request("GET", "url")
+        compare([1.0], service.timeouts)
+
+    def test_circuit_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=3, cooldown=30.0, clock=clock.time)
+        service = StatusService(*[StatusResponse(500)] * 3, StatusResponse(200))
+        rate_limited = RateLimitedHttpService([], http_service=service, sleep=clock.sleep, jitter=no_jitter,
+                                              breaker=breaker)
+        with self.assertRaises(CircuitOpenError):
+            rate_limited.request("GET", "url")
+        compare(3, service.calls)
+        with self.assertRaises(CircuitOpenError):
+            rate_limited.request("GET", "url")
+        compare(3, service.calls)
+        clock.now += 30.0
+        compare(200, rate_limited.request("GET", "url").status_code)
+        self.assertFalse(breaker.open)
+
+    def test_give_up_after_max_retries(self):
+        clock = FakeClock()
+        service = StatusService(StatusResponse(429), StatusResponse(429))
+        rate_limited = RateLimitedHttpService([], http_service=service, max_retries=1, sleep=clock.sleep)
+        compare(429, rate_limited.request("GET", "url").status_code)
+
+    def test_no_retry_on_other_errors(self):
+        service = StatusService(StatusResponse(404))
+        compare(404, RateLimitedHttpService([], http_service=service).request("GET", "url").status_code)
+        compare(1, service.calls)
+
+
+class TestWriteExecutor(TestCase):
+    def _check_executor(self, executor: WriteExecutor):
+        results: list[int] = []
+        for idx in range(20):
+            executor.submit(results.append, idx)
+        executor.join()
+        compare(list(range(20)), sorted(results))
+
+        def fail():
+            raise ValueError("failed")
+
+        executor.submit(fail)
+        executor.submit(results.append, 20)
+        with self.assertRaises(ValueError):
+            executor.join()
+        compare(21, len(results))
+        executor.join()
+        executor.shutdown()
+
+    def test_serial(self):
+        self._check_executor(WriteExecutor())
+
+    def test_thread_pool(self):
+        self._check_executor(ThreadPoolWriteExecutor(max_workers=4))
+
+
+class TestGather(TestCase):
+    def test_calls_overlap(self):
+        # each call waits for the other one, run one after another they would time out
+        barrier = threading.Barrier(2, timeout=5)
+        compare([0, 1], sorted(gather(barrier.wait, barrier.wait)))
+
+    def test_results_in_order_and_errors(self):
+        compare(["a", "b"], gather(lambda: "a", lambda: "b"))
+
+        def fail():
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            gather(lambda: "a", fail)
+
+    def test_inside_an_event_loop(self):
+        async def in_loop():
+            return gather(lambda: "a", lambda: "b")
+
+        compare(["a", "b"], asyncio.run(in_loop()))
@@ -0,0 +1,136 @@
+# pylint: disable=protected-access
+from unittest import TestCase, skipUnless
+
+from freezegun import freeze_time
+from testfixtures import compare
+from trello import ResourceUnavailable, TrelloClient
+
+from src.test_trello_manager import TrelloTest, OFFLINE, TEST_BOARD
+from src.trello_manager import PrivateTodos, ReplayDateTask, ShoppingTask
+from src.trello_manager.fake import FakeTrello
+
+
+class TestFakeTrello(TestCase):
+    def setUp(self):
+        self.fake = FakeTrello()
+        self.client = TrelloClient(api_key="key", api_secret="secret", http_service=self.fake)
+
+    def test_board_roundtrip(self):
+        board = self.client.add_board("Board")
+        trello_list = board.add_list("Liste")
+        label = board.add_label("Label", "red")
+        trello_list.add_card("B", labels=[label])
+        card = trello_list.add_card("A", position="top")
+        card.set_closed(True)
+        compare(["B"], [open_card.name for open_card in trello_list.list_cards()])
+        compare(["A"], [closed_card.name for closed_card in board.closed_cards()])
+        compare(["Label"], [card_label.name for card_label in trello_list.list_cards()[0].labels])
+
+    def test_counts_requests_per_endpoint(self):
+        board = self.client.add_board("Board")
+        self.fake.reset_calls()
+        board.add_list("Liste").add_card("A")
+        board.fetch()
+        compare({"POST lists": 1, "POST cards": 1, "GET boards/{id}": 1}, dict(self.fake.calls))
+        compare(3, self.fake.total_calls)
+        self.assertGreater(self.fake.bytes_transferred, 0)
+
+    def test_injected_errors(self):
+        self.fake.inject_errors(500)
+        with self.assertRaises(ResourceUnavailable):
+            self.client.list_boards()
+        compare([], self.client.list_boards())
+
+
+@skipUnless(OFFLINE, "request counts are only recorded by the fake")
+class TestRequestBudget(TrelloTest):
+    """
+    Requests per task run on a small board. A higher count is a regression, a lower one is an update.
+    """
+
+    ShoppingTask._board_name = TEST_BOARD
+    ReplayDateTask._board_name = TEST_BOARD
+    PrivateTodos._board_name = TEST_BOARD
+
+    def test_shopping_task(self):
+        buy_list = self.board.add_list("Wichtiges Einkaufen")
+        self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        label = self.board.add_label("Lebensmittel", "orange")
+        for name in ("C", "A", "B"):
+            buy_list.add_card(name, labels=[label])
+        buy_list.archive_all_cards()
+        self.fake.reset_calls()
+
+        ShoppingTask().run()
+
+        # the archive is scanned page by page, apart from the snapshot
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 1, "GET boards/{id}/cards/closed": 1,
+                 "PUT cards/{id}": 3}, dict(self.fake.calls))
+
+    def test_shopping_task_restores_into_sorted_list(self):
+        buy_list = self.board.add_list("Wichtiges Einkaufen")
+        food_list = self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        label = self.board.add_label("Lebensmittel", "orange")
+        for name in ("A", "C", "E", "G", "I"):
+            food_list.add_card(name, labels=[label])
+        for name in ("H", "B"):
+            buy_list.add_card(name, labels=[label])
+        buy_list.archive_all_cards()
+        self.fake.reset_calls()
+
+        ShoppingTask().run()
+
+        # one request per restored card, the cards already in the list keep their positions
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 1, "GET boards/{id}/cards/closed": 1,
+                 "PUT cards/{id}": 2}, dict(self.fake.calls))
+        compare(list("ABCEGHI"), [card.name for card in food_list.list_cards()])
+
+    def test_replay_task(self):
+        self.board.add_list("ToDo")
+        replay_list = self.board.add_list("Replay")
+        self.board.add_list("Backlog")
+        for days in (5, 1, 3):
+            replay_list.add_card(f"Replay ({days} d)", due=f"2100-01-0{days}")
+        self.fake.reset_calls()
+
+        ReplayDateTask().run()
+
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 1, "PUT cards/{id}": 1}, dict(self.fake.calls))
+
+    @freeze_time("2099-12-25")
+    def test_replay_task_restores_into_sorted_list(self):
+        todo_list = self.board.add_list("ToDo")
+        replay_list = self.board.add_list("Replay")
+        self.board.add_list("Backlog")
+        label = self.board.add_label("replay", "red")
+        for days in (3, 5, 9, 12):
+            replay_list.add_card(f"Replay ({days} d)", due=f"2100-01-{days:02d}")
+        todo_list.add_card("Restored (14 d)", labels=[label])
+        todo_list.archive_all_cards()
+        self.fake.reset_calls()
+
+        ReplayDateTask().run()
+
+        # only the archive of the todo list is paged
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 1, "GET lists/{id}/cards/closed": 1,
+                 "PUT cards/{id}": 1}, dict(self.fake.calls))
+        compare(["Replay (3 d)", "Replay (5 d)", "Restored (14 d)", "Replay (9 d)", "Replay (12 d)"],
+                [card.name for card in replay_list.list_cards()])
+
+    @freeze_time("2024-01-07")  # only the dailys are due the next day
+    def test_private_todos(self):
+        self.board.add_list("ToDo")
+        self.board.add_label("Orga", "green")
+        self.fake.reset_calls()
+
+        PrivateTodos().run()
+
+        compare({"GET members/me/boards": 1,
+                 "GET boards/{id}": 1,
+                 "GET boards/{id}/cards/closed": 1,
+                 "POST cards": 1,
+                 "POST cards/{id}/checklists": 1,
+                 "POST checklists/{id}/checkItems": 4},
+                dict(self.fake.calls))
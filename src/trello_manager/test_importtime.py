@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.trello_manager.importtime import ImportTime, main, measure, parse_importtime
+
+_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | site
+import time:        50 |         50 |     pytz.lazy
+import time:       400 |        450 |   pytz
+import time:       600 |       1050 | lambda_handler
+"""
+
+
+class TestImportTime(TestCase):
+    def test_parse_importtime(self):
+        compare([ImportTime("_io", 120, 120, 1),
+                 ImportTime("site", 300, 420, 0),
+                 ImportTime("pytz.lazy", 50, 50, 2),
+                 ImportTime("pytz", 400, 450, 1),
+                 ImportTime("lambda_handler", 600, 1050, 0)],
+                parse_importtime(_OUTPUT))
+
+    def test_package_import_is_lazy(self):
+        modules = [entry.module for entry in measure("trello_manager.instrumentation")]
+        self.assertIn("trello_manager.instrumentation", modules)
+        self.assertNotIn("trello", modules)
+        self.assertNotIn("requests", modules)
+
+    def test_budget(self):
+        compare(1, main(["--module", "trello_manager.reorder", "--repeat", "1", "--max-ms", "0"]))
@@ -0,0 +1,52 @@
+import io
+import json
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.trello_manager.executor import RateLimitedHttpService
+from src.trello_manager.instrumentation import Instrumentation, endpoint_of
+from src.trello_manager.test_executor import FakeClock, StatusResponse, StatusService
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.instrumentation = Instrumentation(stream=self.stream)
+
+    def _lines(self) -> list[dict]:
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_endpoint_of(self):
+        compare("cards/{id}/pos", endpoint_of("https://api.trello.com/1/cards/5f0c1a2b3c4d5e6f7a8b9c0d/pos"))
+        compare("members/me/boards", endpoint_of("https://api.trello.com/1/members/me/boards/"))
+
+    def test_span(self):
+        with self.instrumentation.span("ShoppingTask.sort_list", list="Drogerie"):
+            pass
+        with self.assertRaises(KeyError):
+            with self.instrumentation.span("ShoppingTask.sort_list", list="Lebensmittel"):
+                raise KeyError("list")
+        first, second = self._lines()
+        compare({"span": "ShoppingTask.sort_list", "list": "Drogerie"},
+                {key: value for key, value in first.items() if key != "duration_ms"})
+        compare("KeyError", second["error"])
+        compare(["ShoppingTask.sort_list"], list(self.instrumentation.span_seconds))
+
+    def test_requests_and_emf_summary(self):
+        instrumentation = Instrumentation(stream=self.stream, emf=True, log_requests=True)
+        clock = FakeClock()
+        service = RateLimitedHttpService([], StatusService(StatusResponse(429), StatusResponse(200)),
+                                         sleep=clock.sleep, instrumentation=instrumentation)
+        service.request("GET", "https://api.trello.com/1/boards/5f0c1a2b3c4d5e6f7a8b9c0d")
+        instrumentation.record_request("PUT", "https://api.trello.com/1/cards/5f0c1a2b3c4d5e6f7a8b9c0d", 404, 0.1, 0)
+        summary = instrumentation.summary(Function="trello-manager")
+        request_line = self._lines()[0]
+        compare(("GET boards/{id}", 200, 1),
+                (request_line["request"], request_line["status"], request_line["retries"]))
+        compare({"GET boards/{id}": 1, "PUT cards/{id}": 1}, summary["requests"])
+        compare((2, 1, 1), (summary["Requests"], summary["FailedRequests"], summary["Retries"]))
+        metrics = summary["_aws"]["CloudWatchMetrics"][0]
+        compare([["Function"]], metrics["Dimensions"])
+        compare({"Name": "Requests", "Unit": "Count"}, metrics["Metrics"][0])
+        compare(summary, self._lines()[-1])
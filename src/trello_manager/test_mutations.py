@@ -0,0 +1,67 @@
+from datetime import datetime
+from unittest import TestCase
+
+from testfixtures import compare
+from trello import Board, Card, Label, List
+
+from src.trello_manager.mutations import CardMutationBuffer
+from src.trello_manager.plan import ChangePlan, PlannedChange
+
+
+class RecordingClient:  # pylint: disable=too-few-public-methods
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, str, dict]] = []
+
+    def fetch_json(self, uri_path: str, http_method: str = "GET", post_args=None, **_):
+        self.requests.append((http_method, uri_path, post_args))
+        return {}
+
+
+class TestCardMutationBuffer(TestCase):
+    def setUp(self):
+        self.client = RecordingClient()
+        self.board = Board(client=self.client, board_id="board")
+        self.list_a = List(self.board, "list_a", "A")
+        self.list_b = List(self.board, "list_b", "B")
+        self.card_1 = Card(self.list_a, "card_1", "Card 1")
+        self.card_2 = Card(self.list_a, "card_2", "Card 2")
+        self.buffer = CardMutationBuffer(self.client)
+
+    def test_one_request_per_card(self):
+        due = datetime(2024, 1, 1, 12)
+        self.buffer.move(self.card_1, self.list_b)
+        self.buffer.set_closed(self.card_1, False)
+        self.buffer.set_due(self.card_1, due)
+        self.buffer.set_pos(self.card_1, 2.5)
+        self.buffer.set_pos(self.card_2, 1)
+        self.buffer.set_pos(self.card_2, 3)
+        compare(2, len(self.buffer))
+
+        compare(2, self.buffer.flush())
+
+        compare([("PUT", "/cards/card_1", {"idList": "list_b", "closed": False,
+                                           "due": "2024-01-01T12:00:00", "pos": 2.5}),
+                 ("PUT", "/cards/card_2", {"pos": 3})],
+                self.client.requests)
+        compare(0, len(self.buffer))
+        compare(0, self.buffer.flush())
+
+    def test_local_state_is_updated_immediately(self):
+        label = Label(self.client, "label", "Label")
+        self.buffer.move(self.card_1, self.list_b)
+        self.buffer.set_closed(self.card_1, True)
+        self.buffer.set_labels(self.card_1, [label])
+        compare("list_b", self.card_1.idList)
+        compare(True, self.card_1.closed)
+        compare([label], self.card_1.labels)
+        compare([], self.client.requests)
+
+    def test_dry_run(self):
+        plan = ChangePlan()
+        buffer = CardMutationBuffer(self.client, plan)
+        buffer.move(self.card_1, self.list_b)
+        buffer.set_pos(self.card_1, 2.5)
+        compare(0, buffer.flush())
+        compare([], self.client.requests)
+        compare([PlannedChange("update", "Card 1", "B", {"idList": "list_b", "pos": 2.5}, 1)], plan.changes)
+        compare(1, plan.requests)
@@ -0,0 +1,152 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import ShoppingTask, Tenant, TrelloExecption, TrelloManager, TrelloSession, load_tenants, \
+    run_tasks, run_tenants
+from src.trello_manager import session as session_module
+from src.trello_manager.instrumentation import Instrumentation
+
+
+class BrokenTask(TrelloManager):  # pylint: disable=too-few-public-methods
+    _board_name = "NOT_EXISTING"
+
+
+class RecordingTask(TrelloManager):
+    _board_name = TEST_BOARD
+    snapshots: list = []
+
+    def run(self):
+        self.refresh(self.session.snapshot_max_age)
+        self.snapshots.append(self.snapshot)
+
+
+class ConcurrencyTask(TrelloManager):
+    _board_name = TEST_BOARD
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def run(self):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.running -= 1
+
+
+class TestRunTasks(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        RecordingTask.snapshots = []
+        self.session = TrelloSession.from_env(TEST_KEY, TEST_SECRET, snapshot_max_age=60)
+
+    def test_failure_does_not_abort_other_tasks(self):
+        results = run_tasks([BrokenTask, RecordingTask, RecordingTask], session=self.session)
+        compare(["BrokenTask", "RecordingTask", "RecordingTask"], [result.name for result in results])
+        compare([False, True, True], [result.ok for result in results])
+        self.assertIsInstance(results[0].error, TrelloExecption)
+
+    def test_tasks_on_one_board_share_the_snapshot(self):
+        run_tasks([RecordingTask, RecordingTask], session=self.session)
+        compare(2, len(RecordingTask.snapshots))
+        self.assertIs(RecordingTask.snapshots[0], RecordingTask.snapshots[1])
+
+    def test_spans_and_summary(self):
+        stream = io.StringIO()
+        session = TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET],
+                                instrumentation=Instrumentation(stream=stream))
+        run_tasks([BrokenTask, RecordingTask], session=session)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        spans = {line["span"]: line for line in lines if "span" in line}
+        compare("TrelloExecption", spans["BrokenTask"]["error"])
+        compare(TEST_BOARD, spans["RecordingTask"]["board"])
+        summary = lines[-1]
+        compare(summary["Requests"], sum(summary["requests"].values()))
+        self.assertIn("RecordingTaskTime", summary)
+
+    def test_no_tasks(self):
+        compare([], run_tasks([]))
+
+
+class TestRunTenants(TrelloTest):
+    _OTHER_BOARD = f"{TEST_BOARD}_OTHER"
+
+    def setUp(self):
+        super().setUp()
+        RecordingTask.snapshots = []
+        session_module._SHARED_SESSIONS.clear()  # pylint: disable=protected-access
+        self.other_board = self.client.add_board(self._OTHER_BOARD)
+
+    def tearDown(self):
+        self.client.fetch_json(f"boards/{self.other_board.id}", http_method="DELETE")
+        super().tearDown()
+
+    def test_boards_of_several_tenants(self):
+        environ = {"OTHER_KEY": os.environ[TEST_KEY], "OTHER_SECRET": os.environ[TEST_SECRET]}
+        tenants = [Tenant("first", [(RecordingTask, TEST_BOARD), (BrokenTask, "NOT_EXISTING")], TEST_KEY, TEST_SECRET),
+                   Tenant("second", [(RecordingTask, self._OTHER_BOARD), (RecordingTask, self._OTHER_BOARD)],
+                          "OTHER_KEY", "OTHER_SECRET")]
+        with mock.patch.dict(os.environ, environ), contextlib.redirect_stdout(io.StringIO()):
+            report = run_tenants(tenants, max_workers=2)
+        compare([("first", "RecordingTask", TEST_BOARD, True), ("first", "BrokenTask", "NOT_EXISTING", False),
+                 ("second", "RecordingTask", self._OTHER_BOARD, True),
+                 ("second", "RecordingTask", self._OTHER_BOARD, True)],
+                [(result.tenant, result.name, result.board, result.ok) for result in report.results])
+        compare([TEST_BOARD, self._OTHER_BOARD, self._OTHER_BOARD],
+                [snapshot.board.name for snapshot in RecordingTask.snapshots])
+        # the tasks of one board share the snapshot
+        self.assertIs(RecordingTask.snapshots[1], RecordingTask.snapshots[2])
+        compare(3, report.boards)
+        compare(1, len(report.summaries))
+        compare(report.summaries[0]["Requests"], report.requests)
+        json_report = report.to_json()
+        compare((4, 1), (json_report["tasks"], json_report["failed"]))
+        self.assertGreater(json_report["requests_per_second"], 0)
+
+    def test_tenant_without_credentials(self):
+        tenants = [Tenant("missing", [(RecordingTask, TEST_BOARD)], "MISSING_KEY", "MISSING_SECRET"),
+                   Tenant("first", [(RecordingTask, TEST_BOARD)], TEST_KEY, TEST_SECRET)]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            report = run_tenants(tenants)
+        compare([("missing", False), ("first", True)], [(result.tenant, result.ok) for result in report.results])
+        self.assertIsInstance(report.results[0].error, KeyError)
+        events = [json.loads(line) for line in output.getvalue().splitlines() if line.startswith("{")]
+        compare([("error", "missing")], [(event["level"], event["tenant"]) for event in events
+                                         if event.get("event") == "credentials of the tenant not set"])
+
+    def test_tenants_with_the_same_credentials_on_one_board(self):
+        ConcurrencyTask.peak = 0
+        environ = {"OTHER_KEY": os.environ[TEST_KEY], "OTHER_SECRET": os.environ[TEST_SECRET]}
+        tenants = [Tenant("first", [(ConcurrencyTask, TEST_BOARD)], TEST_KEY, TEST_SECRET),
+                   Tenant("second", [(ConcurrencyTask, TEST_BOARD)], "OTHER_KEY", "OTHER_SECRET")]
+        with mock.patch.dict(os.environ, environ), contextlib.redirect_stdout(io.StringIO()):
+            report = run_tenants(tenants)
+        compare([("first", True), ("second", True)], [(result.tenant, result.ok) for result in report.results])
+        compare((1, 1), (ConcurrencyTask.peak, report.boards))
+
+    def test_load_tenants(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tenants.json")
+            with open(path, "w", encoding="utf-8") as config:
+                json.dump({"tenants": [{"name": "first", "key": TEST_KEY, "secret": TEST_SECRET,
+                                        "jobs": [{"task": "ShoppingTask", "board": "Einkaufen Familie"}]}]}, config)
+            compare([Tenant("first", [(ShoppingTask, "Einkaufen Familie")], TEST_KEY, TEST_SECRET)],
+                    load_tenants(path))
+        with self.assertRaises(ValueError):
+            Tenant.from_json({"name": "first", "jobs": [{"task": "NoTask", "board": "Board"}]})
+
+    def test_no_tenants(self):
+        report = run_tenants([])
+        compare((0, 0, 0), (len(report.results), report.boards, report.requests))
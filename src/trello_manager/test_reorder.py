@@ -0,0 +1,114 @@
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.trello_manager.reorder import OrderedList, plan_reorder, reorder_cards, POS_STEP
+
+
+class PosCard:  # pylint: disable=too-few-public-methods
+    def __init__(self, name: str, pos: float):
+        self.name = name
+        self.pos = pos
+        self.writes = 0
+
+    def set_pos(self, pos: float):
+        self.pos = pos
+        self.writes += 1
+
+
+class TestPlanReorder(TestCase):
+    def test_already_sorted(self):
+        compare({}, plan_reorder([1, 2, 3, 4]))
+        compare({}, plan_reorder([]))
+
+    def test_single_card_out_of_order(self):
+        # target order is a, b, c, d; c currently sits at the end
+        compare({2: 2.5}, plan_reorder([1, 2, 4, 3]))
+
+    def test_move_to_the_front_and_the_end(self):
+        compare({0: 1.0}, plan_reorder([5, 2, 3]))
+        compare({2: 3 + POS_STEP}, plan_reorder([2, 3, 1]))
+
+    def test_run_of_moved_cards(self):
+        compare({1: 2.0, 2: 3.0}, plan_reorder([1, 10, 9, 4]))
+
+    def test_equal_positions(self):
+        moves = plan_reorder([1, 1, 1])
+        compare(2, len(moves))
+
+    def test_renumber_without_gap(self):
+        compare({0: POS_STEP, 1: 2 * POS_STEP}, plan_reorder([0, 0]))
+
+
+class TestReorderCards(TestCase):
+    def test_only_misplaced_cards_are_written(self):
+        cards = [PosCard(str(idx), idx + 1) for idx in range(150)]
+        cards[10].pos, cards[100].pos = cards[100].pos, cards[10].pos
+        compare(2, reorder_cards(cards))
+        positions = [card.pos for card in cards]
+        compare(sorted(positions), positions)
+        compare(2, sum(card.writes for card in cards))
+
+
+def name_key(card: PosCard) -> str:
+    return card.name
+
+
+class TestOrderedList(TestCase):
+    def setUp(self):
+        self.cards = [PosCard(name, POS_STEP * (idx + 1)) for idx, name in enumerate("bdf")]
+        self.ordered = OrderedList(self.cards, name_key)
+
+    def test_insert_between_neighbours(self):
+        card = PosCard("c", 1)
+        self.assertTrue(self.ordered.insert(card))
+        compare(1.5 * POS_STEP, card.pos)
+        compare(list("bcdf"), [list_card.name for list_card in self.ordered.cards])
+        compare(1, card.writes)
+        compare(0, sum(list_card.writes for list_card in self.cards))
+        compare(0, self.ordered.reorder())
+
+    def test_insert_at_the_front_and_the_end(self):
+        front, end = PosCard("a", 0), PosCard("g", 0)
+        self.ordered.insert(front)
+        self.ordered.insert(end)
+        compare(POS_STEP / 2, front.pos)
+        compare(4 * POS_STEP, end.pos)
+        compare(OrderedList([], name_key).insert(end), True)
+        compare(POS_STEP, end.pos)
+
+    def test_equal_keys_after_the_others(self):
+        card = PosCard("d", 0)
+        self.ordered.insert(card)
+        compare(2.5 * POS_STEP, card.pos)
+
+    def test_list_out_of_order_is_reordered(self):
+        self.cards[0].pos = 5 * POS_STEP
+        ordered = OrderedList(self.cards, name_key)
+        card = PosCard("c", 1)
+        self.assertFalse(ordered.insert(card))
+        compare(0, card.writes)
+        # only b is out of place, c already sits in front of d
+        compare(1, ordered.reorder())
+        positions = [list_card.pos for list_card in ordered.cards]
+        compare(sorted(positions), positions)
+        compare(list("bcdf"), [list_card.name for list_card in ordered.cards])
+
+    def test_no_room_between_neighbours(self):
+        ordered = OrderedList([PosCard("a", 1), PosCard("c", 1 + 1e-7)], name_key)
+        card = PosCard("b", 0)
+        self.assertFalse(ordered.insert(card))
+        compare(3, ordered.reorder())
+        compare([POS_STEP, 2 * POS_STEP, 3 * POS_STEP], [list_card.pos for list_card in ordered.cards])
+
+    def test_many_inserts_write_only_the_inserted_cards(self):
+        cards = [PosCard(f"{idx:04d}", POS_STEP * (idx + 1)) for idx in range(0, 2000, 2)]
+        ordered = OrderedList(cards, name_key)
+        inserted = [PosCard(f"{idx:04d}", 0) for idx in range(1, 200, 2)]
+        for card in inserted:
+            ordered.insert(card)
+        compare(0, ordered.reorder())
+        compare(100, sum(card.writes for card in inserted))
+        compare(0, sum(card.writes for card in cards))
+        positions = [list_card.pos for list_card in ordered.cards]
+        compare(sorted(positions), positions)
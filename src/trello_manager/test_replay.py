@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+from unittest import TestCase
+
+from testfixtures import compare
+from trello import Board, List
+
+from src.trello_manager.records import CardRecord
+from src.trello_manager.replay import due_timestamp, plan_dues, replay_days
+
+
+class TestReplay(TestCase):
+    def test_replay_days(self):
+        compare(20, replay_days("Test (20 d)"))
+        compare(3, replay_days("Test (5 d) again (3 d)"))
+        compare(None, replay_days("Test (wrong timedelta)"))
+        compare(None, replay_days("Test (1000 d)"))
+
+    def test_due_timestamp(self):
+        expected = datetime(2024, 1, 8, 10, tzinfo=timezone.utc).timestamp()
+        compare(expected, due_timestamp("2024-01-08T10:00:00.000Z"))
+        compare(expected, due_timestamp("2024-01-08T10:00:00+00:00"))
+        compare(expected, due_timestamp("2024-01-08T10:00:00"))
+        compare(None, due_timestamp(None))
+        compare(None, due_timestamp(""))
+
+    def test_plan_dues(self):
+        trello_list = List(Board(client=None, board_id="board"), "list", "Replay")
+        cards = [CardRecord(trello_list, {"id": name, "name": name, "idList": "list", "idLabels": [], "due": due,
+                                          "pos": float(pos), "closed": False}, {})
+                 for pos, (name, due) in enumerate([("no_due_1", None),
+                                                    ("late", "2024-01-20T00:00:00.000Z"),
+                                                    ("soon", "2024-01-09T00:00:00.000Z"),
+                                                    ("later_1", "2024-01-12T00:00:00.000Z"),
+                                                    ("no_due_2", None),
+                                                    ("later_2", "2024-01-12T00:00:00.000Z")])]
+        plan = plan_dues(cards, datetime(2024, 1, 10, tzinfo=timezone.utc).timestamp())
+        compare(["soon"], [card.name for card in plan.to_todo])
+        compare(["later_1", "later_2", "late", "no_due_1", "no_due_2"], [card.name for card in plan.order])
+        compare(datetime(2024, 1, 12, tzinfo=timezone.utc).timestamp(), plan.next_due)
+        compare(None, plan_dues([], 0.0).next_due)
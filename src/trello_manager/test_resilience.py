@@ -0,0 +1,87 @@
+# pylint: disable=protected-access
+import os
+import tempfile
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import ShoppingTask, TrelloSession
+from src.trello_manager.activity import BoardActivityCache
+from src.trello_manager.orchestrator import run_task, run_tasks
+from src.trello_manager.resilience import CircuitBreaker, CircuitOpenError, Deadline
+
+
+class LambdaContext:  # pylint: disable=too-few-public-methods
+    @staticmethod
+    def get_remaining_time_in_millis() -> int:
+        return 240000
+
+
+class TestDeadline(TestCase):
+    def test_from_context(self):
+        deadline = Deadline.from_context(LambdaContext(), margin=5.0)
+        assert deadline is not None
+        self.assertTrue(234.0 < deadline.remaining() <= 235.0)
+        compare(None, Deadline.from_context(None))
+
+
+class TestCircuitBreaker(TestCase):
+    def test_half_open(self):
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=2, cooldown=10.0, clock=lambda: now[0])
+        breaker.record(True)
+        breaker.record(False)
+        breaker.record(True)
+        breaker.check()
+        breaker.record(True)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+        now[0] = 10.0
+        breaker.check()
+        # the first failure after the cooldown opens the circuit again
+        breaker.record(True)
+        self.assertTrue(breaker.open)
+
+
+class TestDeferredPhases(TrelloTest):
+    ShoppingTask._board_name = TEST_BOARD
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.buy_list = self.board.add_list("Wichtiges Einkaufen")
+        self.food_list = self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        self.label = self.board.add_label("Lebensmittel", "orange")
+        self.session = TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET],
+                                     activity_cache=BoardActivityCache(os.path.join(self.directory.name, "cache.json")))
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def test_sorting_deferred_close_to_the_deadline(self):
+        for name in ("B", "A"):
+            self.food_list.add_card(name, labels=[self.label])
+        self.buy_list.add_card("C", labels=[self.label])
+        self.buy_list.archive_all_cards()
+        self.session.deadline = Deadline(10.0)
+
+        task = ShoppingTask(self.session)
+        task.run()
+
+        compare(["sort_list"], task.deferred)
+        # the archived card is restored, the list stays out of order
+        names = [card.name for card in self.food_list.list_cards()]
+        compare(["A", "B", "C"], sorted(names))
+        self.assertLess(names.index("B"), names.index("A"))
+        compare(None, self.session.activity_cache.get(self.board.id, "ShoppingTask"))
+
+        compare([False], [result.deferred for result in run_tasks([ShoppingTask], self.session)])
+        compare(["A", "B", "C"], [card.name for card in self.food_list.list_cards()])
+
+    def test_task_not_started_past_the_deadline(self):
+        self.session.deadline = Deadline(-1.0)
+        result = run_task(ShoppingTask, self.session)
+        compare((True, True, 0.0), (result.ok, result.deferred, result.duration))
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from unittest import TestCase
+
+from testfixtures import compare
+
+from src.trello_manager.schedule import Reminder, Schedule, load_schedule
+from src.trello_manager.tasks import PrivateTodos
+
+
+def _titles(reminders: list[Reminder]) -> list[str]:
+    return [reminder.title for reminder in reminders]
+
+
+class TestReminder(TestCase):
+    def test_fields(self):
+        weekly = Reminder("weekly", days_of_week=frozenset({0}))
+        monthly = Reminder("monthly", days_of_month=frozenset({1}))
+        yearly = Reminder("yearly", days_of_month=frozenset({1}), months_of_year=frozenset({11}))
+        only_months = Reminder("never", months_of_year=frozenset({11}))
+        schedule = Schedule([weekly, monthly, yearly, only_months])
+        compare(["weekly"], _titles(schedule.reminders_on(date(2024, 1, 8))))
+        compare(["monthly"], _titles(schedule.reminders_on(date(2024, 10, 1))))
+        compare(["monthly", "yearly"], _titles(schedule.reminders_on(date(2024, 11, 1))))
+        compare([], _titles(schedule.reminders_on(date(2024, 11, 2))))
+
+    def test_cron(self):
+        schedule = Schedule([Reminder("sunday", cron="* * 0"),
+                             Reminder("sunday_7", cron="* * 7"),
+                             Reminder("weekdays", cron="* * 1-5"),
+                             Reminder("first_or_monday", cron="1 * 1"),
+                             Reminder("every_other_day_in_march", cron="*/2 3 *"),
+                             Reminder("daily_in_summer", cron="* 6-8 *")])
+        compare(["sunday", "sunday_7"], _titles(schedule.reminders_on(date(2024, 1, 7))))
+        compare(["weekdays", "first_or_monday"], _titles(schedule.reminders_on(date(2024, 1, 8))))
+        compare(["weekdays", "first_or_monday"], _titles(schedule.reminders_on(date(2024, 2, 1))))
+        compare(["weekdays", "first_or_monday", "every_other_day_in_march"],
+                _titles(schedule.reminders_on(date(2024, 3, 1))))
+        compare(["weekdays", "first_or_monday"], _titles(schedule.reminders_on(date(2024, 3, 4))))
+        compare(["sunday", "sunday_7", "daily_in_summer"], _titles(schedule.reminders_on(date(2024, 7, 7))))
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            Schedule([Reminder("too_few_fields", cron="1 *")])
+        with self.assertRaises(ValueError):
+            Schedule([Reminder("out_of_range", cron="32 * *")])
+        with self.assertRaises(ValueError):
+            Schedule([Reminder("out_of_range", days_of_week=frozenset({7}))])
+
+    def test_title_for(self):
+        compare("DAILYS Mon", Reminder("DAILYS {date:%a}").title_for(date(2024, 1, 8)))
+
+
+class TestSchedule(TestCase):
+    def setUp(self):
+        self.schedule = Schedule.from_json({"reminders": [
+            {"title": "A", "cron": "* * 1", "board": "Board_A"},
+            {"title": "B", "cron": "* * 1", "board": "Board_B"},
+            {"title": "All", "days_of_month": [1, 15], "checklist": ["1", "2"]},
+        ]})
+
+    def test_from_json(self):
+        compare(3, len(self.schedule))
+        compare(("1", "2"), self.schedule.reminders[2].checklist)
+
+    def test_for_board(self):
+        compare(["A", "All"], _titles(self.schedule.for_board("Board_A").reminders_on(date(2024, 4, 15))))
+        compare(["B"], _titles(self.schedule.for_board("Board_B").reminders_on(date(2024, 4, 8))))
+        self.assertIs(self.schedule.for_board("Board_A"), self.schedule.for_board("Board_A"))
+
+    def test_upcoming(self):
+        upcoming = self.schedule.for_board("Board_A").upcoming(date(2024, 4, 13), 4)
+        compare([(date(2024, 4, 15), ["A", "All"])], [(day, _titles(reminders)) for day, reminders in upcoming])
+
+    def test_private_todos(self):
+        schedule = load_schedule(PrivateTodos._schedule_path)  # pylint: disable=protected-access
+        self.assertIs(schedule, load_schedule(PrivateTodos._schedule_path))  # pylint: disable=protected-access
+        compare(["Putzen", "DAILYS {date:%a}"], _titles(schedule.reminders_on(date(2024, 1, 9))))
+        compare(["DAILYS {date:%a}", "Putzen monatlich", "Über Freibeträge Gedanken"],
+                _titles(schedule.reminders_on(date(2024, 11, 1))))
+        days = [date(2024, 1, 1) + timedelta(days=offset) for offset in range(366)]
+        compare(len(days), len(schedule.upcoming(days[0], len(days))))
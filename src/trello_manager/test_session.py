@@ -0,0 +1,38 @@
+# pylint: disable=protected-access
+import os
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import TrelloSession
+from src.trello_manager import session as session_module
+
+
+class TestSharedSession(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        # the test board is recreated for every test, the index of an earlier shared session is outdated
+        session_module._SHARED_SESSIONS.clear()
+
+    def test_warm_session_keeps_the_board_index(self):
+        session = TrelloSession.shared(TEST_KEY, TEST_SECRET)
+        board = session.get_board(TEST_BOARD)
+        compare(self.board.id, board.id)
+        snapshot = session.get_snapshot(board)
+        snapshot.refresh()
+
+        warm_session = TrelloSession.shared(TEST_KEY, TEST_SECRET)
+        self.assertIs(session, warm_session)
+        self.assertIs(board, warm_session.get_board(TEST_BOARD))
+        self.assertFalse(snapshot.loaded)
+        if self.fake:
+            compare(1, self.fake.calls["GET members/me/boards"])
+
+    def test_board_index_reloaded_on_miss_and_after_ttl(self):
+        session = TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET], board_index_ttl=3600)
+        compare(None, session.get_board("NOT_EXISTING"))
+        session.get_board(TEST_BOARD)
+        session._boards_fetched_at -= 3601
+        session.get_board(TEST_BOARD)
+        if self.fake:
+            compare(2, self.fake.calls["GET members/me/boards"])
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from unittest import skipUnless
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, OFFLINE
+from src.trello_manager.records import CardRecord
+from src.trello_manager.snapshot import BoardSnapshot
+
+
+class TestBoardSnapshot(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        self.list_a = self.board.add_list("A")
+        self.list_b = self.board.add_list("B")
+        self.label = self.board.add_label("Label", "red")
+        card = self.list_a.add_card("Card_2", labels=[self.label])
+        card.add_checklist("Checklist", ["1", "2"])
+        self.list_a.add_card("Card_1", position="top")
+        self.list_b.add_card("Archived").set_closed(True)
+        self.snapshot = BoardSnapshot(self.board)
+
+    def test_lookups(self):
+        compare(self.list_b.id, self.snapshot.get_list_by_name("B").id)
+        compare(None, self.snapshot.get_list_by_name("C"))
+        compare(self.label, self.snapshot.get_label_by_name("Label"))
+        compare(["Card_1", "Card_2"], [card.name for card in self.snapshot.list_cards(self.list_a)])
+        compare([], self.snapshot.list_cards(self.list_b))
+        compare(["Archived"], [card.name for card in self.snapshot.list_cards(self.list_b, closed=True)])
+        compare(["Archived"], [card.name for card in self.snapshot.closed_cards()])
+        compare(2, len(self.snapshot.open_cards()))
+
+    def test_archived_list_of_the_same_name(self):
+        archived = self.board.add_list("A", pos="top")
+        archived.close()
+        snapshot = BoardSnapshot(self.board)
+        compare([self.list_a.id, self.list_b.id], [trello_list.id for trello_list in snapshot.lists])
+        compare(self.list_a.id, snapshot.get_list_by_name("A").id)
+
+    def test_checklists_and_labels_from_snapshot(self):
+        card = self.snapshot.list_cards(self.list_a)[1]
+        compare([self.label], card.labels)
+        compare(["1", "2"], [item["name"] for item in card.checklists[0].items])
+
+    def test_move_card(self):
+        card = self.snapshot.list_cards(self.list_a)[0]
+        card.change_list(self.list_b.id)
+        self.snapshot.move_card(card, self.list_b)
+        compare(["Card_1"], [card.name for card in self.snapshot.list_cards(self.list_b)])
+        self.snapshot.refresh()
+        compare(["Card_1"], [card.name for card in self.snapshot.list_cards(self.list_b)])
+
+
+class TestCompactSnapshot(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        self.list_a = self.board.add_list("A")
+        self.label = self.board.add_label("Label", "red")
+        self.card = self.list_a.add_card("Card", labels=[self.label], due="2024-01-07T10:00:00.000Z")
+        self.card.add_checklist("Checklist", ["1", "2"])
+        self.list_a.add_card("Archived").set_closed(True)
+
+    def test_card_records(self):
+        snapshot = BoardSnapshot(self.board, compact=True)
+        record, = snapshot.list_cards(self.list_a)
+        self.assertIsInstance(record, CardRecord)
+        compare((self.card.id, "Card", self.list_a.id), (record.id, record.name, record.trello_list.id))
+        compare([self.label], record.labels)
+        compare(datetime(2024, 1, 7, 10, tzinfo=timezone.utc), record.due_date)
+        compare(["Archived"], [card.name for card in snapshot.closed_cards()])
+        compare("", snapshot.list_cards(self.list_a, closed=True)[0].due_date)
+
+    @skipUnless(OFFLINE, "counts the bytes of the fake")
+    def test_smaller_response(self):
+        self.fake.reset_calls()
+        BoardSnapshot(self.board).refresh()
+        full = self.fake.bytes_transferred
+        self.fake.reset_calls()
+        BoardSnapshot(self.board, compact=True).refresh()
+        self.assertLess(self.fake.bytes_transferred, full / 2)
@@ -0,0 +1,187 @@
+# pylint: disable=protected-access
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import TestCase, mock, skipUnless
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, OFFLINE, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import ReplayDateTask, TrelloSession
+from src.trello_manager import session as session_module
+from src.trello_manager.activity import BoardActivity, CachedRun
+from src.trello_manager.state import S3Sync, StateStore
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+
+    def download_file(self, bucket: str, key: str, path: str):
+        with open(path, "wb") as target:
+            target.write(self.objects[(bucket, key)])
+
+    def upload_file(self, path: str, bucket: str, key: str):
+        with open(path, "rb") as source:
+            self.objects[(bucket, key)] = source.read()
+
+
+class TestStateStore(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "state.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _store(self, **kwargs) -> StateStore:
+        store = StateStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_values_are_compressed(self):
+        store = self._store()
+        value = {"cards": [{"name": "Milch", "idList": "list"}] * 100}
+        store.save("snapshots", "board", value)
+        compare(value, self._store().load("snapshots", "board"))
+        self.assertLess(store.size, 200)
+        store.delete("snapshots", "board")
+        compare(None, store.load("snapshots", "board"))
+
+    def test_activity_cache(self):
+        store = self._store()
+        store.set("board", "Task", BoardActivity("2024-01-01T00:00:00.000Z", "action"), 12.5)
+        store.set_checkpoint("board", "closed_cards", "action")
+        compare(CachedRun(BoardActivity("2024-01-01T00:00:00.000Z", "action"), 12.5),
+                self._store().get("board", "Task"))
+        compare("action", self._store().get_checkpoint("board", "closed_cards"))
+
+    def test_stores_on_the_same_file(self):
+        store_a, store_b = self._store(), self._store()
+        store_a.set_checkpoint("board_a", "closed_cards", "111")
+        store_b.set_checkpoint("board_b", "closed_cards", "222")
+        store_a.set("board_a", "Task", BoardActivity("2024-01-01T00:00:00.000Z", "111"))
+        store_b.set("board_b", "Task", BoardActivity("2024-01-01T00:00:00.000Z", "222"))
+        store = self._store()
+        compare(["111", "222"], [store.get_checkpoint(board_id, "closed_cards") for board_id in ("board_a", "board_b")])
+        compare(["111", "222"], [store.get(board_id, "Task").activity.last_action_id
+                                 for board_id in ("board_a", "board_b")])
+        store.invalidate("board_a")
+        compare(None, store_b.get("board_a", "Task"))
+        compare("111", store_b.get_checkpoint("board_a", "closed_cards"))
+
+    def test_activity_cache_of_an_older_version(self):
+        store = self._store()
+        store.save("activity", "cache", {"runs": {"board": {"Task": {"activity": [None, "action"],
+                                                                     "valid_until": None}}},
+                                         "checkpoints": {"board": {"closed_cards": "action"}}})
+        store = self._store()
+        compare(CachedRun(BoardActivity(None, "action")), store.get("board", "Task"))
+        compare("action", store.get_checkpoint("board", "closed_cards"))
+        compare(None, store.load("activity", "cache"))
+
+    def test_snapshot_only_for_the_same_activity(self):
+        store = self._store()
+        activity = BoardActivity("2024-01-01T00:00:00.000Z", "action")
+        store.save_snapshot("board", activity, False, True, {"cards": []})
+        compare({"cards": []}, store.load_snapshot("board", activity, False, True))
+        compare(None, store.load_snapshot("board", BoardActivity("2024-01-02T00:00:00.000Z", "other"), False, True))
+        # without the archived cards or with other card fields
+        compare(None, store.load_snapshot("board", activity, True, True))
+        compare(None, store.load_snapshot("board", activity, False, False))
+
+    def test_eviction(self):
+        store = self._store(max_bytes=2000)
+        store.set_checkpoint("board", "closed_cards", "action")
+        for idx in range(10):
+            store.save("snapshots", f"board_{idx}", os.urandom(300).hex())
+        self.assertLessEqual(store.size, 2000 + 200)
+        compare(None, store.load("snapshots", "board_0"))
+        self.assertIsNotNone(store.load("snapshots", "board_9"))
+        compare("action", store.get_checkpoint("board", "closed_cards"))
+
+    def test_run_history(self):
+        store = self._store()
+        store.record_run({"Requests": 3, "_aws": {}}, [{"task": "ShoppingTask"}])
+        time.sleep(0.001)
+        store.record_run({"Requests": 5}, [])
+        compare([{"Requests": 5}, {"Requests": 3}], [run["summary"] for run in store.run_history()])
+        compare([{"task": "ShoppingTask"}], store.run_history()[1]["tasks"])
+
+    def test_corrupt_file(self):
+        with open(self.path, "wb") as state_file:
+            state_file.write(b"no database" * 100)
+        store = self._store()
+        compare(None, store.get("board", "Task"))
+        store.set_checkpoint("board", "closed_cards", "action")
+
+    def test_s3_sync(self):
+        s3 = FakeS3()
+        sync = S3Sync("s3://bucket/state/state.db", client=s3)
+        store = self._store(sync=sync)
+        store.set_checkpoint("board", "closed_cards", "action")
+        store.push()
+        compare([("bucket", "state/state.db")], list(s3.objects))
+        # a cold instance without the local file
+        os.remove(self.path)
+        compare("action", self._store(sync=sync).get_checkpoint("board", "closed_cards"))
+
+    def test_s3_sync_without_state(self):
+        compare(False, S3Sync("s3://bucket/state.db", client=FakeS3()).download(self.path))
+        with self.assertRaises(ValueError):
+            S3Sync("/tmp/state.db")
+
+
+class TestSharedStateStore(TrelloTest):
+    def test_sessions_share_the_store_of_a_file(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        with mock.patch.dict(os.environ, {"TRELLO_MANAGER_STATE": os.path.join(directory.name, "state.db"),
+                                          "TRELLO_MANAGER_CACHE": os.path.join(directory.name, "cache.json")}):
+            session = TrelloSession.from_env(TEST_KEY, TEST_SECRET)
+            other_session = TrelloSession.from_env(TEST_KEY, TEST_SECRET)
+        self.addCleanup(session_module._SHARED_CACHES.clear)
+        self.addCleanup(session_module._SHARED_STATES.clear)
+        assert session.state is not None
+        self.addCleanup(session.state.close)
+        self.assertIs(session.state, other_session.state)
+        self.assertIs(session.activity_cache, other_session.activity_cache)
+
+
+@skipUnless(OFFLINE, "request counts are only recorded by the fake")
+class TestWarmSnapshot(TrelloTest):
+    ReplayDateTask._board_name = TEST_BOARD
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "state.db")
+        self.board.add_list("ToDo")
+        self.list_replay = self.board.add_list("Replay")
+        self.board.add_list("Backlog")
+
+    def _run(self) -> dict[str, int]:
+        store = StateStore(self.path)
+        self.addCleanup(store.close)
+        cached_run = store.get(self.board.id, "ReplayDateTask")
+        if cached_run:
+            # the due date of the next card is reached, without any activity on the board
+            store.set(self.board.id, "ReplayDateTask", cached_run.activity, time.time())
+        assert self.fake is not None
+        self.fake.reset_calls()
+        ReplayDateTask(TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET], state=store)).run()
+        return dict(self.fake.calls)
+
+    def test_board_unchanged_since_the_last_run(self):
+        due = datetime.now() + timedelta(days=10)
+        self.list_replay.add_card("Test_Replay (10 d)", due=due.strftime("%Y-%m-%d"))
+        # the board, its activity before and after the run
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 3}, self._run())
+        # only the activity before and after the run, the board is taken from the state store
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 2}, self._run())
+
+        self.list_replay.add_card("Test_Replay_2 (20 d)", due=(due + timedelta(days=10)).strftime("%Y-%m-%d"))
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 3}, self._run())
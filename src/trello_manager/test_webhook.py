@@ -0,0 +1,137 @@
+import json
+import os
+from datetime import datetime, timedelta
+from unittest import TestCase, mock, skipUnless
+
+from testfixtures import compare
+
+from src.test_trello_manager import TrelloTest, OFFLINE, TEST_BOARD, TEST_KEY, TEST_SECRET
+from src.trello_manager import Deadline, ReplayDateTask, ShoppingTask, TrelloSession
+from src.trello_manager.simulator import CALLBACK_URL, WebhookSimulator
+from src.trello_manager.webhook import ArchivedCard, archived_card, handle_webhook, is_webhook_event, signature, \
+    CALLBACK_URL as CALLBACK_URL_ENV, WEBHOOK_SECRET
+
+APPLICATION_SECRET = "application_secret"
+
+
+def _payload(action_type: str, closed: bool, old: dict) -> dict:
+    return {"action": {"type": action_type,
+                       "data": {"card": {"id": "card", "name": "Milch", "closed": closed},
+                                "board": {"id": "board", "name": "Einkaufen"},
+                                "old": old}},
+            "model": {"id": "board", "name": "Einkaufen"}}
+
+
+class TestWebhookPayload(TestCase):
+    def test_signature(self):
+        compare("XJ9YZCBpaKaOQoGJ8OylQM8yg/Y=", signature('{"a": 1}', "https://callback", "secret"))
+
+    def test_archived_card(self):
+        compare(ArchivedCard("Einkaufen", "card"), archived_card(_payload("updateCard", True, {"closed": False})))
+        compare(None, archived_card(_payload("updateCard", False, {"closed": True})))
+        compare(None, archived_card(_payload("updateCard", True, {"name": "Brot"})))
+        compare(None, archived_card(_payload("createCard", True, {})))
+        compare(None, archived_card({}))
+
+    def test_is_webhook_event(self):
+        self.assertTrue(is_webhook_event({"requestContext": {"http": {"method": "POST"}}, "body": ""}))
+        self.assertFalse(is_webhook_event({"source": "aws.events", "detail-type": "Scheduled Event"}))
+
+
+@skipUnless(OFFLINE, "the simulator delivers the actions of the fake")
+class TestWebhook(TrelloTest):
+    def setUp(self):
+        super().setUp()
+        self.session = TrelloSession(os.environ[TEST_KEY], os.environ[TEST_SECRET])
+        self.tasks: dict = {}
+        environ = mock.patch.dict(os.environ, {CALLBACK_URL_ENV: CALLBACK_URL, WEBHOOK_SECRET: APPLICATION_SECRET})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def _handler(self, event, _):
+        return handle_webhook(event, self.session, self.tasks, TEST_KEY, TEST_SECRET)
+
+    def _simulator(self) -> WebhookSimulator:
+        assert self.fake is not None
+        return WebhookSimulator(self.fake, self._handler, APPLICATION_SECRET)
+
+    def test_archived_shopping_card(self):
+        self.tasks = {TEST_BOARD: ShoppingTask}
+        buy_list = self.board.add_list("Wichtiges Einkaufen")
+        list_lebensmittel = self.board.add_list("Gerade nicht kaufen (Lebensmittel)")
+        self.board.add_list("Gerade nicht kaufen (Drogerie)")
+        label = self.board.add_label("Lebensmittel", "orange")
+        list_lebensmittel.add_card("Zucker", labels=[label])
+        card = buy_list.add_card("Milch", labels=[label])
+        buy_list.add_card("Brot").set_closed(True)
+        simulator = self._simulator()
+        card.set_closed(True)
+        self.fake.reset_calls()
+
+        responses = simulator.deliver()
+
+        compare([200], [response["statusCode"] for response in responses])
+        compare({"handled": True, "task": "ShoppingTask", "ok": True}, json.loads(responses[0]["body"]))
+        # only the card of the action is fetched, the archive is not scanned
+        compare({"GET members/me/boards": 1, "GET boards/{id}": 1, "GET batch": 1, "PUT cards/{id}": 1},
+                dict(self.fake.calls))
+        compare(["Milch", "Zucker"], [list_card.name for list_card in list_lebensmittel.list_cards()])
+        # the restore by the handler is an action as well, but no archived card
+        compare([{"handled": False}], [json.loads(response["body"]) for response in simulator.deliver()])
+
+    def test_archived_replay_card(self):
+        self.tasks = {TEST_BOARD: ReplayDateTask}
+        todo_list = self.board.add_list("ToDo")
+        replay_list = self.board.add_list("Replay")
+        self.board.add_list("Backlog")
+        label = self.board.add_label("replay", "red")
+        card = todo_list.add_card("Sport (10 d)", labels=[label])
+        simulator = self._simulator()
+        card.set_closed(True)
+
+        compare([200], [response["statusCode"] for response in simulator.deliver()])
+        replay_cards = replay_list.list_cards()
+        compare(["Sport (10 d)"], [replay_card.name for replay_card in replay_cards])
+        compare((datetime.now() + timedelta(days=10)).date(), replay_cards[0].due_date.date())
+
+    def test_no_time_left(self):
+        self.tasks = {TEST_BOARD: ShoppingTask}
+        card = self.board.add_list("Wichtiges Einkaufen").add_card("Milch")
+        simulator = WebhookSimulator(self.fake, lambda event, _: handle_webhook(
+            event, self.session, self.tasks, TEST_KEY, TEST_SECRET, deadline=Deadline(-1.0)), APPLICATION_SECRET)
+        card.set_closed(True)
+        self.fake.reset_calls()
+
+        responses = simulator.deliver()
+
+        compare({"handled": True, "task": "ShoppingTask", "ok": True}, json.loads(responses[0]["body"]))
+        # the task is deferred before it reads the board, the deadline is not kept by the shared session
+        compare({}, dict(self.fake.calls))
+        self.assertIsNone(self.session.deadline)
+
+    def test_invalid_signature_and_check_of_the_callback(self):
+        event = self._simulator().event({"type": "updateCard", "data": {"board": {"id": self.board.id}}})
+        event["headers"]["x-trello-webhook"] = "forged"
+        compare(401, self._handler(event, None)["statusCode"])
+        event["requestContext"]["http"]["method"] = "HEAD"
+        compare(200, self._handler(event, None)["statusCode"])
+
+    def test_signed_with_the_token(self):
+        assert self.fake is not None
+        simulator = WebhookSimulator(self.fake, self._handler, os.environ[TEST_SECRET])
+        event = simulator.event({"type": "updateCard", "data": {"board": {"id": self.board.id}}})
+        compare(401, self._handler(event, None)["statusCode"])
+
+    def test_rejected_without_configuration(self):
+        event = self._simulator().event({"type": "updateCard", "data": {"board": {"id": self.board.id}}})
+        for variable in (CALLBACK_URL_ENV, WEBHOOK_SECRET):
+            with mock.patch.dict(os.environ):
+                del os.environ[variable]
+                compare(401, self._handler(event, None)["statusCode"])
+
+    def test_malformed_body(self):
+        for body in ("no json", "[]"):
+            event = self._simulator().event({"type": "updateCard", "data": {"board": {"id": self.board.id}}})
+            event["body"] = body
+            event["headers"]["x-trello-webhook"] = signature(body, CALLBACK_URL, APPLICATION_SECRET)
+            compare(400, self._handler(event, None)["statusCode"])
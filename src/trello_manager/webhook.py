@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+from typing import Any, NamedTuple, Optional
+
+from .orchestrator import SNAPSHOT_MAX_AGE, run_task
+from .resilience import Deadline
+from .session import TrelloSession
+from .tasks import ReplayDateTask, ShoppingTask, TrelloManager
+
+# the tasks reacting to archived cards, by the name of their board
+EVENT_TASKS: dict[str, type[TrelloManager]] = {
+    ShoppingTask._board_name: ShoppingTask,  # pylint: disable=protected-access
+    ReplayDateTask._board_name: ReplayDateTask,  # pylint: disable=protected-access
+}
+SIGNATURE_HEADER = "x-trello-webhook"
+# trello signs the webhooks with the oauth secret of the application, not with the token of the user
+WEBHOOK_SECRET = "TRELLO_WEBHOOK_SECRET"
+CALLBACK_URL = "TRELLO_WEBHOOK_CALLBACK_URL"
+
+
+class ArchivedCard(NamedTuple):
+    board: str
+    card_id: str
+
+
+def signature(body: str, callback_url: str, secret: str) -> str:
+    """
+    Trello signs a webhook with the base64 encoded HMAC-SHA1 of the body and the callback url, keyed with
+    the oauth secret of the application.
+    """
+    digest = hmac.new(secret.encode("utf-8"), (body + callback_url).encode("utf-8"), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def is_webhook_event(event: Any) -> bool:
+    """
+    Requests through a Lambda function url or an http api, the scheduled events have no request context.
+    """
+    return isinstance(event, dict) and "http" in event.get("requestContext", {})
+
+
+def archived_card(payload: dict[str, Any]) -> Optional[ArchivedCard]:
+    """
+    The card, if the action of the webhook archived one.
+    """
+    action = payload.get("action", {})
+    data = action.get("data", {})
+    if action.get("type") != "updateCard" or data.get("old", {}).get("closed") is not False:
+        return None
+    if not data.get("card", {}).get("closed"):
+        return None
+    board = data.get("board", {}).get("name") or payload.get("model", {}).get("name")
+    return ArchivedCard(board, data["card"]["id"]) if board else None
+
+
+def _response(status: int, body: dict[str, Any]) -> dict[str, Any]:
+    return {"statusCode": status, "headers": {"Content-Type": "application/json"}, "body": json.dumps(body)}
+
+
+def _check_signature(event: dict[str, Any], body: str, webhook_secret: str) -> Optional[dict[str, Any]]:
+    """
+    The response for a request without a valid signature, None for a valid one.
+    """
+    callback_url = os.environ.get(CALLBACK_URL)
+    application_secret = os.environ.get(webhook_secret)
+    if not callback_url or not application_secret:
+        return _response(401, {"error": "signature can't be checked"})
+    headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+    if not hmac.compare_digest(headers.get(SIGNATURE_HEADER, ""), signature(body, callback_url, application_secret)):
+        return _response(401, {"error": "invalid signature"})
+    return None
+
+
+def handle_webhook(event: dict[str, Any], session: Optional[TrelloSession] = None,
+                   tasks: Optional[dict[str, type[TrelloManager]]] = None,
+                   key: str = "TRELLO_API_KEY", secret: str = "TRELLO_API_SECRET",
+                   webhook_secret: str = WEBHOOK_SECRET, deadline: Optional[Deadline] = None) -> dict[str, Any]:
+    """
+    Handles one webhook request of trello. A card archived on a board of ``tasks`` is handled right away by
+    the task of the board, only for this card. The signature of every request is checked against
+    ``TRELLO_WEBHOOK_CALLBACK_URL`` and the secret in ``webhook_secret``, without them all requests are
+    rejected. Failed tasks answer with 500, so trello sends the action again. A task without time left before
+    ``deadline`` is deferred, the next scheduled run finds the card in the archive.
+    """
+    if event["requestContext"]["http"]["method"] == "HEAD":
+        # trello checks the callback url when the webhook is created
+        return _response(200, {})
+    body = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode("utf-8")
+    rejection = _check_signature(event, body, webhook_secret)
+    if rejection:
+        return rejection
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return _response(400, {"error": "body is no json object"})
+    archived = archived_card(payload)
+    task_class = (tasks or EVENT_TASKS).get(archived.board) if archived else None
+    if not archived or not task_class:
+        return _response(200, {"handled": False})
+    session = session or TrelloSession.shared(key, secret, snapshot_max_age=SNAPSHOT_MAX_AGE)
+    session.deadline = deadline
+    try:
+        result = run_task(task_class, session, archived.board, archived_card_ids=[archived.card_id])
+    finally:
+        session.deadline = None
+    session.save_state(session.instrumentation.summary(), [result.to_json()])
+    session.instrumentation.reset()
+    return _response(200 if result.ok else 500, {"handled": True, "task": result.name, "ok": result.ok})
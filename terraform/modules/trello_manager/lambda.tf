@@ -36,6 +36,16 @@ data "aws_iam_policy_document" "allow_lambda_exec_document" {
         resources = [
             "*"]
     }
+    statement {
+        sid = "TrelloManagerSyncState"
+        effect = "Allow"
+        actions = [
+            "s3:GetObject",
+            "s3:PutObject"
+        ]
+        resources = [
+            "${aws_s3_bucket.code_bucket.arn}/state/*"]
+    }
 }
 
 resource "aws_iam_role" "lambda_role" {
@@ -63,6 +73,10 @@ resource "aws_lambda_function" "lambda_function" {
         variables = {
             TRELLO_API_KEY = var.trello_key,
             TRELLO_API_SECRET = var.trello_secret,
+            TRELLO_MANAGER_STATE = "/tmp/trello_manager_state.db",
+            TRELLO_MANAGER_STATE_S3 = "s3://${aws_s3_bucket.code_bucket.bucket}/state/trello_manager_state.db",
+            TRELLO_MANAGER_METRICS = "emf",
+            TRELLO_MANAGER_COMPACT_CARDS = "1",
         }
     }
     depends_on = [